@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
@@ -7,17 +8,27 @@ import os
 import stripe
 import json
 import logging
+import asyncio
+import time
+import uuid
+import hmac
 from datetime import datetime, timezone
 
-from app.core.database import get_db_session
-from app.models.models import User, UserRole, ParentLetter, Quiz, QuizQuestion, QuizAttempt, TokenTransaction, Subscription, SubscriptionStatus, Feedback
+from app.core.database import get_db_session, AsyncSessionLocal
+from app.models.models import User, UserRole, ParentLetter, Quiz, QuizQuestion, QuizAttempt, TokenTransaction, Subscription, SubscriptionStatus, Feedback, AIJob
 from app.models.schemas import *
-from app.core.auth import authenticate_user, get_current_user, get_password_hash, require_admin, create_access_token
-from app.services.ai_services import generate_parent_letter, generate_quiz_questions, generate_chatbot_response, summarize_content, generate_learning_path, automated_grading_assistant, generate_study_schedule, predict_performance, generate_adaptive_questions
+from app.core.auth import authenticate_user, get_current_user, get_password_hash, require_admin, create_access_token, security
+from app.services.ai_dispatch import Priority
+from app.services.ai_metrics import ai_metrics
+from app.services.ai_services import generate_parent_letter, stream_parent_letter, generate_chatbot_response, stream_chatbot_response, summarize_content, generate_learning_path, automated_grading_assistant, automated_grading_batch, generate_study_schedule, predict_performance, generate_adaptive_questions, _request_learning_path, _request_study_schedule, _request_grading, response_cache, chat_semantic_cache, inflight_requests, ai_dispatcher, ai_circuit_breaker
 from app.services.ml_analytics import MLAnalytics, PredictiveAnalytics
 from app.services.enterprise import TenantManager, EnterpriseAnalytics, ComplianceManager, IntegrationManager
 from app.services.advanced_ai import AdvancedAIService
 from app.services.websocket_manager import manager, NotificationService
+from app.services.question_pool import question_pool
+from app.services.idempotency import idempotency_store
+from app.services.model_routing import model_router
+from app.services.jobs import job_queue, PermanentJobError, FINISHED_STATUSES
 from app.core.config import settings
 
 # Create API Router
@@ -230,8 +241,8 @@ async def create_quiz(
     await session.flush()  # Get the quiz ID
     
     # Add questions
-    for q_data in quiz_data.questions:
-        question = QuizQuestion(
+    session.add_all([
+        QuizQuestion(
             quiz_id=quiz.id,
             question_text=q_data.question_text,
             question_type=q_data.question_type,
@@ -239,7 +250,8 @@ async def create_quiz(
             options=q_data.options,
             order_index=q_data.order_index
         )
-        session.add(question)
+        for q_data in quiz_data.questions
+    ])
     
     await session.commit()
     await session.refresh(quiz)
@@ -272,12 +284,13 @@ async def generate_quiz(
             detail="Insufficient tokens"
         )
     
-    # Generate questions using AI
-    questions = await generate_quiz_questions(
+    # Serve from the pre-generated pool; the model is only called when the pool runs short
+    questions = await question_pool.get_questions(
         topic=request_data.topic,
         level=request_data.level,
         language=request_data.language,
-        num_questions=request_data.num_questions
+        num_questions=request_data.num_questions,
+        user_id=current_user.id
     )
     
     # Deduct token
@@ -289,10 +302,100 @@ async def generate_quiz(
     )
     session.add(token_transaction)
     await session.commit()
-    
+
     return {"questions": questions}
 
+@router.post("/quizzes/generate/stream")
+async def generate_quiz_stream(
+    request_data: QuizGenerateRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """Stream generated questions as each one is complete.
+
+    Sends Server-Sent Events by default, or one JSON object per line when the
+    client accepts application/x-ndjson. The token is only deducted once the
+    full question list has been produced.
+    """
+    token_balance = await current_user.get_token_balance(session)
+    if token_balance < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Insufficient tokens"
+        )
+
+    user_id = current_user.id
+    ndjson = "application/x-ndjson" in request.headers.get("accept", "")
+
+    async def event_source():
+        async for event in question_pool.stream_questions(
+            topic=request_data.topic,
+            level=request_data.level,
+            language=request_data.language,
+            num_questions=request_data.num_questions,
+            user_id=user_id
+        ):
+            if event["type"] == "done":
+                # The request session is closed once streaming starts, so debit in a session of our own
+                async with AsyncSessionLocal() as debit_session:
+                    debit_session.add(TokenTransaction(
+                        user_id=user_id,
+                        amount=-1,
+                        description=f"Quiz generation: {request_data.topic}",
+                        reference_type='quiz_generation'
+                    ))
+                    await debit_session.commit()
+            if ndjson:
+                yield json.dumps(event) + "\n"
+            else:
+                event_type = event.pop("type")
+                yield _sse_event(event_type, event)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="application/x-ndjson" if ndjson else "text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Parent Letter endpoints
+async def _stream_parent_letter_to_websocket(letter_data: ParentLetterCreate, user_id: str, stream_id: str) -> dict:
+    """Generate a letter while pushing its partial content to the user's WebSocket connections"""
+    await manager.send_personal_message({
+        "type": "parent_letter_stream_started",
+        "data": {"stream_id": stream_id}
+    }, user_id)
+    
+    generated_letter = None
+    buffer = []
+    last_flush = time.monotonic()
+    async for event in stream_parent_letter(
+        student_context=letter_data.student_context,
+        content_type=letter_data.content_type,
+        tone=letter_data.tone,
+        language=letter_data.language
+    ):
+        if event["type"] == "letter":
+            generated_letter = event["letter"]
+            continue
+        
+        # Batch token deltas into a few messages per second instead of one per token
+        buffer.append(event["content"])
+        if time.monotonic() - last_flush >= 0.1:
+            await manager.send_personal_message({
+                "type": "parent_letter_chunk",
+                "data": {"stream_id": stream_id, "delta": "".join(buffer)}
+            }, user_id)
+            buffer = []
+            last_flush = time.monotonic()
+    
+    if buffer:
+        await manager.send_personal_message({
+            "type": "parent_letter_chunk",
+            "data": {"stream_id": stream_id, "delta": "".join(buffer)}
+        }, user_id)
+    return generated_letter
+
 @router.post("/parent-letters", response_model=ParentLetterResponse)
 async def create_parent_letter(
     letter_data: ParentLetterCreate,
@@ -367,14 +470,18 @@ async def create_parent_letter(
             detail="Insufficient tokens"
         )
     
-    # Generate letter using AI
+    # Generate letter using AI, streaming it to the browser when a WebSocket is open
+    stream_id = letter_data.stream_id or str(uuid.uuid4())
     try:
-        generated_letter = await generate_parent_letter(
-            student_context=letter_data.student_context,
-            content_type=letter_data.content_type,
-            tone=letter_data.tone,
-            language=letter_data.language
-        )
+        if letter_data.stream and manager.is_connected(current_user.id):
+            generated_letter = await _stream_parent_letter_to_websocket(letter_data, current_user.id, stream_id)
+        else:
+            generated_letter = await generate_parent_letter(
+                student_context=letter_data.student_context,
+                content_type=letter_data.content_type,
+                tone=letter_data.tone,
+                language=letter_data.language
+            )
         
         # Ensure generated_letter has required fields
         if not isinstance(generated_letter, dict):
@@ -429,6 +536,7 @@ async def create_parent_letter(
             "type": "parent_letter_generated",
             "data": {
                 "id": letter.id,
+                "stream_id": stream_id if letter_data.stream else None,
                 "title": letter.title,
                 "content": letter.content,
                 "created_at": letter.created_at.isoformat()
@@ -449,6 +557,134 @@ async def create_parent_letter(
         created_at=letter.created_at
     )
 
+async def _generate_parent_letters_bulk(
+    bulk_data: ParentLetterBulkCreate,
+    current_user: User,
+    session: AsyncSession
+) -> ParentLetterBulkResponse:
+    """Generate letters for a whole class with one balance check, one debit and one commit"""
+    if len(bulk_data.students) > settings.BULK_LETTER_MAX_STUDENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BULK_LETTER_MAX_STUDENTS} students per request"
+        )
+    
+    # Validate every student_context up front; invalid ones are reported, not charged
+    required_fields = ['name', 'parent_name', 'subject']
+    students = []
+    skipped = []
+    for index, student_context in enumerate(bulk_data.students):
+        missing_fields = [field for field in required_fields if not student_context.get(field)]
+        if missing_fields:
+            skipped.append({
+                "index": index,
+                "error": f"Missing required fields in student_context: {', '.join(missing_fields)}"
+            })
+        else:
+            students.append(student_context)
+    
+    if not students:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No valid student contexts provided"
+        )
+    
+    token_balance = await current_user.get_token_balance(session)
+    if token_balance < len(students):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient tokens: {len(students)} required, {token_balance} available"
+        )
+    
+    batch_id = str(uuid.uuid4())
+    semaphore = asyncio.Semaphore(settings.BULK_LETTER_CONCURRENCY)
+    completed = 0
+    
+    async def generate(student_context):
+        nonlocal completed
+        async with semaphore:
+            generated_letter = await generate_parent_letter(
+                student_context=student_context,
+                content_type=bulk_data.content_type,
+                tone=bulk_data.tone,
+                language=bulk_data.language,
+                priority=Priority.BATCH
+            )
+        completed += 1
+        try:
+            await manager.send_personal_message({
+                "type": "parent_letter_bulk_progress",
+                "data": {
+                    "batch_id": batch_id,
+                    "completed": completed,
+                    "total": len(students),
+                    "student_name": student_context.get('name')
+                }
+            }, current_user.id)
+        except Exception as e:
+            logger.warning(f"Failed to send bulk progress: {str(e)}")
+        return generated_letter
+    
+    generated_letters = await asyncio.gather(*(generate(student_context) for student_context in students))
+    
+    letters = [
+        ParentLetter(
+            user_id=current_user.id,
+            title=generated_letter.get('title', 'Parent Letter'),
+            content=generated_letter.get('content', 'Letter content not available'),
+            language=bulk_data.language,
+            tone=bulk_data.tone,
+            student_context=json.dumps(student_context),
+            tokens_used=1
+        )
+        for student_context, generated_letter in zip(students, generated_letters)
+    ]
+    session.add_all(letters)
+    session.add(TokenTransaction(
+        user_id=current_user.id,
+        amount=-len(letters),
+        description=f"Parent letters (bulk): {len(letters)} letters",
+        reference_type='parent_letter_bulk'
+    ))
+    await session.commit()
+    
+    try:
+        await manager.send_personal_message({
+            "type": "parent_letter_bulk_completed",
+            "data": {
+                "batch_id": batch_id,
+                "letter_ids": [letter.id for letter in letters],
+                "skipped": len(skipped)
+            }
+        }, current_user.id)
+    except Exception as e:
+        logger.warning(f"Failed to send notifications: {str(e)}")
+    
+    return ParentLetterBulkResponse(
+        batch_id=batch_id,
+        letters=[ParentLetterResponse(
+            id=letter.id,
+            user_id=letter.user_id,
+            title=letter.title,
+            content=letter.content,
+            language=letter.language,
+            tone=letter.tone,
+            tokens_used=letter.tokens_used,
+            created_at=letter.created_at
+        ) for letter in letters],
+        skipped=skipped,
+        tokens_used=len(letters)
+    )
+
+@router.post("/parent-letters/bulk", response_model=ParentLetterBulkResponse)
+async def create_parent_letters_bulk(
+    bulk_data: ParentLetterBulkCreate,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """Generate parent letters for a whole class"""
+    return await _generate_parent_letters_bulk(bulk_data, current_user, session)
+
 @router.get("/parent-letters", response_model=List[ParentLetterResponse])
 async def get_parent_letters(
     current_user: User = Depends(get_current_user),
@@ -507,6 +743,44 @@ async def public_chat(
         session_id=chat_data.session_id
     )
 
+def _sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _chat_event_stream(chat_data: ChatRequest, user_role: str) -> StreamingResponse:
+    """Stream a chatbot response to the client as Server-Sent Events"""
+    async def event_source():
+        async for event in stream_chatbot_response(
+            message=chat_data.message,
+            language=chat_data.language,
+            user_role=user_role,
+            conversation_history=chat_data.history
+        ):
+            event_type = event.pop("type")
+            if event_type == "done":
+                event["session_id"] = chat_data.session_id
+            yield _sse_event(event_type, event)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Streaming chatbot endpoints (Server-Sent Events)
+@router.post("/chat/stream")
+async def chat_stream(
+    chat_data: ChatRequest,
+    current_user: User = Depends(get_current_user)
+):
+    return _chat_event_stream(chat_data, current_user.role.value)
+
+@router.post("/chat/public/stream")
+async def public_chat_stream(
+    chat_data: ChatRequest
+):
+    return _chat_event_stream(chat_data, 'guest')
+
 # Dashboard stats endpoint
 @router.get("/dashboard/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
@@ -938,7 +1212,7 @@ async def get_intelligent_feedback(
         select(QuizAttempt, Quiz)
         .join(Quiz, QuizAttempt.quiz_id == Quiz.id)
         .where(Quiz.user_id == current_user.id)
-        .order_by(QuizAttempt.created_at.desc())
+        .order_by(QuizAttempt.completed_at.desc())
         .limit(10)
     )
     attempts = attempts_result.all()
@@ -946,7 +1220,7 @@ async def get_intelligent_feedback(
     user_history = [{
         'score': attempt.score,
         'subject': quiz.topic,
-        'date': attempt.created_at.isoformat()
+        'date': attempt.completed_at.isoformat()
     } for attempt, quiz in attempts]
     
     feedback = await ai_service.generate_intelligent_feedback(quiz_results, user_history)
@@ -1061,6 +1335,55 @@ async def system_health(
             "timestamp": datetime.now().isoformat()
         }
 
+@router.get("/system/ai-stats")
+async def ai_stats(
+    current_user: User = Depends(require_admin)
+):
+    """Cache, coalescing, dispatch, question pool and idempotency statistics of this worker"""
+    return {
+        "response_cache": response_cache.get_stats(),
+        "chat_semantic_cache": chat_semantic_cache.get_stats(),
+        "inflight_requests": inflight_requests.get_stats(),
+        "dispatcher": ai_dispatcher.get_stats(),
+        "circuit_breaker": ai_circuit_breaker.get_stats(),
+        "question_pool": question_pool.get_stats(),
+        "ai_usage": ai_metrics.get_totals(),
+        "cache_lookups": ai_metrics.get_cache_totals(),
+        "idempotency": idempotency_store.get_stats(),
+        "model_routing": model_router.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+async def require_metrics_access(request: Request, session: AsyncSession = Depends(get_db_session)):
+    """Scrapers present METRICS_TOKEN; without a token configured, only admins may read the metrics"""
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "")
+        if not hmac.compare_digest(supplied, f"Bearer {settings.METRICS_TOKEN}"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+        return
+    require_admin(await get_current_user(await security(request), session))
+
+@router.get("/system/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def ai_metrics_export():
+    """AI latency, token, cost, cache and fallback metrics of this worker in Prometheus text format"""
+    dispatcher = ai_dispatcher.get_stats()
+    cache = response_cache.get_stats()
+    gauges = {
+        "lehrki_ai_dispatch_limit": dispatcher["limit"],
+        "lehrki_ai_dispatch_active": dispatcher["active"],
+        "lehrki_ai_dispatch_waiting": dispatcher["waiting"],
+        "lehrki_ai_inflight_requests": inflight_requests.get_stats()["in_flight"],
+        "lehrki_ai_circuit_open": int(ai_circuit_breaker.state != "closed"),
+        "lehrki_ai_response_cache_entries": cache["entries"],
+        "lehrki_ai_response_cache_bytes": cache["bytes"],
+        "lehrki_ai_semantic_cache_entries": chat_semantic_cache.get_stats()["entries"],
+        "lehrki_quiz_pool_questions": question_pool.get_stats()["questions"],
+    }
+    return PlainTextResponse(
+        ai_metrics.render_prometheus(gauges),
+        media_type="text/plain; version=0.0.4"
+    )
+
 # New AI Services Endpoints
 @router.post("/ai/summarize-content")
 async def ai_summarize_content(
@@ -1113,6 +1436,23 @@ async def ai_automated_grading(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/ai/automated-grading/batch")
+async def ai_automated_grading_batch(
+    request_data: dict,
+    current_user: User = Depends(get_current_user)
+):
+    """Grade many student answers to one assignment in packed requests"""
+    try:
+        grading_results = await automated_grading_batch(
+            assignment_text=request_data.get('assignment', ''),
+            rubric=request_data.get('rubric', {}),
+            answers=request_data.get('answers', []),
+            language=request_data.get('language', 'en')
+        )
+        return grading_results
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/ai/study-schedule")
 async def ai_generate_study_schedule(
     request_data: dict,
@@ -1163,6 +1503,123 @@ async def ai_generate_adaptive_questions(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Background jobs: long-running AI tasks run on the job queue and are polled by id.
+# Handlers call the variants that raise instead of returning template fallbacks,
+# so a failed AI call is retried and then reported as a failed job.
+async def _learning_path_job(params: dict, user_id: str) -> dict:
+    return await _request_learning_path(
+        subject=params.get('subject', ''),
+        current_level=params.get('current_level', 'beginner'),
+        target_level=params.get('target_level', 'intermediate'),
+        timeframe=params.get('timeframe', '4 weeks'),
+        language=params.get('language', 'en')
+    )
+
+async def _automated_grading_job(params: dict, user_id: str) -> dict:
+    return await _request_grading(
+        assignment_text=params.get('assignment', ''),
+        rubric=params.get('rubric', {}),
+        student_answer=params.get('answer', ''),
+        language=params.get('language', 'en')
+    )
+
+async def _automated_grading_batch_job(params: dict, user_id: str) -> dict:
+    return await automated_grading_batch(
+        assignment_text=params.get('assignment', ''),
+        rubric=params.get('rubric', {}),
+        answers=params.get('answers', []),
+        language=params.get('language', 'en'),
+        allow_fallback=False
+    )
+
+async def _study_schedule_job(params: dict, user_id: str) -> dict:
+    return await _request_study_schedule(
+        subjects=params.get('subjects', []),
+        available_hours=params.get('available_hours', 10),
+        preferences=params.get('preferences', {}),
+        language=params.get('language', 'en')
+    )
+
+async def _parent_letters_bulk_job(params: dict, user_id: str) -> dict:
+    try:
+        bulk_data = ParentLetterBulkCreate(**params)
+    except ValueError as e:
+        raise PermanentJobError(str(e))
+    
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if not user:
+            raise PermanentJobError("User not found")
+        try:
+            response = await _generate_parent_letters_bulk(bulk_data, user, session)
+        except HTTPException as e:
+            # Validation and balance errors will fail the same way on every retry
+            raise PermanentJobError(e.detail)
+    return response.model_dump(mode="json")
+
+job_queue.register("learning_path", _learning_path_job)
+job_queue.register("automated_grading", _automated_grading_job)
+job_queue.register("automated_grading_batch", _automated_grading_batch_job)
+job_queue.register("study_schedule", _study_schedule_job)
+job_queue.register("parent_letters_bulk", _parent_letters_bulk_job)
+
+async def _get_user_job(job_id: str, current_user: User, session: AsyncSession) -> AIJob:
+    result = await session.execute(
+        select(AIJob).where(AIJob.id == job_id, AIJob.user_id == current_user.id)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    job_data: JobSubmitRequest,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """Queue a long-running AI task and return its job id for polling"""
+    if job_data.kind not in job_queue.kinds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown job kind. Supported: {', '.join(job_queue.kinds)}"
+        )
+    return await job_queue.submit(session, current_user.id, job_data.kind, job_data.params)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """Get the status of a background job"""
+    return await _get_user_job(job_id, current_user, session)
+
+@router.get("/jobs/{job_id}/result", response_model=JobResultResponse)
+async def get_job_result(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """Get the result of a finished background job"""
+    job = await _get_user_job(job_id, current_user, session)
+    if job.status not in FINISHED_STATUSES:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is still {job.status}")
+    return job
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """Cancel a queued or running background job"""
+    job = await _get_user_job(job_id, current_user, session)
+    if not await job_queue.cancel(session, job):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job already {job.status}")
+    return job
+
 # Debug endpoint for parent letter creation
 @router.post("/debug/parent-letter")
 async def debug_parent_letter(
@@ -23,6 +23,88 @@ class Settings:
     
     # AI Services
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    # Point at an OpenAI-compatible server, e.g. benchmarks/mock_openai.py for load tests.
+    # Always passed explicitly: the openai client would otherwise read an empty OPENAI_BASE_URL itself
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+    # Backend of AdvancedAIService: openai, local (deterministic templates) or auto (openai when a key is set)
+    AI_PROVIDER: str = os.getenv("AI_PROVIDER", "auto")
+    # Simulated service time of the local provider in seconds
+    AI_LOCAL_LATENCY: float = float(os.getenv("AI_LOCAL_LATENCY", "0.1"))
+    # Model per routing tier; AI_MODEL_ROUTES overrides task tiers as "task=fast,task=standard"
+    AI_MODEL_FAST: str = os.getenv("AI_MODEL_FAST", "gpt-4o-mini")
+    AI_MODEL_STANDARD: str = os.getenv("AI_MODEL_STANDARD", "gpt-4o")
+    AI_MODEL_ROUTES: str = os.getenv("AI_MODEL_ROUTES", "")
+    # Retry on the next tier's model when a response fails validation (e.g. invalid JSON)
+    AI_MODEL_ESCALATION: bool = os.getenv("AI_MODEL_ESCALATION", "True").lower() == "true"
+    
+    # Pooled HTTP connections to the AI provider, shared by every AI call of a worker
+    AI_HTTP_MAX_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "100"))
+    AI_HTTP_MAX_KEEPALIVE: int = int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "20"))
+    AI_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", "60"))
+    AI_HTTP_CONNECT_TIMEOUT: float = float(os.getenv("AI_HTTP_CONNECT_TIMEOUT", "5"))
+    AI_HTTP_READ_TIMEOUT: float = float(os.getenv("AI_HTTP_READ_TIMEOUT", "120"))
+    AI_HTTP2_ENABLED: bool = os.getenv("AI_HTTP2_ENABLED", "True").lower() == "true"
+    
+    # AI response cache
+    AI_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", "2048"))
+    AI_CACHE_MAX_BYTES: int = int(os.getenv("AI_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    AI_CACHE_TTL: int = int(os.getenv("AI_CACHE_TTL", "3600"))
+    # Shared by every worker on the host; empty disables the on-disk tier
+    AI_CACHE_DB_PATH: str = os.getenv("AI_CACHE_DB_PATH", "")
+    AI_CACHE_DB_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_DB_MAX_ENTRIES", "50000"))
+    AI_CACHE_DB_MAX_BYTES: int = int(os.getenv("AI_CACHE_DB_MAX_BYTES", str(256 * 1024 * 1024)))
+    AI_CACHE_WARM_ENTRIES: int = int(os.getenv("AI_CACHE_WARM_ENTRIES", "1000"))
+    
+    # Approximate-match cache for chat questions without conversation history
+    CHAT_SEMANTIC_CACHE_ENABLED: bool = os.getenv("CHAT_SEMANTIC_CACHE_ENABLED", "True").lower() == "true"
+    CHAT_SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("CHAT_SEMANTIC_CACHE_THRESHOLD", "0.8"))
+    CHAT_SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("CHAT_SEMANTIC_CACHE_MAX_ENTRIES", "20000"))
+    CHAT_SEMANTIC_CACHE_TTL: int = int(os.getenv("CHAT_SEMANTIC_CACHE_TTL", "3600"))
+    
+    # AI dispatch (adaptive concurrency limit per worker)
+    AI_INITIAL_CONCURRENCY: int = int(os.getenv("AI_INITIAL_CONCURRENCY", "8"))
+    AI_MAX_CONCURRENCY: int = int(os.getenv("AI_MAX_CONCURRENCY", "32"))
+    AI_TARGET_LATENCY: float = float(os.getenv("AI_TARGET_LATENCY", "10"))
+    
+    # AI call resilience: per-call deadline, hedged requests and circuit breaker
+    AI_DEFAULT_DEADLINE: float = float(os.getenv("AI_DEFAULT_DEADLINE", "60"))
+    AI_HEDGING_ENABLED: bool = os.getenv("AI_HEDGING_ENABLED", "False").lower() == "true"
+    AI_HEDGE_MIN_DELAY: float = float(os.getenv("AI_HEDGE_MIN_DELAY", "3"))
+    AI_BREAKER_FAILURE_RATE: float = float(os.getenv("AI_BREAKER_FAILURE_RATE", "0.5"))
+    AI_BREAKER_SLOW_CALL: float = float(os.getenv("AI_BREAKER_SLOW_CALL", "30"))
+    AI_BREAKER_OPEN_SECONDS: float = float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30"))
+    
+    # Idempotency-Key records for token-charging endpoints; shared via AI_CACHE_DB_PATH when set
+    IDEMPOTENCY_TTL: int = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+    IDEMPOTENCY_WAIT_TIMEOUT: float = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "120"))
+    
+    # Bearer token Prometheus sends to /api/system/metrics; empty restricts the endpoint to admins
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    
+    # Quiz question pools per (topic, level, language), filled in the background
+    QUIZ_POOL_TARGET_SIZE: int = int(os.getenv("QUIZ_POOL_TARGET_SIZE", "30"))
+    QUIZ_POOL_MAX_SIZE: int = int(os.getenv("QUIZ_POOL_MAX_SIZE", "200"))
+    QUIZ_POOL_FILL_BATCH: int = int(os.getenv("QUIZ_POOL_FILL_BATCH", "10"))
+    QUIZ_POOL_MIN_REQUESTS: int = int(os.getenv("QUIZ_POOL_MIN_REQUESTS", "2"))
+    
+    # Large quizzes are generated as parallel parts of at most QUIZ_CHUNK_SIZE questions
+    QUIZ_CHUNK_SIZE: int = int(os.getenv("QUIZ_CHUNK_SIZE", "5"))
+    QUIZ_CHUNK_CONCURRENCY: int = int(os.getenv("QUIZ_CHUNK_CONCURRENCY", "8"))
+    
+    # Bulk parent letters
+    BULK_LETTER_MAX_STUDENTS: int = int(os.getenv("BULK_LETTER_MAX_STUDENTS", "40"))
+    BULK_LETTER_CONCURRENCY: int = int(os.getenv("BULK_LETTER_CONCURRENCY", "5"))
+    
+    # Batch grading: answers packed per request and packs graded in parallel
+    GRADING_BATCH_TOKEN_BUDGET: int = int(os.getenv("GRADING_BATCH_TOKEN_BUDGET", "6000"))
+    GRADING_BATCH_MAX_ANSWERS: int = int(os.getenv("GRADING_BATCH_MAX_ANSWERS", "8"))
+    GRADING_BATCH_CONCURRENCY: int = int(os.getenv("GRADING_BATCH_CONCURRENCY", "4"))
+    
+    # Background AI jobs
+    AI_JOB_WORKERS: int = int(os.getenv("AI_JOB_WORKERS", "2"))
+    AI_JOB_MAX_ATTEMPTS: int = int(os.getenv("AI_JOB_MAX_ATTEMPTS", "3"))
+    AI_JOB_TIMEOUT: int = int(os.getenv("AI_JOB_TIMEOUT", "300"))
     
     # Application
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
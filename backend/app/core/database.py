@@ -36,7 +36,7 @@ async def init_db():
     try:
         async with engine.begin() as conn:
             # Import models to ensure tables are created
-            from app.models.models import User, OAuth, Subscription, TokenTransaction, ParentLetter, Quiz, QuizQuestion, QuizAttempt, ChatMessage, Feedback
+            from app.models.models import User, OAuth, Subscription, TokenTransaction, ParentLetter, Quiz, QuizQuestion, QuizAttempt, ChatMessage, Feedback, AIJob, QuestionBankItem
             await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created successfully")
         
@@ -2,6 +2,7 @@ from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+import asyncio
 import os
 import json
 from contextlib import asynccontextmanager
@@ -13,6 +14,10 @@ load_dotenv()
 from .core.database import init_db
 from .api.routes import router as api_router
 from .services.websocket_manager import manager, NotificationService
+from .services.ai_services import warm_response_cache, start_ai_http_client, close_ai_http_client
+from .services.jobs import job_queue
+from .services.question_pool import question_pool
+from .services.idempotency import IdempotencyMiddleware, idempotency_store
 from .core.config import settings
 
 
@@ -20,9 +25,14 @@ from .core.config import settings
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    await asyncio.to_thread(warm_response_cache)
+    await start_ai_http_client()
+    await job_queue.start()
     yield
     # Shutdown
-    pass
+    await job_queue.stop()
+    await question_pool.close()
+    await close_ai_http_client()
 
 
 # Create FastAPI app
@@ -50,6 +60,14 @@ if settings.ALLOWED_DOMAINS:
                 domain = f"https://{domain}"
             allowed_origins.append(domain)
 
+# Retried requests with the same Idempotency-Key must not run the LLM or charge tokens twice
+# (added before CORS so CORS stays outermost and also covers replayed responses)
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    paths=["/api/quizzes/generate", "/api/parent-letters", "/api/parent-letters/bulk", "/api/jobs", "/api/ai/"]
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[o for o in allowed_origins if o],
@@ -1,6 +1,6 @@
 from datetime import datetime
 from app.core.database import Base
-from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, Float, JSON, ForeignKey, UniqueConstraint, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, Float, JSON, ForeignKey, UniqueConstraint, Index, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
@@ -219,3 +219,45 @@ class NotificationLog(Base):
     message = Column(Text, nullable=False)
     read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class AIJob(Base):
+    __tablename__ = 'ai_jobs'
+    id = Column(String(36), primary_key=True)
+    user_id = Column(String, ForeignKey('users.id'), nullable=False, index=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), default='queued', nullable=False, index=True)  # queued, running, succeeded, failed, cancelled
+    params = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+class QuestionBankItem(Base):
+    __tablename__ = 'question_bank'
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(255), nullable=False)  # Normalized: lower case, single spaces
+    level = Column(String(50), nullable=False)
+    language = Column(String(2), nullable=False)
+    source = Column(String(20), default='ai', nullable=False)  # ai
+    fingerprint = Column(String(32), unique=True, nullable=False)  # Hash of topic, level, language and question text
+    question_text = Column(Text, nullable=False)
+    question_type = Column(String(20), default='multiple_choice')
+    correct_answer = Column(Text, nullable=True)
+    options = Column(JSON, nullable=True)
+    explanation = Column(Text, nullable=True)
+    difficulty = Column(String(20), nullable=True)
+    learning_objective = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (Index(
+        'ix_question_bank_topic_level_language_source',
+        'topic',
+        'level',
+        'language',
+        'source',
+    ),)
@@ -91,6 +91,8 @@ class ParentLetterCreate(BaseModel):
     content_type: str = "progress_report"
     tone: str = "professional"
     language: str = "en"
+    stream: bool = False  # Push partial letter content to the user's WebSocket connections
+    stream_id: Optional[str] = None  # Client-chosen id echoed in the streamed messages
 
 class ParentLetterResponse(BaseModel):
     id: int
@@ -105,6 +107,18 @@ class ParentLetterResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ParentLetterBulkCreate(BaseModel):
+    students: List[Dict[str, Any]]  # One student_context per letter
+    content_type: str = "progress_report"
+    tone: str = "professional"
+    language: str = "en"
+
+class ParentLetterBulkResponse(BaseModel):
+    batch_id: str
+    letters: List[ParentLetterResponse]
+    skipped: List[Dict[str, Any]] = []
+    tokens_used: int
+
 # Chat schemas
 class ChatRequest(BaseModel):
     message: str
@@ -118,6 +132,27 @@ class ChatResponse(BaseModel):
     suggestions: List[str] = []
     context_aware: bool = False
 
+# Background job schemas
+class JobSubmitRequest(BaseModel):
+    kind: str  # learning_path, automated_grading, automated_grading_batch, study_schedule, parent_letters_bulk
+    params: Dict[str, Any] = {}
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class JobResultResponse(JobResponse):
+    result: Optional[Dict[str, Any]] = None
+
 # Token schemas
 class TokenBalanceResponse(BaseModel):
     balance: int
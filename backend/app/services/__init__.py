@@ -1,3 +1,4 @@
+from .ai_cache import CacheBackend, ResponseCache, SQLiteCacheTier, SingleFlight
 from .ai_services import *
 from .websocket_manager import *
 from .ml_analytics import *
@@ -1,19 +1,25 @@
-import openai
 import json
+import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.models import User, Quiz, QuizAttempt, ParentLetter
+from app.services.ai_metrics import ai_metrics
+from app.services.ai_providers import AIProvider, get_provider, validate_response
+from app.services.ai_services import response_cache, _get_cache_key, _get_cached
+from app.services.fallback_templates import template_engine
+from app.services.model_routing import model_router
+
+logger = logging.getLogger(__name__)
 
 class AdvancedAIService:
     """Advanced AI capabilities with multiple models and fallbacks"""
     
-    def __init__(self):
-        self.models = {
-            "gpt-4o": {"max_tokens": 128000, "cost_per_token": 0.000005}
-        }
+    def __init__(self, provider: Optional[AIProvider] = None):
+        # OpenAI or the local deterministic provider, chosen by settings.AI_PROVIDER
+        self.provider = provider or get_provider()
     
     async def generate_adaptive_quiz(self, user_performance: Dict, topic: str, difficulty: str) -> Dict:
         """Generate quiz adapted to user's learning style and performance"""
@@ -187,73 +193,30 @@ class AdvancedAIService:
             return "adaptive"
     
     async def _call_ai_with_fallback(self, prompt: str, task_type: str) -> Dict:
-        """Call AI service with multiple model fallbacks"""
-        models_to_try = ["gpt-4o"]  # Only GPT-4o model
+        """Call the provider on the task's routed model, falling back to templates"""
+        model = model_router.model_for(task_type)
+        # Provider is part of the key so local answers are never served once OpenAI is configured
+        cache_key = _get_cache_key(f"advanced:{task_type}", model, provider=self.provider.name, prompt=prompt)
+        cached = await _get_cached(cache_key, task_type)
+        if cached is not None:
+            return cached
         
-        for model in models_to_try:
-            try:
-                # Simulate AI API call
-                await asyncio.sleep(0.1)  # Simulate API delay
-                
-                # Return mock response based on task type
-                return self._generate_mock_ai_response(task_type)
-                
-            except Exception as e:
-                continue
+        try:
+            result = await self.provider.complete(task_type, model, prompt, cache_key)
+            if validate_response(task_type, result):
+                response_cache.set(cache_key, result, task=task_type)
+                return result
+            logger.warning(f"{self.provider.name} provider returned an invalid {task_type} response")
+        except Exception as e:
+            logger.warning(f"{self.provider.name} provider failed for {task_type} with {model}: {e}")
         
-        # If all models fail, use template-based fallback
+        # If the model fails, use template-based fallback
+        ai_metrics.record_fallback(task_type)
         return self._generate_template_response(task_type)
     
-    def _generate_mock_ai_response(self, task_type: str) -> Dict:
-        """Generate mock AI responses for different task types"""
-        responses = {
-            "quiz_generation": {
-                "questions": [
-                    {
-                        "question": "What is the primary function of mitochondria?",
-                        "options": ["Energy production", "Protein synthesis", "DNA storage", "Waste removal"],
-                        "correct_answer": "Energy production",
-                        "explanation": "Mitochondria are known as the powerhouse of the cell, producing ATP through cellular respiration."
-                    }
-                ]
-            },
-            "study_plan": {
-                "plan": {
-                    "week_1": {
-                        "focus": "Foundation building",
-                        "daily_tasks": ["Review basics", "Practice problems", "Take notes"],
-                        "goals": ["Master fundamental concepts"]
-                    }
-                }
-            },
-            "feedback": {
-                "feedback": "Great improvement in problem-solving! Focus on time management for better results.",
-                "recommendations": ["Practice timed quizzes", "Review weak topics", "Use active recall"],
-                "goals": ["Improve speed", "Maintain accuracy"],
-                "motivation_score": 8
-            },
-            "recommendations": {
-                "recommendations": [
-                    {"type": "video", "title": "Advanced Mathematics", "priority": "high"},
-                    {"type": "practice", "title": "Problem Sets", "priority": "medium"}
-                ],
-                "priority_topics": ["Algebra", "Geometry"],
-                "learning_path": ["Basics", "Intermediate", "Advanced"]
-            }
-        }
-        
-        return responses.get(task_type, {})
-    
     def _generate_template_response(self, task_type: str) -> Dict:
         """Generate template-based responses as final fallback"""
-        templates = {
-            "quiz_generation": {"questions": []},
-            "study_plan": {"plan": {"message": "Basic study plan template"}},
-            "feedback": {"feedback": "Keep practicing to improve your skills!"},
-            "recommendations": {"recommendations": []}
-        }
-        
-        return templates.get(task_type, {})
+        return template_engine.template_response(task_type)
     
     async def _get_user_learning_data(self, session: AsyncSession, user_id: str) -> Dict:
         """Get comprehensive user learning data"""
@@ -272,7 +235,7 @@ class AdvancedAIService:
                 select(QuizAttempt, Quiz)
                 .join(Quiz, QuizAttempt.quiz_id == Quiz.id)
                 .where(Quiz.user_id == user_id)
-                .order_by(QuizAttempt.created_at.desc())
+                .order_by(QuizAttempt.completed_at.desc())
                 .limit(20)
             )
             attempts = attempts_result.all()
@@ -295,62 +258,16 @@ class AdvancedAIService:
     
     async def _fallback_adaptive_quiz(self, topic: str, difficulty: str) -> Dict:
         """Fallback quiz generation"""
-        return {
-            "questions": [
-                {
-                    "question": f"Basic {topic} question at {difficulty} level",
-                    "options": ["Option A", "Option B", "Option C", "Option D"],
-                    "correct_answer": "Option A",
-                    "explanation": "This is a template explanation."
-                }
-            ],
-            "adaptive_features": {
-                "learning_style": "general",
-                "difficulty_progression": False,
-                "personalized_feedback": False
-            }
-        }
+        return template_engine.adaptive_quiz(topic, difficulty)
     
     def _fallback_study_plan(self) -> Dict:
         """Fallback study plan"""
-        return {
-            "study_plan": {
-                "week_1": {"focus": "Review fundamentals", "daily_tasks": ["Study 1 hour", "Practice problems"]},
-                "week_2": {"focus": "Intermediate topics", "daily_tasks": ["Study 1.5 hours", "Take practice quiz"]},
-                "week_3": {"focus": "Advanced concepts", "daily_tasks": ["Study 2 hours", "Group study"]},
-                "week_4": {"focus": "Review and assessment", "daily_tasks": ["Review all topics", "Take final assessment"]}
-            },
-            "duration": "30 days",
-            "personalization_factors": {"level": "general"}
-        }
+        return template_engine.study_plan()
     
     def _fallback_feedback(self, quiz_results: Dict) -> Dict:
         """Fallback feedback generation"""
-        score = quiz_results.get('score', 0)
-        
-        if score >= 80:
-            feedback = "Excellent work! You're demonstrating strong understanding."
-        elif score >= 60:
-            feedback = "Good effort! Focus on reviewing the topics you missed."
-        else:
-            feedback = "Keep practicing! Review the fundamentals and try again."
-        
-        return {
-            "feedback": feedback,
-            "recommendations": ["Review missed topics", "Practice more problems", "Seek help if needed"],
-            "next_goals": ["Improve weak areas", "Maintain strong performance"],
-            "motivation_score": min(10, max(1, score // 10))
-        }
+        return template_engine.feedback(quiz_results.get('score', 0))
     
     def _fallback_recommendations(self) -> Dict:
         """Fallback content recommendations"""
-        return {
-            "recommendations": [
-                {"type": "review", "title": "Review basic concepts", "priority": "high"},
-                {"type": "practice", "title": "Complete practice exercises", "priority": "medium"},
-                {"type": "assessment", "title": "Take practice quiz", "priority": "low"}
-            ],
-            "priority_topics": ["Fundamentals", "Core concepts"],
-            "learning_path": ["Basic", "Intermediate", "Advanced"],
-            "estimated_duration": "2-3 weeks"
-        }
\ No newline at end of file
+        return template_engine.recommendations()
@@ -0,0 +1,530 @@
+import asyncio
+import functools
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Second cache tier behind ResponseCache, storing serialized responses.
+
+    Backends may be shared between worker processes. Any error a backend
+    raises is logged by ResponseCache, which then behaves as memory-only.
+    The methods block, so async code calls them through run() or submit(),
+    which execute them one at a time on the backend's own I/O thread.
+    """
+
+    _executor = None
+    _executor_pid = None
+
+    def _io_executor(self) -> ThreadPoolExecutor:
+        # Threads do not survive fork(); start a fresh one in the child
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-cache-io")
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Await fn(*args) on the I/O thread, keeping the event loop free while it waits on disk or locks"""
+        return await asyncio.get_running_loop().run_in_executor(self._io_executor(), functools.partial(fn, *args))
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        """Queue fn(*args) on the I/O thread without waiting; calls run in submission order"""
+        return self._io_executor().submit(fn, *args)
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (serialized value, expires_at) if key is present and fresh"""
+        raise NotImplementedError
+
+    def set(self, key: str, payload: str, expires_at: float):
+        raise NotImplementedError
+
+    def add(self, key: str, payload: str, expires_at: float) -> bool:
+        """Store payload only if key is absent or expired; returns whether it was stored.
+
+        Backends shared between processes should make this atomic.
+        """
+        if self.get(key) is not None:
+            return False
+        self.set(key, payload, expires_at)
+        return True
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def iter_recent(self, limit: int) -> Iterator[Tuple[str, str, float]]:
+        """Yield (key, serialized value, expires_at) for the newest fresh entries"""
+        return iter(())
+
+    def compact(self) -> int:
+        return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {}
+
+    def close(self):
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=True)
+        self._executor = None
+
+
+class SQLiteCacheTier(CacheBackend):
+    """On-disk key/value tier for AI responses that survives restarts.
+
+    The database runs in WAL mode, so every uvicorn worker on the host can
+    point at the same file and read what the others have generated. Each
+    thread gets its own connection, and compaction runs on a thread of its
+    own so it never holds up lookups.
+    """
+
+    def __init__(self, path: str, max_entries: int = 50000, max_bytes: int = 256 * 1024 * 1024,
+                 compact_every: int = 500, busy_timeout_ms: int = 2000, table: str = "ai_response_cache"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compact_every = compact_every
+        self.busy_timeout_ms = busy_timeout_ms
+        self._writes_since_compact = 0
+        self._compaction = None
+        self._compactor = None
+        self._compactor_pid = None
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        conn = self._conn
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, stored_at REAL NOT NULL)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table}_expires ON {self.table} (expires_at)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table}_stored ON {self.table} (stored_at)")
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread, and none shared across fork(); reopen in the child
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.connection = self._connect()
+            local.pid = os.getpid()
+        return local.connection
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None,
+                                     timeout=self.busy_timeout_ms / 1000)
+        connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._connections.append((os.getpid(), connection))
+        return connection
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        row = self._conn.execute(
+            f"SELECT value, expires_at FROM {self.table} WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, payload: str, expires_at: float):
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, size, expires_at, stored_at) VALUES (?, ?, ?, ?, ?)",
+            (key, payload, len(payload), expires_at, time.time())
+        )
+        with self._lock:
+            self._writes_since_compact += 1
+            due = self._writes_since_compact >= self.compact_every
+        if due:
+            self.schedule_compaction()
+
+    def add(self, key: str, payload: str, expires_at: float) -> bool:
+        # An expired row must not block the insert, a fresh one must
+        self._conn.execute(f"DELETE FROM {self.table} WHERE key = ? AND expires_at <= ?", (key, time.time()))
+        return self._conn.execute(
+            f"INSERT OR IGNORE INTO {self.table} (key, value, size, expires_at, stored_at) VALUES (?, ?, ?, ?, ?)",
+            (key, payload, len(payload), expires_at, time.time())
+        ).rowcount == 1
+
+    def delete(self, key: str):
+        self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        self._conn.execute(f"DELETE FROM {self.table}")
+
+    def iter_recent(self, limit: int) -> Iterator[Tuple[str, str, float]]:
+        yield from self._conn.execute(
+            f"SELECT key, value, expires_at FROM {self.table} WHERE expires_at > ? "
+            "ORDER BY stored_at DESC LIMIT ?",
+            (time.time(), limit)
+        )
+
+    def schedule_compaction(self) -> Future:
+        """Start compact() on the compaction thread unless a run is already pending"""
+        with self._lock:
+            if self._compactor is None or self._compactor_pid != os.getpid():
+                self._compactor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-cache-compact")
+                self._compactor_pid = os.getpid()
+                self._compaction = None
+            if self._compaction is None or self._compaction.done():
+                self._compaction = self._compactor.submit(self._compact_logged)
+            return self._compaction
+
+    def _compact_logged(self) -> int:
+        try:
+            return self.compact()
+        except Exception as e:
+            logger.warning(f"AI cache compaction failed: {e}")
+            return 0
+
+    def compact(self) -> int:
+        """Drop expired rows and trim the oldest rows down to the size limits"""
+        with self._lock:
+            self._writes_since_compact = 0
+        removed = self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+
+        count, total_bytes = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()
+        if count > self.max_entries or total_bytes > self.max_bytes:
+            # Walk from newest to oldest and keep rows while both budgets allow
+            keep, kept_bytes, cutoff = 0, 0, None
+            for size, stored_at in self._conn.execute(
+                f"SELECT size, stored_at FROM {self.table} ORDER BY stored_at DESC"
+            ):
+                if keep + 1 > self.max_entries or kept_bytes + size > self.max_bytes:
+                    cutoff = stored_at
+                    break
+                keep += 1
+                kept_bytes += size
+            if cutoff is not None:
+                removed += self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE stored_at <= ?", (cutoff,)
+                ).rowcount
+
+        if removed:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA incremental_vacuum")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        count, total_bytes = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()
+        return {
+            "path": self.path,
+            "entries": count,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        super().close()
+        if self._compactor is not None and self._compactor_pid == os.getpid():
+            self._compactor.shutdown(wait=True)
+        self._compactor = None
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for pid, connection in connections:
+            if pid == os.getpid():
+                connection.close()
+        self._local = threading.local()
+
+
+class ResponseCache:
+    """Bounded in-memory LRU cache for AI responses with per-task TTLs"""
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: int = 3600, ttls: Optional[Dict[str, int]] = None,
+                 backend: Optional[CacheBackend] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.backend = backend
+
+        # key -> (expires_at, size, value); ordered from least to most recently used
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._expiry_heap = []
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._backend_hits = 0
+        self._backend_errors = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired.
+
+        Reads the backend inline; async code should use aget().
+        """
+        entry = self._get_entry(key)
+        if entry is not None:
+            return entry[2]
+        row = None
+        if self.backend is not None:
+            try:
+                row = self.backend.get(key)
+            except Exception as e:
+                self._backend_errors += 1
+                logger.warning(f"AI cache backend read failed: {e}")
+        return self._from_backend_row(key, row)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Like get(), with the backend read on the backend's I/O thread"""
+        entry = self._get_entry(key)
+        if entry is not None:
+            return entry[2]
+        row = None
+        if self.backend is not None:
+            try:
+                row = await self.backend.run(self.backend.get, key)
+            except Exception as e:
+                self._backend_errors += 1
+                logger.warning(f"AI cache backend read failed: {e}")
+        return self._from_backend_row(key, row)
+
+    def _get_entry(self, key: str) -> Optional[tuple]:
+        """Fresh memory entry for key, marked most recently used and counted as a hit"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.time():
+            self._remove(key)
+            self._expirations += 1
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return entry
+
+    def set(self, key: str, value: Any, task: Optional[str] = None, ttl: Optional[int] = None):
+        """Store value under key, expiring after the task's TTL"""
+        if ttl is None:
+            ttl = self.ttls.get(task, self.default_ttl)
+        if ttl <= 0:
+            return
+
+        payload = self._serialize(value)
+        if payload is None:
+            return
+
+        now = time.time()
+        expires_at = now + ttl
+        self._store(key, value, len(payload), expires_at, now)
+
+        if self.backend is not None:
+            self._submit_to_backend(self.backend.set, "write", key, payload, expires_at)
+
+    def warm(self, limit: int) -> int:
+        """Load up to limit of the newest backend entries into memory"""
+        if self.backend is None or limit <= 0:
+            return 0
+        loaded = 0
+        now = time.time()
+        try:
+            rows = list(self.backend.iter_recent(limit))
+            # Insert oldest first so the newest entries end up most recently used
+            for key, payload, expires_at in reversed(rows):
+                if key not in self._entries:
+                    self._store(key, json.loads(payload), len(payload), expires_at, now)
+                    loaded += 1
+        except Exception as e:
+            self._backend_errors += 1
+            logger.warning(f"AI cache warm-up failed: {e}")
+        return loaded
+
+    def _store(self, key: str, value: Any, size: int, expires_at: float, now: float):
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+
+        self.purge_expired(now)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._evictions += 1
+
+    def delete(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+        if self.backend is not None:
+            self._submit_to_backend(self.backend.delete, "delete", key)
+
+    def clear(self):
+        self._entries.clear()
+        self._expiry_heap = []
+        self._bytes = 0
+        if self.backend is not None:
+            self._submit_to_backend(self.backend.clear, "clear")
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop every entry whose TTL has passed; returns the number removed"""
+        now = now or time.time()
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(key)
+            # Heap items for overwritten keys are stale, only the current expiry counts
+            if entry is not None and entry[0] == expires_at:
+                self._remove(key)
+                self._expirations += 1
+                removed += 1
+
+        # Keep the heap from growing without bound when keys are overwritten often
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [(entry[0], key) for key, entry in self._entries.items()]
+            heapq.heapify(self._expiry_heap)
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        stats = {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "backend_hits": self._backend_hits,
+            "backend_errors": self._backend_errors,
+        }
+        if self.backend is not None:
+            try:
+                stats["backend"] = self.backend.get_stats()
+            except Exception:
+                pass
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str):
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.time()
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _from_backend_row(self, key: str, row: Optional[Tuple[str, float]]) -> Optional[Any]:
+        value = None
+        if row is not None:
+            payload, expires_at = row
+            try:
+                value = json.loads(payload)
+            except ValueError as e:
+                self._backend_errors += 1
+                logger.warning(f"AI cache backend entry unreadable: {e}")
+            else:
+                # Promote into memory for the remainder of its lifetime
+                self._store(key, value, len(payload), expires_at, time.time())
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+            self._backend_hits += 1
+        return value
+
+    def _submit_to_backend(self, fn: Callable[..., Any], action: str, *args) -> Optional[Future]:
+        """Hand a backend write to its I/O thread; memory is already updated, so nobody waits on disk"""
+        def check(future: Future):
+            error = future.exception()
+            if error is not None:
+                self._backend_errors += 1
+                logger.warning(f"AI cache backend {action} failed: {error}")
+
+        try:
+            future = self.backend.submit(fn, *args)
+        except Exception as e:
+            self._backend_errors += 1
+            logger.warning(f"AI cache backend {action} failed: {e}")
+            return None
+        future.add_done_callback(check)
+        return future
+
+    @staticmethod
+    def _serialize(value: Any) -> Optional[str]:
+        try:
+            return json.dumps(value, default=str)
+        except (TypeError, ValueError):
+            return None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight call"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() once per key; callers arriving meanwhile share its outcome"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self._coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: run the call ourselves
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.do(key, fn)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the exception as retrieved when nobody else was waiting on it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        self._leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = self._leaders + self._coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "upstream_calls": self._leaders,
+            "coalesced_calls": self._coalesced,
+            "coalesce_rate": round(self._coalesced / calls, 4) if calls else 0.0,
+        }
@@ -0,0 +1,156 @@
+import asyncio
+import enum
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+
+
+class Priority(enum.IntEnum):
+    """Dispatch classes for AI calls; lower values are served first"""
+    INTERACTIVE = 0  # Chat, where a user is watching the screen
+    STANDARD = 1     # Parent letters, quizzes and the other on-request generators
+    BATCH = 2        # Bulk generation and background jobs
+
+
+class AIDispatcher:
+    """Central concurrency limiter and priority queue for AI provider calls.
+
+    The concurrency limit adapts AIMD-style: it grows slowly while calls
+    finish under the latency target and is cut sharply when the provider
+    answers 429 or latency goes above target. Waiting calls are admitted
+    strictly by priority, then in arrival order.
+    """
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 32,
+                 target_latency: float = 10.0, backoff_cooldown: float = 1.0):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff_cooldown = backoff_cooldown
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._active = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._last_backoff = 0.0
+        self._stats = {
+            priority.name.lower(): {
+                "submitted": 0,
+                "completed": 0,
+                "failed": 0,
+                "rate_limited": 0,
+                "queue_time_total": 0.0,
+                "queue_time_max": 0.0,
+                "service_time_total": 0.0,
+                "service_time_max": 0.0,
+            }
+            for priority in Priority
+        }
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.STANDARD, adaptive: bool = True):
+        """Hold one concurrency slot for the duration of the block.
+
+        Set adaptive=False for streamed calls, whose duration depends on the
+        client reading the stream rather than on provider latency.
+        """
+        stats = self._stats[Priority(priority).name.lower()]
+        stats["submitted"] += 1
+        enqueued_at = time.monotonic()
+        await self._acquire(priority)
+
+        started_at = time.monotonic()
+        queue_time = started_at - enqueued_at
+        stats["queue_time_total"] += queue_time
+        stats["queue_time_max"] = max(stats["queue_time_max"], queue_time)
+        try:
+            yield
+        except Exception as e:
+            stats["failed"] += 1
+            if self._is_rate_limit(e):
+                stats["rate_limited"] += 1
+                self._back_off()
+            raise
+        else:
+            service_time = time.monotonic() - started_at
+            stats["completed"] += 1
+            stats["service_time_total"] += service_time
+            stats["service_time_max"] = max(stats["service_time_max"], service_time)
+            if adaptive:
+                self._on_success(service_time)
+        finally:
+            self._release()
+
+    async def run(self, priority: Priority, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() inside a slot of the given priority"""
+        async with self.slot(priority):
+            return await fn()
+
+    def get_stats(self) -> Dict[str, Any]:
+        by_priority = {}
+        for name, stats in self._stats.items():
+            started = stats["completed"] + stats["failed"]
+            by_priority[name] = {
+                **stats,
+                "queue_time_avg": round(stats["queue_time_total"] / started, 4) if started else 0.0,
+                "service_time_avg": round(stats["service_time_total"] / stats["completed"], 4) if stats["completed"] else 0.0,
+            }
+        return {
+            "limit": self.limit,
+            "active": self._active,
+            "waiting": sum(1 for *_, future in self._waiters if not future.done()),
+            "priorities": by_priority,
+        }
+
+    async def _acquire(self, priority: Priority):
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # A slot handed over just as we were cancelled must be given back
+            if future.done() and not future.cancelled():
+                self._release()
+            else:
+                future.cancel()
+            raise
+
+    def _release(self):
+        self._active -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        while self._waiters and self._active < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._active += 1
+            future.set_result(None)
+
+    def _on_success(self, latency: float):
+        if latency > self.target_latency:
+            self._limit = max(float(self.min_limit), self._limit * 0.9)
+        else:
+            # Additive increase: roughly +1 after a full window of fast calls
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._wake_waiters()
+
+    def _back_off(self):
+        now = time.monotonic()
+        # One burst of 429s should halve the limit once, not once per failed call
+        if now - self._last_backoff >= self.backoff_cooldown:
+            self._limit = max(float(self.min_limit), self._limit / 2)
+            self._last_backoff = now
+
+    @staticmethod
+    def _is_rate_limit(error: Exception) -> bool:
+        return getattr(error, "status_code", None) == 429
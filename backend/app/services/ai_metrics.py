@@ -0,0 +1,181 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# USD per 1M tokens (prompt, completion); models not listed are costed as gpt-4o
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "local": (0.0, 0.0),
+}
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Help text for the point-in-time gauges reported by /system/metrics
+GAUGE_HELP = {
+    "lehrki_ai_dispatch_limit": "Current AI dispatcher concurrency limit",
+    "lehrki_ai_dispatch_active": "AI calls currently holding a dispatcher slot",
+    "lehrki_ai_dispatch_waiting": "AI calls queued for a dispatcher slot",
+    "lehrki_ai_inflight_requests": "Distinct AI requests in flight, after coalescing identical ones",
+    "lehrki_ai_circuit_open": "1 while the AI circuit breaker is open or half-open, else 0",
+    "lehrki_ai_response_cache_entries": "Entries in the in-memory AI response cache",
+    "lehrki_ai_response_cache_bytes": "Approximate size of the in-memory AI response cache in bytes",
+    "lehrki_ai_semantic_cache_entries": "Entries in the chat semantic cache",
+    "lehrki_quiz_pool_questions": "Questions available in the quiz question pool",
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICES.get(model, MODEL_PRICES["gpt-4o"])
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class AIMetrics:
+    """In-process aggregates of AI calls per task and model, exported in Prometheus text format.
+
+    Only counters and histogram buckets are kept, never individual calls, so
+    memory stays constant however many requests are served. Values are per
+    worker process and reset on restart, as Prometheus expects of counters.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._requests = defaultdict(int)        # (task, model, outcome) -> count
+        self._latency_buckets = defaultdict(lambda: [0] * len(self.buckets))  # (task, model) -> counts
+        self._latency_sum = defaultdict(float)   # (task, model) -> seconds
+        self._latency_count = defaultdict(int)   # (task, model) -> count
+        self._tokens = defaultdict(int)          # (task, model, type) -> tokens
+        self._cost = defaultdict(float)          # (task, model) -> USD
+        self._cache = defaultdict(int)           # (task, result) -> count
+        self._fallbacks = defaultdict(int)       # (task,) -> count
+        self._model_tiers: Dict[str, str] = {}   # model -> routing tier
+
+    def set_model_tiers(self, model_tiers: Dict[str, str]):
+        """Routing tier of each model, added as a label so tiers can be compared"""
+        self._model_tiers = dict(model_tiers)
+
+    def tier_of(self, model: str) -> str:
+        return self._model_tiers.get(model, "other")
+
+    def _with_tier(self, samples: Dict[tuple, object]) -> Dict[tuple, object]:
+        """Insert the tier of the model (second key element) after it"""
+        return {(key[0], key[1], self.tier_of(key[1]), *key[2:]): value for key, value in samples.items()}
+
+    def record_request(self, task: Optional[str], model: str, outcome: str, latency: Optional[float] = None,
+                       prompt_tokens: int = 0, completion_tokens: int = 0):
+        """Record one provider call; outcome is success, error, timeout or circuit_open"""
+        task = task or "unknown"
+        self._requests[(task, model, outcome)] += 1
+        if latency is not None:
+            key = (task, model)
+            counts = self._latency_buckets[key]
+            for index, bound in enumerate(self.buckets):
+                if latency <= bound:
+                    counts[index] += 1
+            self._latency_sum[key] += latency
+            self._latency_count[key] += 1
+        if prompt_tokens or completion_tokens:
+            self._tokens[(task, model, "prompt")] += prompt_tokens
+            self._tokens[(task, model, "completion")] += completion_tokens
+            self._cost[(task, model)] += estimate_cost(model, prompt_tokens, completion_tokens)
+
+    def record_cache(self, task: str, hit: bool, tier: str = "exact"):
+        self._cache[(task, tier if hit else "miss")] += 1
+
+    def record_fallback(self, task: str):
+        self._fallbacks[(task,)] += 1
+
+    def get_totals(self) -> Dict[str, float]:
+        return {
+            "requests": sum(self._requests.values()),
+            "prompt_tokens": sum(value for (_, _, kind), value in self._tokens.items() if kind == "prompt"),
+            "completion_tokens": sum(value for (_, _, kind), value in self._tokens.items() if kind == "completion"),
+            "cost_usd": round(sum(self._cost.values()), 6),
+            "fallbacks": sum(self._fallbacks.values()),
+            "by_tier": self.get_tier_totals(),
+        }
+
+    def get_cache_totals(self) -> Dict[str, Dict]:
+        """Cache lookups per task: hits by the tier that answered, and misses"""
+        tasks = defaultdict(lambda: {"hits": 0, "misses": 0, "by_tier": {}})
+        for (task, result), count in self._cache.items():
+            if result == "miss":
+                tasks[task]["misses"] += count
+            else:
+                tasks[task]["hits"] += count
+                tasks[task]["by_tier"][result] = count
+        return dict(tasks)
+
+    def get_tier_totals(self) -> Dict[str, Dict[str, float]]:
+        """Requests, mean latency, tokens and cost per routing tier"""
+        tiers = defaultdict(lambda: {"requests": 0, "latency_sum": 0.0, "latency_count": 0,
+                                     "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0})
+        for (_, model, _), count in self._requests.items():
+            tiers[self.tier_of(model)]["requests"] += count
+        for (task, model), seconds in self._latency_sum.items():
+            tiers[self.tier_of(model)]["latency_sum"] += seconds
+            tiers[self.tier_of(model)]["latency_count"] += self._latency_count[(task, model)]
+        for (_, model, kind), tokens in self._tokens.items():
+            tiers[self.tier_of(model)][f"{kind}_tokens"] += tokens
+        for (_, model), cost in self._cost.items():
+            tiers[self.tier_of(model)]["cost_usd"] += cost
+
+        totals = {}
+        for tier, values in tiers.items():
+            latency_count = values.pop("latency_count")
+            latency_sum = values.pop("latency_sum")
+            values["avg_latency"] = round(latency_sum / latency_count, 4) if latency_count else 0.0
+            values["cost_usd"] = round(values["cost_usd"], 6)
+            totals[tier] = values
+        return totals
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Render all metrics, plus point-in-time gauges, in the Prometheus text exposition format"""
+        lines: List[str] = []
+
+        def family(name, kind, help_text, samples, label_names):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label_values, value in sorted(samples.items()):
+                lines.append(f"{name}{_labels(label_names, label_values)} {value}")
+
+        family("lehrki_ai_requests_total", "counter", "AI provider calls by outcome",
+               self._with_tier(self._requests), ("task", "model", "tier", "outcome"))
+
+        name = "lehrki_ai_request_duration_seconds"
+        lines.append(f"# HELP {name} AI provider call latency")
+        lines.append(f"# TYPE {name} histogram")
+        for (task, model), counts in sorted(self._latency_buckets.items()):
+            tier = self.tier_of(model)
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{name}_bucket{_labels(('task', 'model', 'tier', 'le'), (task, model, tier, bound))} {count}")
+            total = self._latency_count[(task, model)]
+            lines.append(f"{name}_bucket{_labels(('task', 'model', 'tier', 'le'), (task, model, tier, '+Inf'))} {total}")
+            lines.append(f"{name}_sum{_labels(('task', 'model', 'tier'), (task, model, tier))} {self._latency_sum[(task, model)]:.6f}")
+            lines.append(f"{name}_count{_labels(('task', 'model', 'tier'), (task, model, tier))} {total}")
+
+        family("lehrki_ai_tokens_total", "counter", "Tokens reported by the provider",
+               self._with_tier(self._tokens), ("task", "model", "tier", "type"))
+        family("lehrki_ai_cost_usd_total", "counter", "Estimated AI spend in US dollars",
+               self._with_tier({key: f"{value:.6f}" for key, value in self._cost.items()}), ("task", "model", "tier"))
+        family("lehrki_ai_cache_lookups_total", "counter", "AI response cache lookups by result (tier that hit, or miss)",
+               self._cache, ("task", "result"))
+        family("lehrki_ai_fallbacks_total", "counter", "Responses served from local fallbacks instead of the model",
+               self._fallbacks, ("task",))
+
+        for gauge_name, value in sorted((gauges or {}).items()):
+            lines.append(f"# HELP {gauge_name} {GAUGE_HELP.get(gauge_name, 'Point-in-time value')}")
+            lines.append(f"# TYPE {gauge_name} gauge")
+            lines.append(f"{gauge_name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+ai_metrics = AIMetrics()
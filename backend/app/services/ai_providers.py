@@ -0,0 +1,157 @@
+import asyncio
+import copy
+import json
+import logging
+import os
+from typing import Dict, List
+
+from app.core.config import settings
+from app.services.ai_dispatch import Priority
+from app.services.ai_resilience import CircuitBreaker
+from app.services.ai_services import _create_completion, _get_openai, _guarded_call
+from app.services.prompt_budget import estimate_message_tokens, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Response shape per AdvancedAIService task: shown to the model as the format to
+# follow, and returned as-is by the local provider
+EXAMPLE_RESPONSES = {
+    "quiz_generation": {
+        "questions": [
+            {
+                "question": "What is the primary function of mitochondria?",
+                "options": ["Energy production", "Protein synthesis", "DNA storage", "Waste removal"],
+                "correct_answer": "Energy production",
+                "explanation": "Mitochondria are known as the powerhouse of the cell, producing ATP through cellular respiration."
+            }
+        ]
+    },
+    "study_plan": {
+        "plan": {
+            "week_1": {
+                "focus": "Foundation building",
+                "daily_tasks": ["Review basics", "Practice problems", "Take notes"],
+                "goals": ["Master fundamental concepts"]
+            }
+        }
+    },
+    "feedback": {
+        "feedback": "Great improvement in problem-solving! Focus on time management for better results.",
+        "recommendations": ["Practice timed quizzes", "Review weak topics", "Use active recall"],
+        "goals": ["Improve speed", "Maintain accuracy"],
+        "motivation_score": 8
+    },
+    "recommendations": {
+        "recommendations": [
+            {"type": "video", "title": "Advanced Mathematics", "priority": "high"},
+            {"type": "practice", "title": "Problem Sets", "priority": "medium"}
+        ],
+        "priority_topics": ["Algebra", "Geometry"],
+        "learning_path": ["Basics", "Intermediate", "Advanced"],
+        "duration": "2-4 weeks"
+    }
+}
+
+_MAX_TOKENS = {
+    "quiz_generation": 3000,
+    "study_plan": 2500,
+    "feedback": 800,
+    "recommendations": 1000,
+}
+
+
+def build_messages(task_type: str, prompt: str) -> List[Dict]:
+    example = EXAMPLE_RESPONSES.get(task_type)
+    system_prompt = "You are an expert educational AI assistant. Always respond in valid JSON format."
+    if example is not None:
+        system_prompt += f"\nRespond with JSON in this format:\n{json.dumps(example, indent=2)}"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def validate_response(task_type: str, result) -> bool:
+    """A usable response is a JSON object containing the main field of the task's example"""
+    if not isinstance(result, dict):
+        return False
+    example = EXAMPLE_RESPONSES.get(task_type)
+    return not example or next(iter(example)) in result
+
+
+def _parse_response(response):
+    try:
+        return json.loads(response.choices[0].message.content)
+    except (ValueError, TypeError, AttributeError, IndexError):
+        return None
+
+
+class AIProvider:
+    """Backend that turns a task prompt into a JSON response"""
+
+    name = "base"
+
+    async def complete(self, task_type: str, model: str, prompt: str, cache_key: str) -> Dict:
+        raise NotImplementedError
+
+
+class OpenAIProvider(AIProvider):
+    """Calls the model through _create_completion: dispatcher, deadlines, circuit breaker and tier escalation"""
+
+    name = "openai"
+
+    async def complete(self, task_type: str, model: str, prompt: str, cache_key: str) -> Dict:
+        response = await _create_completion(
+            cache_key, _get_openai(),
+            task=task_type,
+            validate=lambda response: validate_response(task_type, _parse_response(response)),
+            model=model,
+            messages=build_messages(task_type, prompt),
+            response_format={"type": "json_object"},
+            max_tokens=_MAX_TOKENS.get(task_type, 1500)
+        )
+        return json.loads(response.choices[0].message.content)
+
+
+class LocalProvider(AIProvider):
+    """Deterministic template answers, for running and load testing without a model.
+
+    Each call goes through the same guards as a model call and holds a
+    dispatcher slot for `latency` seconds, so the endpoints queue and time
+    out like they would against a real provider. It has a circuit breaker of
+    its own, so load on it never opens the breaker of the real provider.
+    """
+
+    name = "local"
+
+    def __init__(self, latency: float = 0.1):
+        self.latency = latency
+        self.breaker = CircuitBreaker(
+            failure_rate_threshold=settings.AI_BREAKER_FAILURE_RATE,
+            slow_call_threshold=settings.AI_BREAKER_SLOW_CALL,
+            open_duration=settings.AI_BREAKER_OPEN_SECONDS
+        )
+
+    async def complete(self, task_type: str, model: str, prompt: str, cache_key: str) -> Dict:
+        async def call():
+            await asyncio.sleep(self.latency)
+            return copy.deepcopy(EXAMPLE_RESPONSES.get(task_type, {}))
+
+        messages = build_messages(task_type, prompt)
+        return await _guarded_call(
+            cache_key, task_type, self.name, Priority.STANDARD, call,
+            usage=lambda result: (estimate_message_tokens(messages), estimate_tokens(json.dumps(result))),
+            breaker=self.breaker
+        )
+
+
+def get_provider(name: str = None) -> AIProvider:
+    """Provider named by AI_PROVIDER; "auto" uses OpenAI when an API key is configured"""
+    name = (name or settings.AI_PROVIDER).lower()
+    if name == "auto":
+        name = "openai" if os.environ.get("OPENAI_API_KEY") else "local"
+    if name == "openai":
+        return OpenAIProvider()
+    if name != "local":
+        logger.warning(f"Unknown AI provider {name!r}, using the local provider")
+    return LocalProvider(latency=settings.AI_LOCAL_LATENCY)
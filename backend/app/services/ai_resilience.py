@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Stop calling a failing or very slow AI provider for a while.
+
+    Calls are tracked over a rolling time window; errors, timeouts and calls
+    slower than slow_call_threshold all count as failures. Once the failure
+    rate crosses failure_rate_threshold the circuit opens and callers fall
+    back immediately. After open_duration a few trial calls are let through
+    (half-open); one success closes the circuit, a failure opens it again.
+
+    A trial whose caller was cancelled gives its permit back through
+    release(). Trials that never report at all are treated as failed once
+    half_open_timeout has passed, so the circuit opens again and later
+    sends a new probe instead of rejecting calls for good.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_rate_threshold: float = 0.5, slow_call_threshold: float = 20.0,
+                 min_calls: int = 10, window: float = 60.0, open_duration: float = 30.0,
+                 half_open_max_calls: int = 2, half_open_timeout: float = 120.0):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self.half_open_timeout = half_open_timeout
+
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._last_trial_at = 0.0
+        self._calls = deque()  # (timestamp, failed)
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        now = time.monotonic()
+        if (self._state == self.HALF_OPEN and self._half_open_calls >= self.half_open_max_calls
+                and now - self._last_trial_at >= self.half_open_timeout):
+            # The trials never reported back
+            self._open()
+        if self._state == self.OPEN and now - self._opened_at >= self.open_duration:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may go to the provider now"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            self._last_trial_at = time.monotonic()
+            return True
+        self._rejected += 1
+        return False
+
+    def release(self):
+        """Give back a permit from allow() for a call that ended without an outcome, e.g. when cancelled"""
+        if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self, latency: float):
+        if latency > self.slow_call_threshold:
+            self.record_failure()
+            return
+        if self._state == self.HALF_OPEN:
+            self._close()
+        self._record(False)
+
+    def record_failure(self):
+        if self._state == self.HALF_OPEN:
+            self._open()
+            return
+        self._record(True)
+        if self._state == self.CLOSED and len(self._calls) >= self.min_calls:
+            failures = sum(1 for _, failed in self._calls if failed)
+            if failures / len(self._calls) >= self.failure_rate_threshold:
+                self._open()
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._trim()
+        failures = sum(1 for _, failed in self._calls if failed)
+        return {
+            "state": self.state,
+            "window_calls": len(self._calls),
+            "window_failure_rate": round(failures / len(self._calls), 4) if self._calls else 0.0,
+            "times_opened": self._times_opened,
+            "rejected_calls": self._rejected,
+        }
+
+    def _record(self, failed: bool):
+        self._calls.append((time.monotonic(), failed))
+        self._trim()
+
+    def _trim(self):
+        cutoff = time.monotonic() - self.window
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._times_opened += 1
+        self._calls.clear()
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._calls.clear()
+
+
+class LatencyTracker:
+    """Recent call latencies per task, used to decide when a request is a tail outlier"""
+
+    def __init__(self, size: int = 200):
+        self.size = size
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, task: str, latency: float):
+        self._samples.setdefault(task, deque(maxlen=self.size)).append(latency)
+
+    def percentile(self, task: str, fraction: float, min_samples: int = 20) -> Optional[float]:
+        samples = self._samples.get(task)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def hedged(fn: Callable[[], Awaitable[Any]], hedge_after: Optional[float]) -> Any:
+    """Await fn(); if it has not finished after hedge_after seconds, race a second fn().
+
+    The first call to succeed wins and the other is cancelled. An error is
+    only raised once every started call has failed.
+    """
+    first = asyncio.ensure_future(fn())
+    if hedge_after is None:
+        return await first
+
+    pending = {first}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_after)
+        if not done:
+            pending.add(asyncio.ensure_future(fn()))
+
+        last_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,399 +1,894 @@
+import asyncio
 import json
 import os
 import httpx
 import hashlib
+import logging
+import re
 import time
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 from openai import AsyncOpenAI
 
+from app.core.config import settings
+from app.services.ai_cache import CacheBackend, ResponseCache, SQLiteCacheTier, SingleFlight
+from app.services.ai_dispatch import AIDispatcher, Priority
+from app.services.ai_metrics import ai_metrics
+from app.services.fallback_templates import template_engine
+from app.services.ai_resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, hedged
+from app.services.json_stream import JsonArrayItemStreamer, JsonStringFieldStreamer
+from app.services.model_routing import model_router
+from app.services.semantic_cache import SemanticCache
+from app.services.prompt_budget import TASK_BUDGETS, chunk_text, estimate_message_tokens, estimate_tokens, trim_history
+
+logger = logging.getLogger(__name__)
+
 # Using GPT-4o as the primary model
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
 _openai_client = None
-_response_cache = {}
-_cache_ttl = 3600  # 1 hour cache
-
-def _get_openai():
-    global _openai_client
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        return None  # Return None instead of raising exception
-    if _openai_client is None:
-        _openai_client = AsyncOpenAI(api_key=api_key)
-    return _openai_client
-
-def _get_cache_key(prompt: str, model: str = "gpt-4o") -> str:
-    """Generate cache key for AI responses"""
-    return hashlib.md5(f"{model}:{prompt}".encode()).hexdigest()
-
-def _get_cached_response(cache_key: str) -> Optional[Dict]:
-    """Get cached response if still valid"""
-    if cache_key in _response_cache:
-        cached_data = _response_cache[cache_key]
-        if time.time() - cached_data['timestamp'] < _cache_ttl:
-            return cached_data['response']
-        else:
-            del _response_cache[cache_key]
-    return None
-
-def _cache_response(cache_key: str, response: Dict):
-    """Cache AI response"""
-    _response_cache[cache_key] = {
-        'response': response,
-        'timestamp': time.time()
-    }
-
-def get_fallback_parent_letter(student_context, content_type, tone, language):
-    """Generate enhanced fallback parent letter when AI is unavailable"""
-    student_name = student_context.get('name', 'Student')
-    parent_name = student_context.get('parent_name', 'Parent')
-    subject = student_context.get('subject', 'General Studies')
-    grade = student_context.get('grade', '')
-    key_points = student_context.get('key_points', '')
-    additional_context = student_context.get('additional_context', '')
-    
-    from datetime import datetime
-    date = datetime.now().strftime('%B %d, %Y')
-    
-    templates = {
-        'progress_report': f"""Dear {parent_name},
-
-I hope this letter finds you well. I am writing to provide you with an update regarding {student_name}'s progress in {subject}{f' ({grade})' if grade else ''}.
-
-{key_points + '\n\n' if key_points else ''}{student_name} has been demonstrating consistent effort and engagement in class. Their understanding of the core concepts is developing well, and they actively participate in classroom discussions.
-
-Recent observations:
-• Shows improvement in problem-solving skills
-• Demonstrates good collaboration with peers
-• Completes assignments on time
-• Asks thoughtful questions during lessons
+_http_client: Optional[httpx.AsyncClient] = None
 
-{additional_context + '\n\n' if additional_context else ''}I encourage continued support at home through regular review of class materials and completion of homework assignments. Please feel free to contact me if you have any questions or would like to schedule a conference to discuss {student_name}'s progress in more detail.
+# Per-task cache lifetimes in seconds; tasks not listed use settings.AI_CACHE_TTL
+_cache_ttls = {
+    "parent_letter": 3600,
+    "quiz": 6 * 3600,
+    "chat": 15 * 60,
+    "assessment": 3600,
+    "summary": 24 * 3600,
+    "summary_chunk": 24 * 3600,
+    "learning_path": 24 * 3600,
+    "study_schedule": 6 * 3600,
+    "performance_prediction": 3600,
+    "grading": 3600,
+    "grading_batch": 3600,
+    "adaptive_questions": 3600,
+    # AdvancedAIService tasks
+    "quiz_generation": 3600,
+    "study_plan": 6 * 3600,
+    "feedback": 3600,
+    "recommendations": 6 * 3600,
+}
 
-Best regards,
-[Teacher Name]
-{subject} Teacher
-[School Name]
+# Upper bound in seconds for one AI call including queueing; tasks not listed use settings.AI_DEFAULT_DEADLINE
+_task_deadlines = {
+    "chat": 20,
+    "parent_letter": 45,
+    "quiz": 45,
+    "assessment": 45,
+    "summary_chunk": 45,
+    "performance_prediction": 45,
+    "adaptive_questions": 45,
+    "grading_batch": 120,
+}
 
-Date: {date}""",
-        
-        'behavior_update': f"""Dear {parent_name},
-
-I wanted to reach out to discuss {student_name}'s recent behavior and social development in {subject} class.
-
-{key_points + '\n\n' if key_points else ''}{student_name} has been showing positive growth in their classroom behavior. They are learning to follow classroom expectations and work well with their classmates.
-
-Positive observations:
-• Shows respect for classroom rules
-• Demonstrates good listening skills
-• Works cooperatively in group activities
-• Shows kindness to fellow students
-
-{additional_context + '\n\n' if additional_context else ''}I appreciate your support in reinforcing these positive behaviors at home. Together, we can help {student_name} continue to develop strong social and academic skills.
-
-Warm regards,
-[Teacher Name]
-{subject} Teacher
+def _create_cache_backend() -> Optional[CacheBackend]:
+    """Build the shared second tier; every worker on the host opens the same file"""
+    if not settings.AI_CACHE_DB_PATH:
+        return None
+    try:
+        return SQLiteCacheTier(
+            settings.AI_CACHE_DB_PATH,
+            max_entries=settings.AI_CACHE_DB_MAX_ENTRIES,
+            max_bytes=settings.AI_CACHE_DB_MAX_BYTES
+        )
+    except Exception as e:
+        logger.warning(f"AI cache disk tier unavailable, using memory only: {e}")
+        return None
 
-Date: {date}""",
-        
-        'achievement_celebration': f"""Dear {parent_name},
+response_cache = ResponseCache(
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    max_bytes=settings.AI_CACHE_MAX_BYTES,
+    default_ttl=settings.AI_CACHE_TTL,
+    ttls=_cache_ttls,
+    backend=_create_cache_backend()
+)
 
-I am delighted to share some wonderful news about {student_name}'s recent achievements in {subject}!
+# Identical requests that miss the cache at the same time share one upstream call
+inflight_requests = SingleFlight()
 
-{key_points + '\n\n' if key_points else ''}{student_name} has demonstrated exceptional performance and dedication in their studies. Their hard work and positive attitude have truly paid off.
+# Paraphrases of common chat questions reuse an earlier answer for the same role and language
+chat_semantic_cache = SemanticCache(
+    threshold=settings.CHAT_SEMANTIC_CACHE_THRESHOLD,
+    max_entries=settings.CHAT_SEMANTIC_CACHE_MAX_ENTRIES,
+    ttl=settings.CHAT_SEMANTIC_CACHE_TTL
+)
 
-Notable achievements:
-• Excellent performance on recent assessments
-• Outstanding participation in class discussions
-• Demonstrates mastery of key concepts
-• Shows leadership qualities in group work
+# Every provider call waits here for a slot, so bursts queue instead of hitting rate limits
+ai_dispatcher = AIDispatcher(
+    initial_limit=settings.AI_INITIAL_CONCURRENCY,
+    max_limit=settings.AI_MAX_CONCURRENCY,
+    target_latency=settings.AI_TARGET_LATENCY
+)
 
-{additional_context + '\n\n' if additional_context else ''}Please join me in celebrating {student_name}'s success! Their commitment to learning is truly commendable, and I look forward to seeing their continued growth.
+# Once the provider fails or crawls, callers get their local fallbacks right away
+ai_circuit_breaker = CircuitBreaker(
+    failure_rate_threshold=settings.AI_BREAKER_FAILURE_RATE,
+    slow_call_threshold=settings.AI_BREAKER_SLOW_CALL,
+    open_duration=settings.AI_BREAKER_OPEN_SECONDS,
+    # A trial call cannot legitimately outlast the longest task deadline
+    half_open_timeout=max(settings.AI_DEFAULT_DEADLINE, *_task_deadlines.values())
+)
 
-Congratulations to both you and {student_name}!
+ai_latencies = LatencyTracker()
 
-Proud regards,
-[Teacher Name]
-{subject} Teacher
+def warm_response_cache() -> int:
+    """Compact the disk tier and load its newest entries into memory"""
+    if response_cache.backend is None:
+        return 0
+    try:
+        response_cache.backend.compact()
+    except Exception as e:
+        logger.warning(f"AI cache compaction failed: {e}")
+    loaded = response_cache.warm(settings.AI_CACHE_WARM_ENTRIES)
+    logger.info(f"Warmed AI response cache with {loaded} entries")
+    return loaded
 
-Date: {date}""",
-        
-        'academic_concern': f"""Dear {parent_name},
+def _build_http_client() -> httpx.AsyncClient:
+    """Pooled transport for provider calls: bounded connections kept alive between requests"""
+    http2 = settings.AI_HTTP2_ENABLED
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.info("h2 not installed, AI provider connections use HTTP/1.1")
+            http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(settings.AI_HTTP_READ_TIMEOUT, connect=settings.AI_HTTP_CONNECT_TIMEOUT),
+        follow_redirects=True
+    )
 
-I hope this letter finds you well. I am writing to discuss some concerns regarding {student_name}'s academic performance in {subject}.
+async def start_ai_http_client():
+    """Open the shared provider connection pool; called from the app lifespan"""
+    global _http_client
+    if _http_client is None:
+        _http_client = _build_http_client()
 
-{key_points + '\n\n' if key_points else ''}While {student_name} is a capable student, I have noticed some areas where additional support would be beneficial. I believe that with the right strategies and support, {student_name} can overcome these challenges.
+async def close_ai_http_client():
+    """Close the shared connection pool and drop the client bound to it"""
+    global _http_client, _openai_client
+    _openai_client = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
-Areas for improvement:
-• Consistent completion of homework assignments
-• Active participation in class discussions
-• Seeking help when concepts are unclear
-• Time management and organization skills
+def _get_openai():
+    global _openai_client, _http_client
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return None  # Return None instead of raising exception
+    if _openai_client is None:
+        if _http_client is None:
+            # Used outside the app lifespan, e.g. from scripts
+            _http_client = _build_http_client()
+        _openai_client = AsyncOpenAI(api_key=api_key, base_url=settings.OPENAI_BASE_URL, http_client=_http_client)
+    return _openai_client
 
-{additional_context + '\n\n' if additional_context else ''}I would like to work together with you to develop strategies that will help {student_name} succeed. Please feel free to contact me to discuss how we can best support {student_name}'s learning.
+# Bump when prompt templates change so answers to the old prompts stop matching
+PROMPT_VERSION = "1"
 
-Sincerely,
-[Teacher Name]
-{subject} Teacher
+def _normalize_cache_input(value):
+    """Collapse whitespace in strings and make containers JSON-canonical"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize_cache_input(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_normalize_cache_input(v) for v in value]
+    return value
 
-Date: {date}""",
-        
-        'meeting_request': f"""Dear {parent_name},
+def _get_cache_key(task: str, model: Optional[str] = None, **inputs) -> str:
+    """Fingerprint an AI request from its task, model (the task's routed model by default), prompt version and full inputs"""
+    canonical = json.dumps(
+        {
+            "task": task,
+            "model": model or model_router.model_for(task),
+            "prompt_version": PROMPT_VERSION,
+            "inputs": _normalize_cache_input(inputs)
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
 
-I hope this letter finds you well. I would like to request a meeting to discuss {student_name}'s progress in {subject}.
+async def _get_cached(cache_key: str, task: str):
+    """Look up a cached response, counting the hit or miss for task"""
+    cached = await response_cache.aget(cache_key)
+    ai_metrics.record_cache(task, cached is not None)
+    return cached
 
-{key_points + '\n\n' if key_points else ''}I believe it would be beneficial for us to meet and discuss {student_name}'s academic and social development. This will allow us to work together to ensure {student_name} continues to thrive.
-
-Discussion topics:
-• Academic progress and achievements
-• Areas for continued growth
-• Strategies for home support
-• Goals for the remainder of the term
+def _is_json_object_response(response) -> bool:
+    try:
+        return isinstance(json.loads(response.choices[0].message.content), dict)
+    except (ValueError, TypeError, AttributeError, IndexError):
+        return False
 
-{additional_context + '\n\n' if additional_context else ''}Please let me know your availability for a meeting in the coming weeks. I am flexible with scheduling and can accommodate your preferred time.
+async def _create_completion(cache_key: str, openai_client, task: str = None, priority: Priority = Priority.STANDARD,
+                             validate: Optional[Callable[[Any], bool]] = None, **kwargs):
+    """Create a chat completion on the task's routed model, escalating to a higher tier when the output is invalid.
+    
+    Without an explicit model the task's tier picks one. validate checks the
+    response; JSON-mode requests are validated as JSON objects by default.
+    When validation fails and escalation is enabled, the request is repeated
+    on the next tier's model and that response is returned instead.
+    """
+    kwargs.setdefault("model", model_router.model_for(task))
+    if validate is None and (kwargs.get("response_format") or {}).get("type") == "json_object":
+        validate = _is_json_object_response
+        
+    response = await _call_model(cache_key, openai_client, task, priority, **kwargs)
+    escalated = model_router.escalation_for(kwargs["model"]) if validate is not None else None
+    while escalated is not None and not validate(response):
+        model_router.record_escalation(task, kwargs["model"], escalated)
+        kwargs["model"] = escalated
+        response = await _call_model(f"{cache_key}:{escalated}", openai_client, task, priority, **kwargs)
+        escalated = model_router.escalation_for(escalated)
+    return response
 
-Looking forward to our conversation,
-[Teacher Name]
-{subject} Teacher
+async def _call_model(cache_key: str, openai_client, task: str, priority: Priority, **kwargs):
+    """Create a chat completion through _guarded_call.
+    
+    Raises CircuitOpenError without calling the provider while the circuit
+    breaker is open, and asyncio.TimeoutError once the task's deadline passes;
+    callers fall back to their local templates in both cases.
+    """
+    if openai_client is None:
+        raise RuntimeError("OpenAI API key not configured")
+    return await _guarded_call(
+        cache_key, task, kwargs["model"], priority,
+        lambda: openai_client.chat.completions.create(**kwargs),
+        usage=lambda response: (
+            getattr(getattr(response, "usage", None), "prompt_tokens", 0) or 0,
+            getattr(getattr(response, "usage", None), "completion_tokens", 0) or 0
+        )
+    )
 
-Date: {date}""",
-        
-        'homework_reminder': f"""Dear {parent_name},
+async def _guarded_call(cache_key: str, task: str, model: str, priority: Priority,
+                        request: Callable[[], Any], usage: Callable[[Any], Tuple[int, int]],
+                        breaker: Optional[CircuitBreaker] = None):
+    """Run one model request behind the shared guards, coalescing concurrent calls for the same cache key.
+    
+    The request goes through the circuit breaker (ai_circuit_breaker unless
+    another is given), a dispatcher slot, hedging and the task's deadline,
+    and its outcome is recorded in the metrics. usage(response) returns the
+    (prompt, completion) token counts. Every provider uses this, so they
+    queue, time out and trip the breaker the same way.
+    """
+    if breaker is None:
+        breaker = ai_circuit_breaker
+    if not breaker.allow():
+        ai_metrics.record_request(task, model, "circuit_open")
+        raise CircuitOpenError("AI provider circuit is open")
+        
+    async def call():
+        started = time.monotonic()
+        try:
+            response = await request()
+        except Exception:
+            breaker.record_failure()
+            ai_metrics.record_request(task, model, "error", time.monotonic() - started)
+            raise
+        latency = time.monotonic() - started
+        breaker.record_success(latency)
+        # Tracked per model: fast and standard tiers have different tails
+        ai_latencies.record(f"{task}:{model}", latency)
+        prompt_tokens, completion_tokens = usage(response)
+        ai_metrics.record_request(
+            task, model, "success", latency,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens
+        )
+        return response
+        
+    hedge_after = None
+    if settings.AI_HEDGING_ENABLED and priority != Priority.BATCH:
+        # Hedge only calls slower than this task's recent p95
+        hedge_after = max(settings.AI_HEDGE_MIN_DELAY, ai_latencies.percentile(f"{task}:{model}", 0.95) or float("inf"))
+        
+    async def run_with_deadline():
+        try:
+            return await asyncio.wait_for(
+                hedged(lambda: ai_dispatcher.run(priority, call), hedge_after),
+                timeout=_task_deadlines.get(task, settings.AI_DEFAULT_DEADLINE)
+            )
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            ai_metrics.record_request(task, model, "timeout")
+            logger.warning(f"AI call for {task} exceeded its deadline")
+            raise
+            
+    try:
+        return await inflight_requests.do(cache_key, run_with_deadline)
+    except asyncio.CancelledError:
+        # E.g. a job timeout or cancel; a half-open trial permit must not leak
+        breaker.release()
+        raise
 
-I hope this letter finds you well. I wanted to reach out regarding {student_name}'s homework completion in {subject}.
+def _deadline_for(task: str) -> float:
+    """Monotonic time by which a call for task must have finished, including queueing"""
+    return time.monotonic() + _task_deadlines.get(task, settings.AI_DEFAULT_DEADLINE)
 
-{key_points + '\n\n' if key_points else ''}Consistent homework completion is essential for reinforcing classroom learning and building strong study habits. I wanted to share some strategies that might help {student_name} stay on track.
+async def _open_stream(openai_client, deadline: float, **kwargs):
+    """Start a streamed completion, raising asyncio.TimeoutError if it is not open by the deadline"""
+    return await asyncio.wait_for(
+        openai_client.chat.completions.create(stream=True, **kwargs),
+        timeout=max(0.0, deadline - time.monotonic())
+    )
 
-Homework support strategies:
-• Establish a regular homework routine
-• Create a quiet, organized study space
-• Break larger assignments into smaller tasks
-• Encourage {student_name} to ask for help when needed
+async def _stream_chunks(stream, deadline: float) -> AsyncIterator:
+    """Iterate a provider stream, raising asyncio.TimeoutError once the deadline passes.
+    
+    Streams hold a dispatcher slot while they run, so a provider that stalls
+    mid-stream must not keep the slot beyond the task's deadline.
+    """
+    iterator = stream.__aiter__()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(iterator.__anext__(), timeout=max(0.0, deadline - time.monotonic()))
+        except StopAsyncIteration:
+            return
+        yield chunk
 
-{additional_context + '\n\n' if additional_context else ''}Please feel free to contact me if you have any questions about assignments or if {student_name} needs additional support with the material.
+def _stream_outcome(error: Exception) -> str:
+    return "timeout" if isinstance(error, asyncio.TimeoutError) else "error"
 
-Best regards,
-[Teacher Name]
-{subject} Teacher
+def get_fallback_parent_letter(student_context, content_type, tone, language):
+    """Generate enhanced fallback parent letter when AI is unavailable"""
+    return template_engine.parent_letter(student_context, content_type, tone, language)
 
-Date: {date}"""
+def _build_parent_letter_messages(student_context, content_type, tone, language) -> List[Dict]:
+    """Build the chat messages for a parent letter request"""
+    language_names = {
+        'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
     }
     
-    content = templates.get(content_type, templates['progress_report'])
+    prompt = f"""Generate a professional parent letter in {language_names.get(language, 'English')}. 
+    
+    Content type: {content_type}
+    Tone: {tone}
+    Student context: {student_context}
+    
+    The letter should be formal, respectful, and provide constructive feedback or information about the student.
+    Structure it as a proper business letter with appropriate greeting and closing.
+    Include specific examples and actionable recommendations.
+    
+    Respond with JSON in this format:
+    {{
+        "content": "Full letter content",
+        "title": "Brief title for the letter",
+        "key_points": ["point1", "point2", "point3"],
+        "follow_up_suggestions": ["suggestion1", "suggestion2"]
+    }}
+    """
+    
+    return [
+        {
+            "role": "system",
+            "content": "You are an experienced teacher writing professional letters to parents. Always respond in valid JSON format."
+        },
+        {"role": "user", "content": prompt}
+    ]
+
+def _normalize_parent_letter(result: Dict) -> Dict:
     return {
-        'title': f'{content_type.replace("_", " ").title()} - {student_name}',
-        'content': content,
-        'key_points': ["Student progress update", "Continued support needed", "Open communication encouraged"],
-        'follow_up_suggestions': ["Schedule parent-teacher conference", "Monitor homework completion", "Maintain regular communication"]
+        "title": result.get("title", "Parent Letter"),
+        "content": result.get("content", "Letter content could not be generated."),
+        "key_points": result.get("key_points", []),
+        "follow_up_suggestions": result.get("follow_up_suggestions", [])
     }
 
-async def generate_parent_letter(student_context, content_type, tone, language):
+def _parent_letter_cache_key(student_context, content_type, tone, language) -> str:
+    return _get_cache_key(
+        "parent_letter",
+        student_context=student_context,
+        content_type=content_type,
+        tone=tone,
+        language=language
+    )
+
+async def generate_parent_letter(student_context, content_type, tone, language, priority: Priority = Priority.STANDARD):
     """Generate a parent letter using OpenAI with caching"""
     try:
         openai_client = _get_openai()
         if not openai_client:
             # No API key configured, use fallback immediately
+            ai_metrics.record_fallback("parent_letter")
             fallback = get_fallback_parent_letter(student_context, content_type, tone, language)
             fallback['ai_generated'] = False
             return fallback
             
-        cache_key = _get_cache_key(f"parent_letter:{content_type}:{tone}:{student_context.get('name', 'student')}")
-        cached = _get_cached_response(cache_key)
-        if cached:
+        cache_key = _parent_letter_cache_key(student_context, content_type, tone, language)
+        cached = await _get_cached(cache_key, "parent_letter")
+        if cached is not None:
             return cached
             
-        language_names = {
-            'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
-        }
-        
-        prompt = f"""Generate a professional parent letter in {language_names.get(language, 'English')}. 
-        
-        Content type: {content_type}
-        Tone: {tone}
-        Student context: {student_context}
-        
-        The letter should be formal, respectful, and provide constructive feedback or information about the student.
-        Structure it as a proper business letter with appropriate greeting and closing.
-        Include specific examples and actionable recommendations.
-        
-        Respond with JSON in this format:
-        {{
-            "title": "Brief title for the letter",
-            "content": "Full letter content",
-            "key_points": ["point1", "point2", "point3"],
-            "follow_up_suggestions": ["suggestion1", "suggestion2"]
-        }}
-        """
-        
-        response = await openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an experienced teacher writing professional letters to parents. Always respond in valid JSON format."
-                },
-                {"role": "user", "content": prompt}
-            ],
+        response = await _create_completion(
+            cache_key, openai_client,
+            task="parent_letter",
+            priority=priority,
+            messages=_build_parent_letter_messages(student_context, content_type, tone, language),
             response_format={"type": "json_object"},
             max_tokens=1200
         )
         
         result = json.loads(response.choices[0].message.content)
-        enhanced_result = {
-            "title": result.get("title", "Parent Letter"),
-            "content": result.get("content", "Letter content could not be generated."),
-            "key_points": result.get("key_points", []),
-            "follow_up_suggestions": result.get("follow_up_suggestions", [])
-        }
-        _cache_response(cache_key, enhanced_result)
+        enhanced_result = _normalize_parent_letter(result)
+        response_cache.set(cache_key, enhanced_result, task="parent_letter")
         return enhanced_result
         
     except Exception as e:
         # Fallback to template when AI fails
+        ai_metrics.record_fallback("parent_letter")
         fallback = get_fallback_parent_letter(student_context, content_type, tone, language)
         fallback['ai_generated'] = False
         return fallback
 
+async def stream_parent_letter(student_context, content_type, tone, language) -> AsyncIterator[Dict]:
+    """Stream a parent letter while it is generated.
+    
+    Yields {"type": "delta", "content": ...} with decoded pieces of the letter
+    body as the model writes them, then one {"type": "letter", "letter": ...}
+    holding the same dict generate_parent_letter would return.
+    """
+    openai_client = _get_openai()
+    cache_key = _parent_letter_cache_key(student_context, content_type, tone, language)
+    cached = await _get_cached(cache_key, "parent_letter") if openai_client else None
+    if cached is not None:
+        yield {"type": "letter", "letter": cached}
+        return
+        
+    if openai_client and ai_circuit_breaker.allow():
+        raw_parts = []
+        content_stream = JsonStringFieldStreamer("content")
+        stream = None
+        messages = _build_parent_letter_messages(student_context, content_type, tone, language)
+        model = model_router.model_for("parent_letter")
+        deadline = _deadline_for("parent_letter")
+        started = time.monotonic()
+        try:
+            async with ai_dispatcher.slot(Priority.STANDARD, adaptive=False):
+                started = time.monotonic()
+                stream = await _open_stream(
+                    openai_client, deadline,
+                    model=model,
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                    max_tokens=1200
+                )
+                async for chunk in _stream_chunks(stream, deadline):
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    raw_parts.append(delta)
+                    text = content_stream.feed(delta)
+                    if text:
+                        yield {"type": "delta", "content": text}
+                latency = time.monotonic() - started
+                    
+            # Only output that parses counts as a successful call
+            letter = _normalize_parent_letter(json.loads("".join(raw_parts)))
+            ai_circuit_breaker.record_success(latency)
+            # Streamed responses carry no usage, so tokens are estimated
+            ai_metrics.record_request(
+                "parent_letter", model, "success", latency,
+                prompt_tokens=estimate_message_tokens(messages),
+                completion_tokens=estimate_tokens("".join(raw_parts))
+            )
+            response_cache.set(cache_key, letter, task="parent_letter")
+            yield {"type": "letter", "letter": letter}
+            return
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client went away before the call had an outcome
+            ai_circuit_breaker.release()
+            raise
+        except Exception as e:
+            ai_circuit_breaker.record_failure()
+            ai_metrics.record_request("parent_letter", model, _stream_outcome(e), time.monotonic() - started)
+            logger.warning(f"Parent letter stream failed, using template: {e}")
+        finally:
+            if stream is not None:
+                await stream.response.aclose()
+                
+    ai_metrics.record_fallback("parent_letter")
+    fallback = get_fallback_parent_letter(student_context, content_type, tone, language)
+    fallback['ai_generated'] = False
+    yield {"type": "letter", "letter": fallback}
+
 def get_fallback_quiz_questions(topic, level, language, num_questions=5):
     """Generate enhanced fallback quiz questions when AI is unavailable"""
-    questions = []
-    for i in range(min(num_questions, 3)):
-        questions.append({
-            'question_text': f'What is an important concept in {topic}?',
-            'question_type': 'multiple_choice',
-            'correct_answer': 'Understanding the fundamentals',
-            'options': ['Understanding the fundamentals', 'Memorizing facts', 'Ignoring details', 'Skipping practice'],
-            'explanation': f'Understanding fundamentals is crucial for mastering {topic}.',
-            'difficulty': 'medium',
-            'learning_objective': f'Assess basic understanding of {topic} concepts'
-        })
-        questions.append({
-            'question_text': f'True or False: {topic} requires practice to master.',
-            'question_type': 'true_false', 
-            'correct_answer': 'True',
-            'options': ['True', 'False'],
-            'explanation': f'Like most subjects, {topic} requires consistent practice to achieve mastery.',
-            'difficulty': 'easy',
-            'learning_objective': f'Understand the importance of practice in {topic}'
-        })
+    return template_engine.quiz_questions(topic, level, language, num_questions)
+
+def _quiz_cache_key(topic, level, language, num_questions, avoid_questions: List[str],
+                    part: Optional[Tuple[int, int]] = None) -> str:
+    part_input = {"part": part} if part else {}
+    return _get_cache_key("quiz", topic=topic, level=level, language=language, num_questions=num_questions,
+                          avoid_questions=avoid_questions, **part_input)
+
+def _build_quiz_messages(topic, level, language, num_questions, avoid_questions: List[str],
+                         part: Optional[Tuple[int, int]] = None) -> List[Dict]:
+    language_names = {
+        'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
+    }
+    
+    avoid_block = ""
+    if avoid_questions:
+        avoid_lines = "\n".join(f"- {question}" for question in avoid_questions)
+        avoid_block = f"\n    Do not repeat or rephrase any of these existing questions:\n{avoid_lines}\n"
+    if part:
+        # Parts are generated concurrently and cannot see each other, so steer each one to its own area
+        avoid_block += (f"\n    This is part {part[0]} of {part[1]} of a larger quiz generated in parallel. Focus on "
+                        f"aspects of the topic that part {part[0]} of {part[1]} would naturally cover, so parts do not overlap.\n")
+    
+    prompt = f"""Create {num_questions} educational quiz questions on the topic "{topic}" 
+    for {level} level students in {language_names.get(language, 'English')}.
+    
+    Include a mix of multiple choice, true/false, and short answer questions.
+    Ensure questions are engaging, accurate, and progressively challenging.
+    Include detailed explanations for each correct answer.
+    {avoid_block}
+    Respond with JSON in this format:
+    {{
+        "questions": [
+            {{
+                "question_text": "Question text",
+                "question_type": "multiple_choice|true_false|short_answer",
+                "correct_answer": "Correct answer",
+                "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+                "explanation": "Detailed explanation of the correct answer",
+                "difficulty": "easy|medium|hard",
+                "learning_objective": "What this question tests"
+            }}
+        ],
+        "metadata": {{
+            "topic": "{topic}",
+            "level": "{level}",
+            "estimated_time": "10 minutes"
+        }}
+    }}
+    """
+    return [
+        {
+            "role": "system",
+            "content": "You are an educational content creator. Create engaging and accurate quiz questions with detailed explanations. Always respond in valid JSON format."
+        },
+        {"role": "user", "content": prompt}
+    ]
+
+def _is_quiz_question(question) -> bool:
+    return isinstance(question, dict) and bool(question.get("question_text"))
+
+async def _request_quiz_chunk(topic, level, language, num_questions=5, avoid_questions: List[str] = None,
+                              priority: Priority = Priority.STANDARD, part: Optional[Tuple[int, int]] = None) -> List[Dict]:
+    """Ask the model for one batch of quiz questions; raises when no questions could be generated"""
+    openai_client = _get_openai()
+    if not openai_client:
+        raise RuntimeError("OpenAI API key not configured")
+        
+    avoid_questions = list(avoid_questions or [])
+    cache_key = _quiz_cache_key(topic, level, language, num_questions, avoid_questions, part)
+    cached = await _get_cached(cache_key, "quiz")
+    if cached is not None:
+        return cached
+        
+    response = await _create_completion(
+        cache_key, openai_client,
+        task="quiz",
+        priority=priority,
+        messages=_build_quiz_messages(topic, level, language, num_questions, avoid_questions, part),
+        response_format={"type": "json_object"},
+        max_tokens=2000
+    )
+    
+    result = json.loads(response.choices[0].message.content)
+    questions = [question for question in result.get("questions", []) if _is_quiz_question(question)]
+    if not questions:
+        raise ValueError("Model returned no quiz questions")
+    response_cache.set(cache_key, questions, task="quiz")
+    return questions
+
+def _question_shingles(question: Dict) -> frozenset:
+    """Word pairs of a question's normalized text; pairs keep word order, unlike a bag of words"""
+    words = re.findall(r"\w+", str(question.get("question_text", "")).lower())
+    return frozenset(zip(words, words[1:])) if len(words) > 1 else frozenset(words)
+
+def _dedupe_questions(questions: List[Dict], existing: List[Dict] = None, threshold: float = 0.8) -> List[Dict]:
+    """Drop questions whose wording is (nearly) the same as an earlier one, keeping the first in order"""
+    kept = [_question_shingles(question) for question in existing or []]
+    unique = []
+    for question in questions:
+        shingles = _question_shingles(question)
+        if any(shingles == other or (shingles and other and len(shingles & other) / len(shingles | other) >= threshold)
+               for other in kept):
+            continue
+        kept.append(shingles)
+        unique.append(question)
+    return unique
+
+def _quiz_part_sizes(num_questions: int) -> List[int]:
+    """Split a quiz into evenly sized parts of at most QUIZ_CHUNK_SIZE questions"""
+    parts = max(1, -(-num_questions // max(1, settings.QUIZ_CHUNK_SIZE)))
+    return [num_questions // parts + (1 if index < num_questions % parts else 0) for index in range(parts)]
+
+async def _request_quiz_questions(topic, level, language, num_questions=5, avoid_questions: List[str] = None,
+                                  priority: Priority = Priority.STANDARD) -> List[Dict]:
+    """Ask the model for quiz questions; raises when no questions could be generated.
+
+    Requests larger than QUIZ_CHUNK_SIZE are split into parts generated in
+    parallel, so latency follows the slowest part instead of the question
+    count. Near-duplicates across parts are dropped and topped up once.
+    """
+    sizes = _quiz_part_sizes(num_questions)
+    if len(sizes) == 1:
+        return await _request_quiz_chunk(topic, level, language, num_questions, avoid_questions, priority)
+    
+    chunk_size = max(1, settings.QUIZ_CHUNK_SIZE)
+    parts = len(sizes)
+    semaphore = asyncio.Semaphore(settings.QUIZ_CHUNK_CONCURRENCY)
+    
+    async def request_part(index, size):
+        async with semaphore:
+            return await _request_quiz_chunk(topic, level, language, size, avoid_questions, priority,
+                                             part=(index + 1, parts))
+    
+    results = await asyncio.gather(*(request_part(index, size) for index, size in enumerate(sizes)),
+                                   return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if len(errors) == len(results):
+        raise errors[0]
+    if errors:
+        logger.warning(f"{len(errors)} of {parts} quiz parts failed: {errors[0]}")
+    
+    # Merge in part order, each part trimmed to its share so one chatty part cannot crowd out the rest
+    questions = _dedupe_questions([
+        question
+        for result, size in zip(results, sizes) if not isinstance(result, BaseException)
+        for question in result[:size]
+    ])
+    shortfall = num_questions - len(questions)
+    if shortfall > 0:
+        # One top-up round for questions lost to failed parts or duplicates
+        avoid = list(avoid_questions or []) + [question["question_text"] for question in questions]
+        extra = await asyncio.gather(*(
+            _request_quiz_chunk(topic, level, language, min(chunk_size, shortfall - start), avoid, priority)
+            for start in range(0, shortfall, chunk_size)
+        ), return_exceptions=True)
+        for result in extra:
+            if isinstance(result, BaseException):
+                logger.warning(f"Quiz top-up request failed: {result}")
+            else:
+                questions += _dedupe_questions(result, existing=questions)
     return questions[:num_questions]
 
 async def generate_quiz_questions(topic, level, language, num_questions=5):
     """Generate quiz questions using OpenAI with caching and enhanced features"""
     try:
-        openai_client = _get_openai()
-        if not openai_client:
-            # No API key configured, use fallback immediately
-            return get_fallback_quiz_questions(topic, level, language, num_questions)
-            
-        cache_key = _get_cache_key(f"quiz:{topic}:{level}:{language}:{num_questions}")
-        cached = _get_cached_response(cache_key)
-        if cached:
-            return cached
-            
-        language_names = {
-            'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
-        }
-        
-        prompt = f"""Create {num_questions} educational quiz questions on the topic "{topic}" 
-        for {level} level students in {language_names.get(language, 'English')}.
-        
-        Include a mix of multiple choice, true/false, and short answer questions.
-        Ensure questions are engaging, accurate, and progressively challenging.
-        Include detailed explanations for each correct answer.
-        
-        Respond with JSON in this format:
-        {{
-            "questions": [
-                {{
-                    "question_text": "Question text",
-                    "question_type": "multiple_choice|true_false|short_answer",
-                    "correct_answer": "Correct answer",
-                    "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
-                    "explanation": "Detailed explanation of the correct answer",
-                    "difficulty": "easy|medium|hard",
-                    "learning_objective": "What this question tests"
-                }}
-            ],
-            "metadata": {{
-                "topic": "{topic}",
-                "level": "{level}",
-                "estimated_time": "10 minutes"
-            }}
-        }}
-        """
-        
-        response = await openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an educational content creator. Create engaging and accurate quiz questions with detailed explanations. Always respond in valid JSON format."
-                },
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=2000
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        questions = result.get("questions", [])
-        _cache_response(cache_key, questions)
-        return questions
-        
+        return await _request_quiz_questions(topic, level, language, num_questions)
     except Exception as e:
         # Fallback to template questions when AI fails
+        ai_metrics.record_fallback("quiz")
         return get_fallback_quiz_questions(topic, level, language, num_questions)
 
+async def _stream_quiz_chunk(openai_client, topic, level, language, num_questions, avoid_questions: List[str],
+                             priority: Priority, part: Optional[Tuple[int, int]] = None) -> AsyncIterator[Dict]:
+    """Stream one batch of quiz questions, yielding each as soon as its object closes; raises on failure"""
+    cache_key = _quiz_cache_key(topic, level, language, num_questions, avoid_questions, part)
+    cached = await _get_cached(cache_key, "quiz")
+    if cached is not None:
+        for question in cached:
+            yield question
+        return
+    model = model_router.model_for("quiz")
+    if not ai_circuit_breaker.allow():
+        ai_metrics.record_request("quiz", model, "circuit_open")
+        raise CircuitOpenError("AI provider circuit is open")
+        
+    messages = _build_quiz_messages(topic, level, language, num_questions, avoid_questions, part)
+    items = JsonArrayItemStreamer("questions")
+    raw_parts = []
+    questions = []
+    stream = None
+    deadline = _deadline_for("quiz")
+    started = time.monotonic()
+    try:
+        async with ai_dispatcher.slot(priority, adaptive=False):
+            started = time.monotonic()
+            stream = await _open_stream(
+                openai_client, deadline,
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                max_tokens=2000
+            )
+            async for chunk in _stream_chunks(stream, deadline):
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                raw_parts.append(delta)
+                for question in items.feed(delta):
+                    if _is_quiz_question(question):
+                        questions.append(question)
+                        yield question
+                        
+            latency = time.monotonic() - started
+            ai_circuit_breaker.record_success(latency)
+            # Streamed responses carry no usage, so tokens are estimated
+            ai_metrics.record_request(
+                "quiz", model, "success", latency,
+                prompt_tokens=estimate_message_tokens(messages),
+                completion_tokens=estimate_tokens("".join(raw_parts))
+            )
+    except (asyncio.CancelledError, GeneratorExit):
+        # The client went away before the call had an outcome
+        ai_circuit_breaker.release()
+        raise
+    except Exception as e:
+        ai_circuit_breaker.record_failure()
+        ai_metrics.record_request("quiz", model, _stream_outcome(e), time.monotonic() - started)
+        raise
+    finally:
+        # Release the upstream connection if the client went away mid-stream
+        if stream is not None:
+            await stream.response.aclose()
+            
+    if not questions:
+        raise ValueError("Model returned no quiz questions")
+    response_cache.set(cache_key, questions, task="quiz")
+
+async def stream_quiz_questions(topic, level, language, num_questions=5, avoid_questions: List[str] = None,
+                                priority: Priority = Priority.STANDARD) -> AsyncIterator[Dict]:
+    """Stream quiz questions while the model writes them.
+    
+    Yields {"type": "question", "question": ...} as soon as each question
+    object is complete, then {"type": "done", "questions": [...], "ai_generated": ...}
+    with the full list. Parts of a large quiz stream concurrently, so their
+    questions arrive interleaved; each part is cached under the same key
+    generate_quiz_questions uses.
+    """
+    avoid_questions = list(avoid_questions or [])
+    openai_client = _get_openai()
+    questions = []
+    if openai_client:
+        sizes = _quiz_part_sizes(num_questions)
+        queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(settings.QUIZ_CHUNK_CONCURRENCY)
+        
+        async def pump(index, size):
+            part = (index + 1, len(sizes)) if len(sizes) > 1 else None
+            try:
+                async with semaphore:
+                    received = 0
+                    async for question in _stream_quiz_chunk(openai_client, topic, level, language, size,
+                                                             avoid_questions, priority, part):
+                        # Keep reading past the part's share so the complete part still gets cached
+                        if received < size:
+                            await queue.put(question)
+                        received += 1
+            except Exception as e:
+                logger.warning(f"Quiz stream part {index + 1} of {len(sizes)} failed: {e}")
+            finally:
+                await queue.put(None)
+                
+        tasks = [asyncio.create_task(pump(index, size)) for index, size in enumerate(sizes)]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                question = await queue.get()
+                if question is None:
+                    remaining -= 1
+                elif _dedupe_questions([question], existing=questions):
+                    questions.append(question)
+                    yield {"type": "question", "question": question}
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            
+        shortfall = num_questions - len(questions)
+        if questions and shortfall > 0:
+            try:
+                extra = await _request_quiz_questions(
+                    topic, level, language, shortfall,
+                    avoid_questions + [question["question_text"] for question in questions], priority
+                )
+                for question in _dedupe_questions(extra, existing=questions)[:shortfall]:
+                    questions.append(question)
+                    yield {"type": "question", "question": question}
+            except Exception as e:
+                logger.warning(f"Quiz top-up request failed, returning {len(questions)} of {num_questions} questions: {e}")
+        if questions:
+            yield {"type": "done", "questions": questions, "ai_generated": True}
+            return
+            
+    ai_metrics.record_fallback("quiz")
+    questions = get_fallback_quiz_questions(topic, level, language, num_questions)
+    for question in questions:
+        yield {"type": "question", "question": question}
+    yield {"type": "done", "questions": questions, "ai_generated": False}
+
+_CHAT_DEMO_RESPONSE = {
+    "response": "Hello! I'm LehrKI's AI assistant. I can help you with educational questions, quiz creation, and learning support. However, my AI features are currently in demo mode. What would you like to know about our platform?",
+    "suggestions": ["Tell me about quiz creation", "How do I create a parent letter?", "What features are available?"],
+    "context_aware": False
+}
+
+_CHAT_ERROR_RESPONSE = {
+    "response": "I'm sorry, I'm currently in demo mode. I can still help you navigate the platform and answer basic questions about LehrKI's features!",
+    "suggestions": ["Show me the quiz creator", "How do parent letters work?", "What analytics are available?"],
+    "context_aware": False
+}
+
+def _build_chat_messages(message, user_role, language, history: List[Dict]) -> List[Dict]:
+    """Assemble the system prompt, recent history and user message for a chat completion"""
+    language_names = {
+        'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
+    }
+    
+    role_context = {
+        'student': 'You are helping a student with their learning. Be encouraging, educational, and provide study tips.',
+        'teacher': 'You are assisting a teacher with educational tools, classroom management, and pedagogical advice.',
+        'admin': 'You are helping an administrator with platform management, user support, and system insights.',
+        'parent': 'You are helping a parent understand their child\'s educational progress and how to support learning at home.'
+    }
+    
+    system_prompt = f"""You are LehrKI, an AI assistant for an educational platform.
+    {role_context.get(user_role, 'You are helping a user with educational content.')}
+
+    Always respond in {language_names.get(language, 'English')}.
+    Be helpful, professional, and educational in your responses.
+    Provide actionable advice and specific examples when possible.
+    If asked about technical issues, direct users to contact support.
+    Keep responses concise but informative.
+    """
+    
+    messages = [{"role": "system", "content": system_prompt}]
+    
+    # Add conversation history for context
+    if history:
+        messages.extend(history)
+        
+    messages.append({"role": "user", "content": message})
+    return messages
+
 async def generate_chatbot_response(message, user_role, language, conversation_history: List[Dict] = None):
     """Generate enhanced chatbot response with context awareness"""
     try:
         openai_client = _get_openai()
         if not openai_client:
             # No API key configured, provide helpful fallback response
-            return {
-                "response": f"Hello! I'm LehrKI's AI assistant. I can help you with educational questions, quiz creation, and learning support. However, my AI features are currently in demo mode. What would you like to know about our platform?",
-                "suggestions": ["Tell me about quiz creation", "How do I create a parent letter?", "What features are available?"],
-                "context_aware": False
-            }
+            ai_metrics.record_fallback("chat")
+            return dict(_CHAT_DEMO_RESPONSE)
             
-        cache_key = _get_cache_key(f"chat:{message[:50]}:{user_role}:{language}")
-        cached = _get_cached_response(cache_key)
-        if cached:
+        history = trim_history(conversation_history or [], TASK_BUDGETS["chat_history"])
+        cache_key = _get_cache_key("chat", message=message, user_role=user_role, language=language, history=history)
+        cached = await _get_cached(cache_key, "chat")
+        if cached is not None:
             return cached
             
-        language_names = {
-            'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
-        }
-        
-        role_context = {
-            'student': 'You are helping a student with their learning. Be encouraging, educational, and provide study tips.',
-            'teacher': 'You are assisting a teacher with educational tools, classroom management, and pedagogical advice.',
-            'admin': 'You are helping an administrator with platform management, user support, and system insights.',
-            'parent': 'You are helping a parent understand their child\'s educational progress and how to support learning at home.'
-        }
-        
-        system_prompt = f"""You are LehrKI, an AI assistant for an educational platform.
-        {role_context.get(user_role, 'You are helping a user with educational content.')}
-
-        Always respond in {language_names.get(language, 'English')}.
-        Be helpful, professional, and educational in your responses.
-        Provide actionable advice and specific examples when possible.
-        If asked about technical issues, direct users to contact support.
-        Keep responses concise but informative.
-        """
-        
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add conversation history for context
-        if conversation_history:
-            messages.extend(conversation_history[-6:])  # Last 6 messages for context
-            
-        messages.append({"role": "user", "content": message})
-        
-        response = await openai_client.chat.completions.create(
-            model="gpt-4o",
+        # Answers that depend on earlier turns are never shared between conversations
+        use_semantic_cache = settings.CHAT_SEMANTIC_CACHE_ENABLED and not history
+        if use_semantic_cache:
+            similar = chat_semantic_cache.get(message, scope=(user_role, language), language=language)
+            ai_metrics.record_cache("chat", similar is not None, tier="semantic")
+            if similar is not None:
+                return similar
+                
+        messages = _build_chat_messages(message, user_role, language, history)
+        
+        response = await _create_completion(
+            cache_key, openai_client,
+            task="chat",
+            priority=Priority.INTERACTIVE,
             messages=messages,
             max_tokens=600,
             temperature=0.7
@@ -404,22 +899,126 @@ async def generate_chatbot_response(message, user_role, language, conversation_h
             "suggestions": [],  # Could be enhanced with follow-up suggestions
             "context_aware": bool(conversation_history)
         }
-        _cache_response(cache_key, result)
+        response_cache.set(cache_key, result, task="chat")
+        if use_semantic_cache:
+            chat_semantic_cache.set(message, result, scope=(user_role, language), language=language)
         return result
         
     except Exception as e:
-        return {
-            "response": "I'm sorry, I'm currently in demo mode. I can still help you navigate the platform and answer basic questions about LehrKI's features!",
-            "suggestions": ["Show me the quiz creator", "How do parent letters work?", "What analytics are available?"],
-            "context_aware": False
-        }
+        ai_metrics.record_fallback("chat")
+        return dict(_CHAT_ERROR_RESPONSE)
+
+async def stream_chatbot_response(message, user_role, language, conversation_history: List[Dict] = None) -> AsyncIterator[Dict]:
+    """Stream a chatbot response as events.
+    
+    Yields {"type": "delta", "content": ...} for each token delta from the model,
+    or a single {"type": "message", ...} carrying a whole response (cache hit,
+    demo mode or failure before any delta), followed by {"type": "done"}.
+    The complete text is cached under the same key as generate_chatbot_response.
+    """
+    openai_client = _get_openai()
+    if not openai_client:
+        ai_metrics.record_fallback("chat")
+        yield {"type": "message", **_CHAT_DEMO_RESPONSE}
+        yield {"type": "done"}
+        return
+        
+    history = trim_history(conversation_history or [], TASK_BUDGETS["chat_history"])
+    cache_key = _get_cache_key("chat", message=message, user_role=user_role, language=language, history=history)
+    use_semantic_cache = settings.CHAT_SEMANTIC_CACHE_ENABLED and not history
+    cached = await _get_cached(cache_key, "chat")
+    if cached is None and use_semantic_cache:
+        cached = chat_semantic_cache.get(message, scope=(user_role, language), language=language)
+        ai_metrics.record_cache("chat", cached is not None, tier="semantic")
+    if cached is not None:
+        yield {"type": "message", "cached": True, **cached}
+        yield {"type": "done"}
+        return
+        
+    model = model_router.model_for("chat")
+    if not ai_circuit_breaker.allow():
+        ai_metrics.record_request("chat", model, "circuit_open")
+        ai_metrics.record_fallback("chat")
+        yield {"type": "message", **_CHAT_ERROR_RESPONSE}
+        yield {"type": "done"}
+        return
+        
+    messages = _build_chat_messages(message, user_role, language, history)
+    parts = []
+    first_token_latency = None
+    stream = None
+    deadline = _deadline_for("chat")
+    started = time.monotonic()
+    try:
+        async with ai_dispatcher.slot(Priority.INTERACTIVE, adaptive=False):
+            started = time.monotonic()
+            stream = await _open_stream(
+                openai_client, deadline,
+                model=model,
+                messages=messages,
+                max_tokens=600,
+                temperature=0.7
+            )
+            async for chunk in _stream_chunks(stream, deadline):
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token_latency is None:
+                        first_token_latency = time.monotonic() - started
+                    parts.append(delta)
+                    yield {"type": "delta", "content": delta}
+    except (asyncio.CancelledError, GeneratorExit):
+        # The client went away before the call had an outcome
+        ai_circuit_breaker.release()
+        raise
+    except Exception as e:
+        ai_circuit_breaker.record_failure()
+        ai_metrics.record_request("chat", model, _stream_outcome(e), time.monotonic() - started)
+        logger.warning(f"Chat stream failed: {e}")
+        if parts:
+            yield {"type": "error", "message": "The response was interrupted. Please try again."}
+        else:
+            ai_metrics.record_fallback("chat")
+            yield {"type": "message", **_CHAT_ERROR_RESPONSE}
+        yield {"type": "done"}
+        return
+    finally:
+        # Release the upstream connection if the client went away mid-stream
+        if stream is not None:
+            await stream.response.aclose()
+        
+    # Recorded once the stream ends; time to first token is what the breaker should judge a chat stream by
+    latency = time.monotonic() - started
+    ai_circuit_breaker.record_success(latency if first_token_latency is None else first_token_latency)
+    # Streamed responses carry no usage, so tokens are estimated
+    ai_metrics.record_request(
+        "chat", model, "success", latency,
+        prompt_tokens=estimate_message_tokens(messages),
+        completion_tokens=estimate_tokens("".join(parts))
+    )
+    result = {
+        "response": "".join(parts),
+        "suggestions": [],
+        "context_aware": bool(conversation_history)
+    }
+    response_cache.set(cache_key, result, task="chat")
+    if use_semantic_cache:
+        chat_semantic_cache.set(message, result, scope=(user_role, language), language=language)
+    yield {"type": "done"}
 
 async def assess_quiz_answers(quiz_questions, user_answers, language, detailed_analysis=True):
     """Provide enhanced assessment feedback for quiz answers"""
     try:
-        cache_key = _get_cache_key(f"assess:{str(quiz_questions)[:50]}:{str(user_answers)[:50]}")
-        cached = _get_cached_response(cache_key)
-        if cached:
+        cache_key = _get_cache_key(
+            "assessment",
+            quiz_questions=quiz_questions,
+            user_answers=user_answers,
+            language=language,
+            detailed_analysis=detailed_analysis
+        )
+        cached = await _get_cached(cache_key, "assessment")
+        if cached is not None:
             return cached
             
         language_names = {
@@ -460,8 +1059,9 @@ async def assess_quiz_answers(quiz_questions, user_answers, language, detailed_a
         }}
         """
         
-        response = await _get_openai().chat.completions.create(
-            model="gpt-4o",
+        response = await _create_completion(
+            cache_key, _get_openai(),
+            task="assessment",
             messages=[
                 {
                     "role": "system",
@@ -474,18 +1074,64 @@ async def assess_quiz_answers(quiz_questions, user_answers, language, detailed_a
         )
         
         result = json.loads(response.choices[0].message.content)
-        _cache_response(cache_key, result)
+        response_cache.set(cache_key, result, task="assessment")
         return result
         
     except Exception as e:
         raise Exception(f"Failed to assess quiz answers: {e}")
 
+# Map-reduce summaries run at most this many chunk requests at once per document
+_SUMMARY_MAP_CONCURRENCY = 4
+
+async def _summarize_chunk(chunk: str, language: str, semaphore: asyncio.Semaphore) -> str:
+    """Map step: condense one section of a long document into plain-text notes"""
+    language_names = {
+        'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
+    }
+    
+    cache_key = _get_cache_key("summary_chunk", content=chunk, language=language)
+    cached = await _get_cached(cache_key, "summary_chunk")
+    if cached is not None:
+        return cached["notes"]
+        
+    async with semaphore:
+        response = await _create_completion(
+            cache_key, _get_openai(),
+            task="summary_chunk",
+            messages=[
+                {"role": "system", "content": "You are an expert content summarizer."},
+                {"role": "user", "content": f"Write concise notes in {language_names.get(language, 'English')} covering every important fact and idea of this section of a longer document:\n\n{chunk}"}
+            ],
+            max_tokens=500
+        )
+    
+    notes = response.choices[0].message.content
+    response_cache.set(cache_key, {"notes": notes}, task="summary_chunk")
+    return notes
+
+async def _condense_content(content: str, language: str) -> str:
+    """Reduce content that exceeds the summary budget to notes that fit it"""
+    budget = TASK_BUDGETS["summary"]
+    semaphore = asyncio.Semaphore(_SUMMARY_MAP_CONCURRENCY)
+    while estimate_tokens(content) > budget:
+        chunks = chunk_text(content, budget)
+        notes = await asyncio.gather(*(_summarize_chunk(chunk, language, semaphore) for chunk in chunks))
+        condensed = "\n\n".join(notes)
+        if len(chunks) == 1 or estimate_tokens(condensed) >= estimate_tokens(content):
+            # Notes did not get shorter; stop rather than loop forever
+            return condensed
+        content = condensed
+    return content
+
 async def summarize_content(content: str, summary_type: str = "brief", language: str = "en") -> Dict:
     """AI-powered content summarization service"""
     try:
-        cache_key = _get_cache_key(f"summarize:{content[:100]}:{summary_type}:{language}")
-        cached = _get_cached_response(cache_key)
-        if cached:
+        # Brief and bullet-point summaries are short enough for the fast tier
+        summary_route = "summary" if summary_type in ("brief", "bullet_points") else "summary_detailed"
+        summary_model = model_router.model_for(summary_route)
+        cache_key = _get_cache_key("summary", model=summary_model, content=content, summary_type=summary_type, language=language)
+        cached = await _get_cached(cache_key, "summary")
+        if cached is not None:
             return cached
             
         language_names = {
@@ -499,7 +1145,13 @@ async def summarize_content(content: str, summary_type: str = "brief", language:
             "study_notes": "Create study notes with important concepts highlighted"
         }
         
-        prompt = f"""{summary_types.get(summary_type, summary_types['brief'])} of the following content in {language_names.get(language, 'English')}:
+        # Documents over the prompt budget are summarized section by section first
+        is_condensed = estimate_tokens(content) > TASK_BUDGETS["summary"]
+        if is_condensed:
+            content = await _condense_content(content, language)
+            
+        source = "the following notes taken from a long document" if is_condensed else "the following content"
+        prompt = f"""{summary_types.get(summary_type, summary_types['brief'])} of {source} in {language_names.get(language, 'English')}:
         
         Content: {content}
         
@@ -512,8 +1164,10 @@ async def summarize_content(content: str, summary_type: str = "brief", language:
         }}
         """
         
-        response = await _get_openai().chat.completions.create(
-            model="gpt-4o",
+        response = await _create_completion(
+            cache_key, _get_openai(),
+            task="summary",
+            model=summary_model,
             messages=[
                 {"role": "system", "content": "You are an expert content summarizer. Always respond in valid JSON format."},
                 {"role": "user", "content": prompt}
@@ -523,10 +1177,11 @@ async def summarize_content(content: str, summary_type: str = "brief", language:
         )
         
         result = json.loads(response.choices[0].message.content)
-        _cache_response(cache_key, result)
+        response_cache.set(cache_key, result, task="summary")
         return result
         
     except Exception as e:
+        ai_metrics.record_fallback("summary")
         return {
             "summary": "Content summarization temporarily unavailable.",
             "key_points": ["Please try again later"],
@@ -534,65 +1189,77 @@ async def summarize_content(content: str, summary_type: str = "brief", language:
             "reading_time": "N/A"
         }
 
+async def _request_learning_path(subject: str, current_level: str, target_level: str, timeframe: str, language: str = "en") -> Dict:
+    """Ask the model for a learning path; raises when it cannot be generated"""
+    cache_key = _get_cache_key(
+        "learning_path",
+        subject=subject,
+        current_level=current_level,
+        target_level=target_level,
+        timeframe=timeframe,
+        language=language
+    )
+    cached = await _get_cached(cache_key, "learning_path")
+    if cached is not None:
+        return cached
+        
+    language_names = {
+        'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
+    }
+    
+    prompt = f"""Create a detailed learning path in {language_names.get(language, 'English')} for:
+    
+    Subject: {subject}
+    Current Level: {current_level}
+    Target Level: {target_level}
+    Timeframe: {timeframe}
+    
+    Include:
+    1. Learning phases with specific goals
+    2. Recommended resources and activities
+    3. Assessment checkpoints
+    4. Time allocation for each phase
+    5. Prerequisites and dependencies
+    
+    Respond with JSON:
+    {{
+        "learning_path": {{
+            "phase_1": {{
+                "title": "Foundation Building",
+                "duration": "2 weeks",
+                "goals": ["goal1", "goal2"],
+                "activities": ["activity1", "activity2"],
+                "resources": ["resource1", "resource2"],
+                "assessment": "checkpoint description"
+            }}
+        }},
+        "total_duration": "{timeframe}",
+        "difficulty_progression": ["beginner", "intermediate", "advanced"],
+        "success_metrics": ["metric1", "metric2"]
+    }}
+    """
+    
+    response = await _create_completion(
+        cache_key, _get_openai(),
+        task="learning_path",
+        messages=[
+            {"role": "system", "content": "You are an educational curriculum designer. Create structured learning paths. Always respond in valid JSON format."},
+            {"role": "user", "content": prompt}
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=1500
+    )
+    
+    result = json.loads(response.choices[0].message.content)
+    response_cache.set(cache_key, result, task="learning_path")
+    return result
+
 async def generate_learning_path(subject: str, current_level: str, target_level: str, timeframe: str, language: str = "en") -> Dict:
     """Generate personalized learning path"""
     try:
-        cache_key = _get_cache_key(f"learning_path:{subject}:{current_level}:{target_level}:{timeframe}")
-        cached = _get_cached_response(cache_key)
-        if cached:
-            return cached
-            
-        language_names = {
-            'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
-        }
-        
-        prompt = f"""Create a detailed learning path in {language_names.get(language, 'English')} for:
-        
-        Subject: {subject}
-        Current Level: {current_level}
-        Target Level: {target_level}
-        Timeframe: {timeframe}
-        
-        Include:
-        1. Learning phases with specific goals
-        2. Recommended resources and activities
-        3. Assessment checkpoints
-        4. Time allocation for each phase
-        5. Prerequisites and dependencies
-        
-        Respond with JSON:
-        {{
-            "learning_path": {{
-                "phase_1": {{
-                    "title": "Foundation Building",
-                    "duration": "2 weeks",
-                    "goals": ["goal1", "goal2"],
-                    "activities": ["activity1", "activity2"],
-                    "resources": ["resource1", "resource2"],
-                    "assessment": "checkpoint description"
-                }}
-            }},
-            "total_duration": "{timeframe}",
-            "difficulty_progression": ["beginner", "intermediate", "advanced"],
-            "success_metrics": ["metric1", "metric2"]
-        }}
-        """
-        
-        response = await _get_openai().chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an educational curriculum designer. Create structured learning paths. Always respond in valid JSON format."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=1500
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        _cache_response(cache_key, result)
-        return result
-        
+        return await _request_learning_path(subject, current_level, target_level, timeframe, language)
     except Exception as e:
+        ai_metrics.record_fallback("learning_path")
         return {
             "learning_path": {
                 "phase_1": {
@@ -610,47 +1277,58 @@ async def generate_learning_path(subject: str, current_level: str, target_level:
         }
 
 # New AI Component: Smart Study Scheduler
+async def _request_study_schedule(subjects: List[str], available_hours: int, preferences: Dict, language: str = "en") -> Dict:
+    """Ask the model for a study schedule; raises when it cannot be generated"""
+    cache_key = _get_cache_key(
+        "study_schedule",
+        subjects=subjects,
+        available_hours=available_hours,
+        preferences=preferences,
+        language=language
+    )
+    cached = await _get_cached(cache_key, "study_schedule")
+    if cached is not None:
+        return cached
+        
+    prompt = f"""Create an optimized study schedule for:
+    Subjects: {subjects}
+    Available hours per week: {available_hours}
+    Preferences: {preferences}
+    
+    Generate a weekly schedule with optimal time allocation.
+    
+    Respond with JSON:
+    {{
+        "weekly_schedule": {{
+            "monday": [{{"subject": "Math", "time": "9:00-10:30", "type": "study"}}],
+            "tuesday": [{{"subject": "Science", "time": "14:00-15:00", "type": "review"}}]
+        }},
+        "study_tips": ["tip1", "tip2"],
+        "break_recommendations": "Take 15min breaks every hour"
+    }}
+    """
+    
+    response = await _create_completion(
+        cache_key, _get_openai(),
+        task="study_schedule",
+        messages=[
+            {"role": "system", "content": "You are a study optimization expert. Always respond in valid JSON format."},
+            {"role": "user", "content": prompt}
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=1000
+    )
+    
+    result = json.loads(response.choices[0].message.content)
+    response_cache.set(cache_key, result, task="study_schedule")
+    return result
+
 async def generate_study_schedule(subjects: List[str], available_hours: int, preferences: Dict, language: str = "en") -> Dict:
     """AI-powered study schedule optimization"""
     try:
-        cache_key = _get_cache_key(f"schedule:{str(subjects)}:{available_hours}:{str(preferences)}")
-        cached = _get_cached_response(cache_key)
-        if cached:
-            return cached
-            
-        prompt = f"""Create an optimized study schedule for:
-        Subjects: {subjects}
-        Available hours per week: {available_hours}
-        Preferences: {preferences}
-        
-        Generate a weekly schedule with optimal time allocation.
-        
-        Respond with JSON:
-        {{
-            "weekly_schedule": {{
-                "monday": [{{"subject": "Math", "time": "9:00-10:30", "type": "study"}}],
-                "tuesday": [{{"subject": "Science", "time": "14:00-15:00", "type": "review"}}]
-            }},
-            "study_tips": ["tip1", "tip2"],
-            "break_recommendations": "Take 15min breaks every hour"
-        }}
-        """
-        
-        response = await _get_openai().chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a study optimization expert. Always respond in valid JSON format."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=1000
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        _cache_response(cache_key, result)
-        return result
-        
+        return await _request_study_schedule(subjects, available_hours, preferences, language)
     except Exception as e:
+        ai_metrics.record_fallback("study_schedule")
         return {
             "weekly_schedule": {"monday": [{"subject": subjects[0] if subjects else "General", "time": "9:00-10:00", "type": "study"}]},
             "study_tips": ["Create a consistent routine", "Take regular breaks"],
@@ -661,9 +1339,14 @@ async def generate_study_schedule(subjects: List[str], available_hours: int, pre
 async def predict_performance(student_data: Dict, target_subject: str, language: str = "en") -> Dict:
     """AI-powered performance prediction and recommendations"""
     try:
-        cache_key = _get_cache_key(f"predict:{str(student_data)}:{target_subject}")
-        cached = _get_cached_response(cache_key)
-        if cached:
+        cache_key = _get_cache_key(
+            "performance_prediction",
+            student_data=student_data,
+            target_subject=target_subject,
+            language=language
+        )
+        cached = await _get_cached(cache_key, "performance_prediction")
+        if cached is not None:
             return cached
             
         prompt = f"""Analyze student performance data and predict outcomes:
@@ -683,8 +1366,9 @@ async def predict_performance(student_data: Dict, target_subject: str, language:
         }}
         """
         
-        response = await _get_openai().chat.completions.create(
-            model="gpt-4o",
+        response = await _create_completion(
+            cache_key, _get_openai(),
+            task="performance_prediction",
             messages=[
                 {"role": "system", "content": "You are an educational data analyst. Always respond in valid JSON format."},
                 {"role": "user", "content": prompt}
@@ -694,10 +1378,11 @@ async def predict_performance(student_data: Dict, target_subject: str, language:
         )
         
         result = json.loads(response.choices[0].message.content)
-        _cache_response(cache_key, result)
+        response_cache.set(cache_key, result, task="performance_prediction")
         return result
         
     except Exception as e:
+        ai_metrics.record_fallback("performance_prediction")
         return {
             "predicted_score": 75,
             "confidence_level": "medium",
@@ -707,85 +1392,273 @@ async def predict_performance(student_data: Dict, target_subject: str, language:
             "timeline": "4-6 weeks"
         }
 
-async def automated_grading_assistant(assignment_text: str, rubric: Dict, student_answer: str, language: str = "en") -> Dict:
+async def _request_grading(assignment_text: str, rubric: Dict, student_answer: str, language: str = "en",
+                           priority: Priority = Priority.STANDARD) -> Dict:
+    """Ask the model to grade one answer; raises when it cannot be graded"""
+    cache_key = _get_cache_key(
+        "grading",
+        assignment_text=assignment_text,
+        rubric=rubric,
+        student_answer=student_answer,
+        language=language
+    )
+    cached = await _get_cached(cache_key, "grading")
+    if cached is not None:
+        return cached
+        
+    language_names = {
+        'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
+    }
+    
+    prompt = f"""Grade this student assignment in {language_names.get(language, 'English')} using the provided rubric:
+    
+    Assignment: {assignment_text}
+    
+    Rubric: {json.dumps(rubric, indent=2)}
+    
+    Student Answer: {student_answer}
+    
+    Provide:
+    1. Overall score based on rubric
+    2. Detailed feedback for each rubric criterion
+    3. Strengths and areas for improvement
+    4. Specific suggestions for enhancement
+    5. Grade justification
+    
+    Respond with JSON:
+    {{
+        "overall_score": 85,
+        "max_score": 100,
+        "grade_letter": "B+",
+        "criterion_scores": {{
+            "content": {{"score": 40, "max": 50, "feedback": "Good understanding shown"}},
+            "organization": {{"score": 25, "max": 30, "feedback": "Well structured"}}
+        }},
+        "strengths": ["strength1", "strength2"],
+        "improvements": ["improvement1", "improvement2"],
+        "detailed_feedback": "Comprehensive feedback text",
+        "next_steps": ["step1", "step2"]
+    }}
+    """
+    
+    response = await _create_completion(
+        cache_key, _get_openai(),
+        task="grading",
+        priority=priority,
+        messages=[
+            {"role": "system", "content": "You are an experienced educator providing fair and constructive grading. Always respond in valid JSON format."},
+            {"role": "user", "content": prompt}
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=1200
+    )
+    
+    result = json.loads(response.choices[0].message.content)
+    response_cache.set(cache_key, result, task="grading")
+    return result
+
+async def automated_grading_assistant(assignment_text: str, rubric: Dict, student_answer: str, language: str = "en",
+                                      priority: Priority = Priority.STANDARD) -> Dict:
     """AI-powered automated grading with detailed feedback"""
     try:
-        cache_key = _get_cache_key(f"grading:{assignment_text[:50]}:{student_answer[:50]}")
-        cached = _get_cached_response(cache_key)
-        if cached:
-            return cached
-            
-        language_names = {
-            'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
+        return await _request_grading(assignment_text, rubric, student_answer, language, priority)
+    except Exception as e:
+        ai_metrics.record_fallback("grading")
+        return {
+            "overall_score": 75,
+            "max_score": 100,
+            "grade_letter": "C+",
+            "criterion_scores": {
+                "content": {"score": 35, "max": 50, "feedback": "Shows basic understanding"},
+                "organization": {"score": 20, "max": 30, "feedback": "Could be better organized"}
+            },
+            "strengths": ["Effort shown", "Basic concepts understood"],
+            "improvements": ["Add more detail", "Improve structure"],
+            "detailed_feedback": "Your work shows understanding but needs more development.",
+            "next_steps": ["Review feedback", "Revise and resubmit"]
         }
-        
-        prompt = f"""Grade this student assignment in {language_names.get(language, 'English')} using the provided rubric:
+
+def _pack_grading_answers(answers: List[Dict], token_budget: int, max_per_pack: int) -> List[List[Dict]]:
+    """Greedily group answers so each pack's answer text stays within the token budget"""
+    packs = []
+    current = []
+    current_tokens = 0
+    for answer in answers:
+        tokens = estimate_tokens(answer["answer"])
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_per_pack):
+            packs.append(current)
+            current = []
+            current_tokens = 0
+        current.append(answer)
+        current_tokens += tokens
+    if current:
+        packs.append(current)
+    return packs
+
+async def _grade_answer_pack(assignment_text: str, rubric: Dict, pack: List[Dict], language: str, priority: Priority) -> Dict[int, Dict]:
+    """Grade several answers in one request; returns results keyed by the answers' batch index"""
+    openai_client = _get_openai()
+    if not openai_client:
+        return {}
+    
+    language_names = {
+        'en': 'English', 'de': 'German', 'fr': 'French', 'it': 'Italian'
+    }
+    
+    # Short positional ids keep the output compact and independent of caller ids
+    answers_block = "\n\n".join(
+        f"[{index}] Student Answer:\n{answer['answer']}" for index, answer in enumerate(pack)
+    )
+    prompt = f"""Grade each of the following student answers to the same assignment in {language_names.get(language, 'English')} using the provided rubric.
+        Grade every answer independently.
         
         Assignment: {assignment_text}
         
         Rubric: {json.dumps(rubric, indent=2)}
         
-        Student Answer: {student_answer}
+        {answers_block}
         
-        Provide:
-        1. Overall score based on rubric
-        2. Detailed feedback for each rubric criterion
-        3. Strengths and areas for improvement
-        4. Specific suggestions for enhancement
-        5. Grade justification
-        
-        Respond with JSON:
+        Respond with JSON containing one entry per answer, using the number in brackets as "id":
         {{
-            "overall_score": 85,
-            "max_score": 100,
-            "grade_letter": "B+",
-            "criterion_scores": {{
-                "content": {{"score": 40, "max": 50, "feedback": "Good understanding shown"}},
-                "organization": {{"score": 25, "max": 30, "feedback": "Well structured"}}
-            }},
-            "strengths": ["strength1", "strength2"],
-            "improvements": ["improvement1", "improvement2"],
-            "detailed_feedback": "Comprehensive feedback text",
-            "next_steps": ["step1", "step2"]
+            "grades": [
+                {{
+                    "id": 0,
+                    "overall_score": 85,
+                    "max_score": 100,
+                    "grade_letter": "B+",
+                    "criterion_scores": {{
+                        "content": {{"score": 40, "max": 50, "feedback": "Good understanding shown"}}
+                    }},
+                    "strengths": ["strength1"],
+                    "improvements": ["improvement1"],
+                    "detailed_feedback": "Feedback text",
+                    "next_steps": ["step1"]
+                }}
+            ]
         }}
         """
-        
-        response = await _get_openai().chat.completions.create(
-            model="gpt-4o",
+    
+    cache_key = _get_cache_key(
+        "grading_batch",
+        assignment_text=assignment_text,
+        rubric=rubric,
+        answers=[answer["answer"] for answer in pack],
+        language=language
+    )
+    try:
+        response = await _create_completion(
+            cache_key, openai_client,
+            task="grading_batch",
+            priority=priority,
             messages=[
                 {"role": "system", "content": "You are an experienced educator providing fair and constructive grading. Always respond in valid JSON format."},
                 {"role": "user", "content": prompt}
             ],
             response_format={"type": "json_object"},
-            max_tokens=1200
+            max_tokens=min(4096, 600 * len(pack))
         )
-        
-        result = json.loads(response.choices[0].message.content)
-        _cache_response(cache_key, result)
-        return result
-        
+        grades = json.loads(response.choices[0].message.content).get("grades", [])
     except Exception as e:
-        return {
-            "overall_score": 75,
-            "max_score": 100,
-            "grade_letter": "C+",
-            "criterion_scores": {
-                "content": {"score": 35, "max": 50, "feedback": "Shows basic understanding"},
-                "organization": {"score": 20, "max": 30, "feedback": "Could be better organized"}
-            },
-            "strengths": ["Effort shown", "Basic concepts understood"],
-            "improvements": ["Add more detail", "Improve structure"],
-            "detailed_feedback": "Your work shows understanding but needs more development.",
-            "next_steps": ["Review feedback", "Revise and resubmit"]
-        }
+        logger.warning(f"Batch grading request for {len(pack)} answers failed: {e}")
+        return {}
+    
+    results = {}
+    for grade in grades if isinstance(grades, list) else []:
+        if not isinstance(grade, dict) or "overall_score" not in grade:
+            continue
+        try:
+            index = int(grade.pop("id"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= index < len(pack):
+            results[pack[index]["index"]] = grade
+    return results
+
+async def automated_grading_batch(assignment_text: str, rubric: Dict, answers: List[Dict], language: str = "en",
+                                  priority: Priority = Priority.BATCH, allow_fallback: bool = True) -> Dict:
+    """Grade a whole class: answers are packed several per request and graded in parallel.
+
+    answers is a list of {"student_id": ..., "answer": ...}; results follow
+    the same order, one per answer, even when a student_id repeats. Answers
+    the model leaves out of a packed response are graded one by one instead,
+    at the same priority and concurrency limit as the packs. With
+    allow_fallback=False an answer that cannot be graded raises instead of
+    getting the template grade.
+    """
+    answers = [
+        {"index": index, "student_id": str(answer.get("student_id", index)), "answer": answer.get("answer", "")}
+        for index, answer in enumerate(answers)
+    ]
+    
+    results = {}
+    pending = []
+    for answer in answers:
+        cached = await _get_cached(_get_cache_key(
+            "grading",
+            assignment_text=assignment_text,
+            rubric=rubric,
+            student_answer=answer["answer"],
+            language=language
+        ), "grading_batch")
+        if cached is not None:
+            results[answer["index"]] = cached
+        else:
+            pending.append(answer)
+    
+    packs = _pack_grading_answers(pending, settings.GRADING_BATCH_TOKEN_BUDGET, settings.GRADING_BATCH_MAX_ANSWERS)
+    semaphore = asyncio.Semaphore(settings.GRADING_BATCH_CONCURRENCY)
+    
+    async def grade_pack(pack):
+        async with semaphore:
+            return await _grade_answer_pack(assignment_text, rubric, pack, language, priority)
+    
+    for pack_results in await asyncio.gather(*(grade_pack(pack) for pack in packs)):
+        results.update(pack_results)
+    
+    for answer in pending:
+        if answer["index"] in results:
+            # Store under the single-answer key so later regrades hit the cache
+            response_cache.set(_get_cache_key(
+                "grading",
+                assignment_text=assignment_text,
+                rubric=rubric,
+                student_answer=answer["answer"],
+                language=language
+            ), results[answer["index"]], task="grading")
+    
+    missing = [answer for answer in pending if answer["index"] not in results]
+    if missing:
+        logger.info(f"Batch grading fell back to single requests for {len(missing)} answers")
+        grade_single = automated_grading_assistant if allow_fallback else _request_grading
+        
+        async def grade_one(answer):
+            async with semaphore:
+                return await grade_single(assignment_text, rubric, answer["answer"], language, priority)
+        
+        single_results = await asyncio.gather(*(grade_one(answer) for answer in missing))
+        for answer, result in zip(missing, single_results):
+            results[answer["index"]] = result
+    
+    return {
+        "results": [{"student_id": answer["student_id"], **results[answer["index"]]} for answer in answers],
+        "total": len(answers),
+        "packs": len(packs),
+        "single_fallbacks": len(missing)
+    }
 
 # New AI Component: Adaptive Question Generator
 async def generate_adaptive_questions(difficulty_level: str, subject: str, student_performance: Dict, language: str = "en") -> Dict:
     """Generate questions that adapt to student performance"""
     try:
-        cache_key = _get_cache_key(f"adaptive:{difficulty_level}:{subject}:{str(student_performance)}")
-        cached = _get_cached_response(cache_key)
-        if cached:
+        cache_key = _get_cache_key(
+            "adaptive_questions",
+            difficulty_level=difficulty_level,
+            subject=subject,
+            student_performance=student_performance,
+            language=language
+        )
+        cached = await _get_cached(cache_key, "adaptive_questions")
+        if cached is not None:
             return cached
             
         prompt = f"""Generate adaptive questions based on:
@@ -812,8 +1685,9 @@ async def generate_adaptive_questions(difficulty_level: str, subject: str, stude
         }}
         """
         
-        response = await _get_openai().chat.completions.create(
-            model="gpt-4o",
+        response = await _create_completion(
+            cache_key, _get_openai(),
+            task="adaptive_questions",
             messages=[
                 {"role": "system", "content": "You are an adaptive learning expert. Always respond in valid JSON format."},
                 {"role": "user", "content": prompt}
@@ -823,10 +1697,11 @@ async def generate_adaptive_questions(difficulty_level: str, subject: str, stude
         )
         
         result = json.loads(response.choices[0].message.content)
-        _cache_response(cache_key, result)
+        response_cache.set(cache_key, result, task="adaptive_questions")
         return result
         
     except Exception as e:
+        ai_metrics.record_fallback("adaptive_questions")
         return {
             "questions": [{
                 "question": f"What is a key concept in {subject}?",
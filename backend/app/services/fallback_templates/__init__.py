@@ -0,0 +1,218 @@
+"""Fallback content served while the AI provider is unavailable.
+
+Templates for every language are compiled once at import into format
+patterns, so rendering a letter or a quiz costs little more than formatting a
+string, which matters when an outage sends all traffic through fallbacks.
+"""
+
+import re
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import de, en, fr, it
+
+# Placeholders are identifiers; any other text in braces is literal
+_FIELD = re.compile(r"\{([A-Za-z_]\w*)\}")
+
+DEFAULT_LANGUAGE = "en"
+DEFAULT_CONTENT_TYPE = "progress_report"
+DEFAULT_TONE = "professional"
+
+
+class _Values:
+    """Read-only view of the render values in which missing fields are empty strings"""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Dict[str, str]):
+        self.values = values
+
+    def __getitem__(self, key: str) -> str:
+        return self.values.get(key, "")
+
+
+def _format_string(text: str) -> str:
+    """str.format pattern for text: {field} placeholders are kept, any other brace is escaped"""
+    parts = _FIELD.split(text)
+    # Even indexes hold literal text, odd indexes field names
+    return "".join(
+        f"{{{part}}}" if index % 2 else part.replace("{", "{{").replace("}", "}}")
+        for index, part in enumerate(parts)
+    )
+
+
+def _builder(value: Any) -> Callable[[_Values], Any]:
+    """Function that builds value from the render values"""
+    if isinstance(value, str):
+        if not _FIELD.search(value):
+            return lambda values: value
+        pattern = _format_string(value)
+        return pattern.format_map
+    if isinstance(value, dict):
+        items = [(key, _builder(item)) for key, item in value.items()]
+        return lambda values: {key: build(values) for key, build in items}
+    if isinstance(value, list):
+        builders = [_builder(item) for item in value]
+        return lambda values: [build(values) for build in builders]
+    if value is None or isinstance(value, (bool, int, float)):
+        return lambda values: value
+    raise TypeError(f"Unsupported template value: {value!r}")
+
+
+def compile_template(value: Any) -> Callable[[Dict[str, str]], Any]:
+    """Compile a template string, or a nested dict/list of them, into a render function.
+
+    Strings are turned into str.format patterns once, so rendering is a
+    format_map call per string and returns fresh dicts and lists on every
+    call. Placeholders missing from `values` render as empty strings.
+    """
+    build = _builder(value)
+    return lambda values: build(_Values(values))
+
+
+class _Language:
+    """Compiled templates of one language"""
+
+    def __init__(self, data: Dict, fallback: Optional[Dict] = None):
+        # Sections a language does not define are taken from the fallback language
+        data = {**(fallback or {}), **data}
+        letter = data["letter"]
+
+        self.months = data["months"]
+        self.date_format = data["date_format"]
+        self.defaults = data["defaults"]
+        self.letters = {}
+        for content_type, parts in letter["content_types"].items():
+            for tone in letter["greetings"]:
+                self.letters[(content_type, tone)] = compile_template(
+                    f"{letter['greetings'][tone]}\n\n"
+                    f"{parts['body']}\n\n"
+                    f"{letter['tone_lines'][tone]}\n\n"
+                    f"{letter['sign_offs'][tone]}\n"
+                    f"{letter['signature']}\n\n"
+                    f"{letter['date_line']}"
+                )
+        self.letter_titles = {
+            content_type: compile_template(f"{parts['title']} - {{student_name}}")
+            for content_type, parts in letter["content_types"].items()
+        }
+        self.letter_extras = compile_template({
+            "key_points": letter["key_points"],
+            "follow_up_suggestions": letter["follow_up_suggestions"],
+        })
+        self.quiz = [compile_template(question) for question in data["quiz"]]
+        advanced = data["advanced"]
+        self.study_plan = compile_template(advanced["study_plan"])
+        self.recommendations = compile_template(advanced["recommendations"])
+        self.feedback_messages = {band: compile_template(text) for band, text in advanced["feedback"]["messages"].items()}
+        self.feedback_lists = compile_template({
+            "recommendations": advanced["feedback"]["recommendations"],
+            "next_goals": advanced["feedback"]["next_goals"],
+        })
+        self.task_responses = {task: compile_template(response) for task, response in advanced["task_responses"].items()}
+
+    def date_text(self, day: date) -> str:
+        return self.date_format.format(day=day.day, month=self.months[day.month - 1], year=day.year)
+
+
+class TemplateEngine:
+    """Renders fallback parent letters, quiz questions and advanced AI responses"""
+
+    def __init__(self, languages: Dict[str, Dict], default_language: str = DEFAULT_LANGUAGE):
+        self.default_language = default_language
+        base = languages[default_language]
+        self._languages = {
+            code: _Language(data, fallback=None if code == default_language else base)
+            for code, data in languages.items()
+        }
+        # language -> (expires_at, date text); the date only changes once a day
+        self._dates: Dict[str, Tuple[float, str]] = {}
+
+    @property
+    def languages(self) -> List[str]:
+        return list(self._languages)
+
+    def _language(self, language: Optional[str]) -> _Language:
+        return self._languages.get(language) or self._languages[self.default_language]
+
+    def _today(self, language: str) -> str:
+        now = time.monotonic()
+        cached = self._dates.get(language)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        text = self._language(language).date_text(date.today())
+        self._dates[language] = (now + 60, text)
+        return text
+
+    def parent_letter(self, student_context: Dict, content_type: str, tone: str, language: str) -> Dict:
+        lang = self._language(language)
+        defaults = lang.defaults
+        grade = student_context.get("grade") or ""
+        key_points = student_context.get("key_points") or ""
+        additional_context = student_context.get("additional_context") or ""
+        values = {
+            "student_name": str(student_context.get("name") or defaults["student_name"]),
+            "parent_name": str(student_context.get("parent_name") or defaults["parent_name"]),
+            "subject": str(student_context.get("subject") or defaults["subject"]),
+            "grade_suffix": f" ({grade})" if grade else "",
+            "key_points_block": f"{key_points}\n\n" if key_points else "",
+            "additional_context_block": f"{additional_context}\n\n" if additional_context else "",
+            "date": self._today(language if language in self._languages else self.default_language),
+        }
+
+        if content_type not in lang.letter_titles:
+            content_type = DEFAULT_CONTENT_TYPE
+        template = lang.letters.get((content_type, tone)) or lang.letters[(content_type, DEFAULT_TONE)]
+        return {
+            "title": lang.letter_titles[content_type](values),
+            "content": template(values),
+            **lang.letter_extras(values),
+        }
+
+    def quiz_questions(self, topic: str, level: str, language: str, num_questions: int = 5) -> List[Dict]:
+        lang = self._language(language)
+        values = {"topic": str(topic), "level": str(level)}
+        return [render(values) for render in lang.quiz[:max(0, num_questions)]]
+
+    def adaptive_quiz(self, topic: str, difficulty: str, language: str = DEFAULT_LANGUAGE) -> Dict:
+        questions = [
+            {
+                "question": question["question_text"],
+                "options": question["options"],
+                "correct_answer": question["correct_answer"],
+                "explanation": question["explanation"],
+            }
+            for question in self.quiz_questions(topic, difficulty, language, num_questions=3)
+        ]
+        return {
+            "questions": questions,
+            "adaptive_features": {
+                "learning_style": "general",
+                "difficulty_progression": False,
+                "personalized_feedback": False
+            }
+        }
+
+    def study_plan(self, language: str = DEFAULT_LANGUAGE) -> Dict:
+        return self._language(language).study_plan({})
+
+    def feedback(self, score: float, language: str = DEFAULT_LANGUAGE) -> Dict:
+        lang = self._language(language)
+        band = "high" if score >= 80 else "medium" if score >= 60 else "low"
+        return {
+            "feedback": lang.feedback_messages[band]({}),
+            **lang.feedback_lists({}),
+            "motivation_score": min(10, max(1, int(score) // 10))
+        }
+
+    def recommendations(self, language: str = DEFAULT_LANGUAGE) -> Dict:
+        return self._language(language).recommendations({})
+
+    def template_response(self, task_type: str, language: str = DEFAULT_LANGUAGE) -> Dict:
+        """Minimal response for an AdvancedAIService task when every model failed"""
+        render = self._language(language).task_responses.get(task_type)
+        return render({}) if render else {}
+
+
+template_engine = TemplateEngine({"en": en.TEMPLATES, "de": de.TEMPLATES, "fr": fr.TEMPLATES, "it": it.TEMPLATES})
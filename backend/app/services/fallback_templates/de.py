@@ -0,0 +1,215 @@
+TEMPLATES = {
+    "months": ["Januar", "Februar", "März", "April", "Mai", "Juni", "Juli",
+               "August", "September", "Oktober", "November", "Dezember"],
+    "date_format": "{day}. {month} {year}",
+    "defaults": {
+        "student_name": "Ihr Kind",
+        "parent_name": "liebe Eltern",
+        "subject": "Allgemeinbildung",
+    },
+    "letter": {
+        "greetings": {
+            "professional": "Guten Tag, {parent_name},",
+            "friendly": "Hallo {parent_name},",
+            "encouraging": "Guten Tag, {parent_name},",
+            "concerned": "Guten Tag, {parent_name},",
+        },
+        "tone_lines": {
+            "professional": "Vielen Dank für Ihre fortwährende Zusammenarbeit und Unterstützung.",
+            "friendly": "Ich freue mich immer, von Ihnen zu hören – melden Sie sich gern jederzeit bei mir.",
+            "encouraging": "Ich bin zuversichtlich, dass {student_name} mit unserer gemeinsamen Unterstützung weiter wachsen und die gesteckten Ziele erreichen wird.",
+            "concerned": "Ich wäre Ihnen dankbar, wenn wir dieses Thema bald gemeinsam angehen könnten, damit {student_name} die nötige Unterstützung erhält.",
+        },
+        "sign_offs": {
+            "professional": "Mit freundlichen Grüßen",
+            "friendly": "Herzliche Grüße",
+            "encouraging": "Mit den besten Wünschen",
+            "concerned": "Mit freundlichen Grüßen",
+        },
+        "signature": "[Name der Lehrkraft]\nLehrkraft für {subject}\n[Name der Schule]",
+        "date_line": "Datum: {date}",
+        "content_types": {
+            "progress_report": {
+                "title": "Lernstandsbericht",
+                "body": """ich hoffe, es geht Ihnen gut. Mit diesem Schreiben möchte ich Sie über die Fortschritte von {student_name} im Fach {subject}{grade_suffix} informieren.
+
+{key_points_block}{student_name} zeigt im Unterricht beständigen Einsatz und Engagement. Das Verständnis der grundlegenden Inhalte entwickelt sich gut, und {student_name} beteiligt sich aktiv an den Unterrichtsgesprächen.
+
+Aktuelle Beobachtungen:
+• Verbessert sich beim Lösen von Aufgaben
+• Arbeitet gut mit Mitschülerinnen und Mitschülern zusammen
+• Erledigt Aufgaben pünktlich
+• Stellt im Unterricht durchdachte Fragen
+
+{additional_context_block}Ich empfehle, das Lernen zu Hause weiterhin durch regelmäßiges Wiederholen des Unterrichtsstoffs und das Erledigen der Hausaufgaben zu unterstützen. Bei Fragen oder für ein ausführlicheres Gespräch über die Fortschritte von {student_name} können Sie sich jederzeit gern an mich wenden.""",
+            },
+            "behavior_update": {
+                "title": "Rückmeldung zum Verhalten",
+                "body": """ich möchte mich bei Ihnen melden, um über das Verhalten und die soziale Entwicklung von {student_name} im {subject}-Unterricht zu sprechen.
+
+{key_points_block}{student_name} entwickelt sich im Verhalten im Klassenzimmer positiv, lernt, die Regeln der Klasse einzuhalten, und arbeitet gut mit den Mitschülerinnen und Mitschülern zusammen.
+
+Positive Beobachtungen:
+• Respektiert die Regeln der Klasse
+• Hört aufmerksam zu
+• Arbeitet in Gruppen kooperativ mit
+• Geht freundlich mit anderen um
+
+{additional_context_block}Ich danke Ihnen, dass Sie dieses positive Verhalten zu Hause bestärken. Gemeinsam können wir {student_name} helfen, sich sozial und schulisch weiter gut zu entwickeln.""",
+            },
+            "achievement_celebration": {
+                "title": "Anerkennung einer Leistung",
+                "body": """ich freue mich sehr, Ihnen erfreuliche Neuigkeiten über die jüngsten Leistungen von {student_name} im Fach {subject} mitteilen zu können!
+
+{key_points_block}{student_name} hat außergewöhnliche Leistungen und großen Einsatz gezeigt. Der Fleiß und die positive Einstellung haben sich wirklich ausgezahlt.
+
+Besondere Leistungen:
+• Sehr gute Ergebnisse in den letzten Leistungsnachweisen
+• Hervorragende Beteiligung an Unterrichtsgesprächen
+• Sichere Beherrschung zentraler Inhalte
+• Übernimmt Verantwortung in der Gruppenarbeit
+
+{additional_context_block}Freuen Sie sich mit mir über den Erfolg von {student_name}! Diese Lernbereitschaft ist wirklich lobenswert, und ich freue mich darauf, die weitere Entwicklung zu begleiten.
+
+Herzlichen Glückwunsch an Sie und {student_name}!""",
+            },
+            "academic_concern": {
+                "title": "Sorge um die schulischen Leistungen",
+                "body": """ich hoffe, es geht Ihnen gut. Ich wende mich an Sie, weil ich einige Bedenken hinsichtlich der schulischen Leistungen von {student_name} im Fach {subject} habe.
+
+{key_points_block}{student_name} ist durchaus leistungsfähig, doch ich habe einige Bereiche bemerkt, in denen zusätzliche Unterstützung hilfreich wäre. Ich bin überzeugt, dass {student_name} diese Herausforderungen mit den richtigen Strategien und etwas Unterstützung meistern kann.
+
+Verbesserungsbereiche:
+• Regelmäßiges Erledigen der Hausaufgaben
+• Aktive Beteiligung am Unterricht
+• Nachfragen, wenn Inhalte unklar sind
+• Zeitmanagement und Organisation
+
+{additional_context_block}Ich möchte gemeinsam mit Ihnen Strategien entwickeln, die {student_name} zum Erfolg verhelfen. Bitte melden Sie sich bei mir, damit wir besprechen können, wie wir {student_name} am besten unterstützen.""",
+            },
+            "meeting_request": {
+                "title": "Bitte um ein Gespräch",
+                "body": """ich hoffe, es geht Ihnen gut. Ich würde gern ein Gespräch mit Ihnen vereinbaren, um über die Fortschritte von {student_name} im Fach {subject} zu sprechen.
+
+{key_points_block}Ich halte es für sinnvoll, dass wir uns treffen und über die schulische und soziale Entwicklung von {student_name} sprechen. So können wir gemeinsam dafür sorgen, dass sich {student_name} weiterhin gut entwickelt.
+
+Gesprächsthemen:
+• Schulische Fortschritte und Erfolge
+• Bereiche für die weitere Entwicklung
+• Möglichkeiten der Unterstützung zu Hause
+• Ziele für den Rest des Schuljahres
+
+{additional_context_block}Bitte teilen Sie mir mit, wann Sie in den kommenden Wochen Zeit haben. Ich bin bei der Terminfindung flexibel und richte mich gern nach Ihnen.""",
+            },
+            "homework_reminder": {
+                "title": "Erinnerung an die Hausaufgaben",
+                "body": """ich hoffe, es geht Ihnen gut. Ich melde mich wegen der Hausaufgaben von {student_name} im Fach {subject}.
+
+{key_points_block}Regelmäßig erledigte Hausaufgaben sind wichtig, um den Unterrichtsstoff zu festigen und gute Lerngewohnheiten aufzubauen. Gern teile ich einige Strategien, die {student_name} helfen können, am Ball zu bleiben.
+
+Hilfreiche Strategien:
+• Eine feste Hausaufgabenroutine einführen
+• Einen ruhigen, aufgeräumten Arbeitsplatz schaffen
+• Größere Aufgaben in kleinere Schritte aufteilen
+• {student_name} ermutigen, bei Bedarf um Hilfe zu bitten
+
+{additional_context_block}Bei Fragen zu den Aufgaben oder wenn {student_name} zusätzliche Unterstützung mit dem Stoff braucht, können Sie sich jederzeit gern an mich wenden.""",
+            },
+        },
+        "key_points": ["Information zum Lernstand", "Weitere Unterstützung erforderlich", "Offene Kommunikation erwünscht"],
+        "follow_up_suggestions": ["Elterngespräch vereinbaren", "Hausaufgaben im Blick behalten", "Regelmäßig in Kontakt bleiben"],
+    },
+    "quiz": [
+        {
+            "question_text": "Was ist ein wichtiges Konzept im Bereich {topic}?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Die Grundlagen verstehen",
+            "options": ["Die Grundlagen verstehen", "Fakten auswendig lernen", "Details ignorieren", "Übungen auslassen"],
+            "explanation": "Ein solides Verständnis der Grundlagen ist entscheidend, um {topic} zu beherrschen.",
+            "difficulty": "medium",
+            "learning_objective": "Grundverständnis der Konzepte von {topic} überprüfen",
+        },
+        {
+            "question_text": "Richtig oder falsch: Um {topic} zu beherrschen, braucht es Übung.",
+            "question_type": "true_false",
+            "correct_answer": "Richtig",
+            "options": ["Richtig", "Falsch"],
+            "explanation": "Wie die meisten Themen erfordert auch {topic} regelmäßige Übung, um es sicher zu beherrschen.",
+            "difficulty": "easy",
+            "learning_objective": "Die Bedeutung von Übung für {topic} verstehen",
+        },
+        {
+            "question_text": "Welche Strategie hilft beim Lernen von {topic} am meisten?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Regelmäßiges Üben mit Rückmeldung",
+            "options": ["Regelmäßiges Üben mit Rückmeldung", "Alles am Vorabend lernen", "Den Stoff einmal durchlesen", "Schwierigen Aufgaben ausweichen"],
+            "explanation": "Verteiltes Üben mit Rückmeldung sorgt für ein dauerhaftes Verständnis von {topic}.",
+            "difficulty": "easy",
+            "learning_objective": "Wirksame Lernstrategien für {topic} erkennen",
+        },
+        {
+            "question_text": "Richtig oder falsch: Fehler sind beim Lernen von {topic} hilfreich.",
+            "question_type": "true_false",
+            "correct_answer": "Richtig",
+            "options": ["Richtig", "Falsch"],
+            "explanation": "Die Analyse von Fehlern zeigt, welche Teile von {topic} mehr Aufmerksamkeit brauchen.",
+            "difficulty": "medium",
+            "learning_objective": "Über das Lernen aus Fehlern in {topic} nachdenken",
+        },
+        {
+            "question_text": "Wie lässt sich das eigene Verständnis von {topic} am besten überprüfen?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Es in eigenen Worten erklären",
+            "options": ["Es in eigenen Worten erklären", "Das Lehrbuch abschreiben", "Die Übungen überspringen", "Die Antworten raten"],
+            "explanation": "Wer {topic} in eigenen Worten erklären kann, hat es verstanden und nicht nur auswendig gelernt.",
+            "difficulty": "medium",
+            "learning_objective": "Das eigene Verständnis von {topic} einschätzen",
+        },
+        {
+            "question_text": "Was solltest du zuerst tun, wenn du in {topic} auf eine neue Aufgabe stößt?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Klären, was gegeben und was gesucht ist",
+            "options": ["Klären, was gegeben und was gesucht ist", "Die erste Antwort aufschreiben, die einem einfällt", "Sie überspringen und nie wieder ansehen", "Warten, bis jemand anderes sie löst"],
+            "explanation": "Zu klären, was gegeben und was gesucht ist, ist der erste Schritt zur Lösung einer Aufgabe in {topic}.",
+            "difficulty": "hard",
+            "learning_objective": "Ein Vorgehen zur Problemlösung in {topic} anwenden",
+        },
+    ],
+    "advanced": {
+        "study_plan": {
+            "study_plan": {
+                "week_1": {"focus": "Grundlagen wiederholen", "daily_tasks": ["1 Stunde lernen", "Übungsaufgaben lösen"]},
+                "week_2": {"focus": "Themen auf mittlerem Niveau", "daily_tasks": ["1,5 Stunden lernen", "Übungsquiz machen"]},
+                "week_3": {"focus": "Fortgeschrittene Konzepte", "daily_tasks": ["2 Stunden lernen", "In der Gruppe lernen"]},
+                "week_4": {"focus": "Wiederholung und Leistungsüberprüfung", "daily_tasks": ["Alle Themen wiederholen", "Abschlusstest machen"]},
+            },
+            "duration": "30 Tage",
+            "personalization_factors": {"level": "allgemein"},
+        },
+        "feedback": {
+            "messages": {
+                "high": "Ausgezeichnete Arbeit! Du zeigst ein sehr gutes Verständnis.",
+                "medium": "Gute Leistung! Wiederhole vor allem die Themen, bei denen du Fehler gemacht hast.",
+                "low": "Bleib dran! Wiederhole die Grundlagen und versuche es noch einmal.",
+            },
+            "recommendations": ["Fehlerhafte Themen wiederholen", "Mehr Aufgaben üben", "Bei Bedarf um Hilfe bitten"],
+            "next_goals": ["Schwächen verbessern", "Gute Leistungen halten"],
+        },
+        "recommendations": {
+            "recommendations": [
+                {"type": "review", "title": "Grundbegriffe wiederholen", "priority": "high"},
+                {"type": "practice", "title": "Übungsaufgaben bearbeiten", "priority": "medium"},
+                {"type": "assessment", "title": "Übungsquiz machen", "priority": "low"},
+            ],
+            "priority_topics": ["Grundlagen", "Kernkonzepte"],
+            "learning_path": ["Grundstufe", "Mittelstufe", "Fortgeschritten"],
+            "estimated_duration": "2-3 Wochen",
+        },
+        "task_responses": {
+            "quiz_generation": {"questions": []},
+            "study_plan": {"plan": {"message": "Einfache Vorlage für einen Lernplan"}},
+            "feedback": {"feedback": "Übe weiter, um deine Fähigkeiten zu verbessern!"},
+            "recommendations": {"recommendations": []},
+        },
+    },
+}
@@ -0,0 +1,215 @@
+TEMPLATES = {
+    "months": ["January", "February", "March", "April", "May", "June", "July",
+               "August", "September", "October", "November", "December"],
+    "date_format": "{month} {day:02d}, {year}",
+    "defaults": {
+        "student_name": "Student",
+        "parent_name": "Parent",
+        "subject": "General Studies",
+    },
+    "letter": {
+        "greetings": {
+            "professional": "Dear {parent_name},",
+            "friendly": "Hello {parent_name},",
+            "encouraging": "Dear {parent_name},",
+            "concerned": "Dear {parent_name},",
+        },
+        "tone_lines": {
+            "professional": "Thank you for your continued cooperation and support.",
+            "friendly": "It is always a pleasure to keep in touch, so please don't hesitate to reach out about anything at all.",
+            "encouraging": "I am confident that, with our shared support, {student_name} will keep growing and reach their goals.",
+            "concerned": "I would be grateful if we could address this together soon, so that {student_name} gets the support they need.",
+        },
+        "sign_offs": {
+            "professional": "Best regards,",
+            "friendly": "Warm wishes,",
+            "encouraging": "With best wishes,",
+            "concerned": "Sincerely,",
+        },
+        "signature": "[Teacher Name]\n{subject} Teacher\n[School Name]",
+        "date_line": "Date: {date}",
+        "content_types": {
+            "progress_report": {
+                "title": "Progress Report",
+                "body": """I hope this letter finds you well. I am writing to provide you with an update regarding {student_name}'s progress in {subject}{grade_suffix}.
+
+{key_points_block}{student_name} has been demonstrating consistent effort and engagement in class. Their understanding of the core concepts is developing well, and they actively participate in classroom discussions.
+
+Recent observations:
+• Shows improvement in problem-solving skills
+• Demonstrates good collaboration with peers
+• Completes assignments on time
+• Asks thoughtful questions during lessons
+
+{additional_context_block}I encourage continued support at home through regular review of class materials and completion of homework assignments. Please feel free to contact me if you have any questions or would like to schedule a conference to discuss {student_name}'s progress in more detail.""",
+            },
+            "behavior_update": {
+                "title": "Behavior Update",
+                "body": """I wanted to reach out to discuss {student_name}'s recent behavior and social development in {subject} class.
+
+{key_points_block}{student_name} has been showing positive growth in their classroom behavior. They are learning to follow classroom expectations and work well with their classmates.
+
+Positive observations:
+• Shows respect for classroom rules
+• Demonstrates good listening skills
+• Works cooperatively in group activities
+• Shows kindness to fellow students
+
+{additional_context_block}I appreciate your support in reinforcing these positive behaviors at home. Together, we can help {student_name} continue to develop strong social and academic skills.""",
+            },
+            "achievement_celebration": {
+                "title": "Achievement Celebration",
+                "body": """I am delighted to share some wonderful news about {student_name}'s recent achievements in {subject}!
+
+{key_points_block}{student_name} has demonstrated exceptional performance and dedication in their studies. Their hard work and positive attitude have truly paid off.
+
+Notable achievements:
+• Excellent performance on recent assessments
+• Outstanding participation in class discussions
+• Demonstrates mastery of key concepts
+• Shows leadership qualities in group work
+
+{additional_context_block}Please join me in celebrating {student_name}'s success! Their commitment to learning is truly commendable, and I look forward to seeing their continued growth.
+
+Congratulations to both you and {student_name}!""",
+            },
+            "academic_concern": {
+                "title": "Academic Concern",
+                "body": """I hope this letter finds you well. I am writing to discuss some concerns regarding {student_name}'s academic performance in {subject}.
+
+{key_points_block}While {student_name} is a capable student, I have noticed some areas where additional support would be beneficial. I believe that with the right strategies and support, {student_name} can overcome these challenges.
+
+Areas for improvement:
+• Consistent completion of homework assignments
+• Active participation in class discussions
+• Seeking help when concepts are unclear
+• Time management and organization skills
+
+{additional_context_block}I would like to work together with you to develop strategies that will help {student_name} succeed. Please feel free to contact me to discuss how we can best support {student_name}'s learning.""",
+            },
+            "meeting_request": {
+                "title": "Meeting Request",
+                "body": """I hope this letter finds you well. I would like to request a meeting to discuss {student_name}'s progress in {subject}.
+
+{key_points_block}I believe it would be beneficial for us to meet and discuss {student_name}'s academic and social development. This will allow us to work together to ensure {student_name} continues to thrive.
+
+Discussion topics:
+• Academic progress and achievements
+• Areas for continued growth
+• Strategies for home support
+• Goals for the remainder of the term
+
+{additional_context_block}Please let me know your availability for a meeting in the coming weeks. I am flexible with scheduling and can accommodate your preferred time.""",
+            },
+            "homework_reminder": {
+                "title": "Homework Reminder",
+                "body": """I hope this letter finds you well. I wanted to reach out regarding {student_name}'s homework completion in {subject}.
+
+{key_points_block}Consistent homework completion is essential for reinforcing classroom learning and building strong study habits. I wanted to share some strategies that might help {student_name} stay on track.
+
+Homework support strategies:
+• Establish a regular homework routine
+• Create a quiet, organized study space
+• Break larger assignments into smaller tasks
+• Encourage {student_name} to ask for help when needed
+
+{additional_context_block}Please feel free to contact me if you have any questions about assignments or if {student_name} needs additional support with the material.""",
+            },
+        },
+        "key_points": ["Student progress update", "Continued support needed", "Open communication encouraged"],
+        "follow_up_suggestions": ["Schedule parent-teacher conference", "Monitor homework completion", "Maintain regular communication"],
+    },
+    "quiz": [
+        {
+            "question_text": "What is an important concept in {topic}?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Understanding the fundamentals",
+            "options": ["Understanding the fundamentals", "Memorizing facts", "Ignoring details", "Skipping practice"],
+            "explanation": "Understanding fundamentals is crucial for mastering {topic}.",
+            "difficulty": "medium",
+            "learning_objective": "Assess basic understanding of {topic} concepts",
+        },
+        {
+            "question_text": "True or False: {topic} requires practice to master.",
+            "question_type": "true_false",
+            "correct_answer": "True",
+            "options": ["True", "False"],
+            "explanation": "Like most subjects, {topic} requires consistent practice to achieve mastery.",
+            "difficulty": "easy",
+            "learning_objective": "Understand the importance of practice in {topic}",
+        },
+        {
+            "question_text": "Which strategy helps most when learning {topic}?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Regular practice with feedback",
+            "options": ["Regular practice with feedback", "Cramming the night before", "Reading the material once", "Avoiding difficult exercises"],
+            "explanation": "Spaced practice with feedback builds lasting understanding of {topic}.",
+            "difficulty": "easy",
+            "learning_objective": "Recognize effective study strategies for {topic}",
+        },
+        {
+            "question_text": "True or False: Mistakes are a useful part of learning {topic}.",
+            "question_type": "true_false",
+            "correct_answer": "True",
+            "options": ["True", "False"],
+            "explanation": "Analyzing mistakes shows which parts of {topic} need more attention.",
+            "difficulty": "medium",
+            "learning_objective": "Reflect on learning from errors in {topic}",
+        },
+        {
+            "question_text": "What is the best way to check your understanding of {topic}?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Explaining it in your own words",
+            "options": ["Explaining it in your own words", "Copying the textbook", "Skipping the exercises", "Guessing the answers"],
+            "explanation": "If you can explain {topic} in your own words, you have understood it rather than memorized it.",
+            "difficulty": "medium",
+            "learning_objective": "Self-assess understanding of {topic}",
+        },
+        {
+            "question_text": "When you meet a new problem in {topic}, what should you do first?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Identify what is known and what is asked",
+            "options": ["Identify what is known and what is asked", "Write down the first answer that comes to mind", "Skip it and never return", "Wait for someone else to solve it"],
+            "explanation": "Breaking a problem into what is given and what is needed is the first step of solving it in {topic}.",
+            "difficulty": "hard",
+            "learning_objective": "Apply a problem-solving approach in {topic}",
+        },
+    ],
+    "advanced": {
+        "study_plan": {
+            "study_plan": {
+                "week_1": {"focus": "Review fundamentals", "daily_tasks": ["Study 1 hour", "Practice problems"]},
+                "week_2": {"focus": "Intermediate topics", "daily_tasks": ["Study 1.5 hours", "Take practice quiz"]},
+                "week_3": {"focus": "Advanced concepts", "daily_tasks": ["Study 2 hours", "Group study"]},
+                "week_4": {"focus": "Review and assessment", "daily_tasks": ["Review all topics", "Take final assessment"]},
+            },
+            "duration": "30 days",
+            "personalization_factors": {"level": "general"},
+        },
+        "feedback": {
+            "messages": {
+                "high": "Excellent work! You're demonstrating strong understanding.",
+                "medium": "Good effort! Focus on reviewing the topics you missed.",
+                "low": "Keep practicing! Review the fundamentals and try again.",
+            },
+            "recommendations": ["Review missed topics", "Practice more problems", "Seek help if needed"],
+            "next_goals": ["Improve weak areas", "Maintain strong performance"],
+        },
+        "recommendations": {
+            "recommendations": [
+                {"type": "review", "title": "Review basic concepts", "priority": "high"},
+                {"type": "practice", "title": "Complete practice exercises", "priority": "medium"},
+                {"type": "assessment", "title": "Take practice quiz", "priority": "low"},
+            ],
+            "priority_topics": ["Fundamentals", "Core concepts"],
+            "learning_path": ["Basic", "Intermediate", "Advanced"],
+            "estimated_duration": "2-3 weeks",
+        },
+        "task_responses": {
+            "quiz_generation": {"questions": []},
+            "study_plan": {"plan": {"message": "Basic study plan template"}},
+            "feedback": {"feedback": "Keep practicing to improve your skills!"},
+            "recommendations": {"recommendations": []},
+        },
+    },
+}
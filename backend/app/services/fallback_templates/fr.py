@@ -0,0 +1,215 @@
+TEMPLATES = {
+    "months": ["janvier", "février", "mars", "avril", "mai", "juin", "juillet",
+               "août", "septembre", "octobre", "novembre", "décembre"],
+    "date_format": "{day} {month} {year}",
+    "defaults": {
+        "student_name": "votre enfant",
+        "parent_name": "Madame, Monsieur",
+        "subject": "culture générale",
+    },
+    "letter": {
+        "greetings": {
+            "professional": "Bonjour {parent_name},",
+            "friendly": "Bonjour {parent_name},",
+            "encouraging": "Bonjour {parent_name},",
+            "concerned": "Bonjour {parent_name},",
+        },
+        "tone_lines": {
+            "professional": "Je vous remercie de votre collaboration et de votre soutien constants.",
+            "friendly": "C'est toujours un plaisir d'échanger avec vous : n'hésitez surtout pas à me contacter pour quoi que ce soit.",
+            "encouraging": "Je suis convaincu(e) qu'avec notre soutien commun, {student_name} continuera de progresser et atteindra ses objectifs.",
+            "concerned": "Je vous serais reconnaissant(e) que nous puissions aborder ce point ensemble rapidement, afin que {student_name} reçoive le soutien dont il ou elle a besoin.",
+        },
+        "sign_offs": {
+            "professional": "Veuillez agréer mes salutations distinguées,",
+            "friendly": "Bien cordialement,",
+            "encouraging": "Avec mes meilleurs vœux,",
+            "concerned": "Cordialement,",
+        },
+        "signature": "[Nom de l'enseignant(e)]\nEnseignant(e) de {subject}\n[Nom de l'établissement]",
+        "date_line": "Date : {date}",
+        "content_types": {
+            "progress_report": {
+                "title": "Bilan de progression",
+                "body": """J'espère que vous allez bien. Je vous écris pour faire le point sur les progrès de {student_name} en {subject}{grade_suffix}.
+
+{key_points_block}{student_name} fait preuve d'efforts réguliers et d'un bon engagement en classe. Sa compréhension des notions essentielles se développe bien, et {student_name} participe activement aux échanges en classe.
+
+Observations récentes :
+• Progresse dans la résolution de problèmes
+• Collabore bien avec ses camarades
+• Rend ses travaux dans les délais
+• Pose des questions pertinentes pendant les cours
+
+{additional_context_block}Je vous encourage à poursuivre votre soutien à la maison en révisant régulièrement les leçons et en veillant aux devoirs. N'hésitez pas à me contacter pour toute question ou pour convenir d'un rendez-vous afin de discuter plus en détail des progrès de {student_name}.""",
+            },
+            "behavior_update": {
+                "title": "Point sur le comportement",
+                "body": """Je souhaitais prendre contact avec vous au sujet du comportement et du développement social de {student_name} en cours de {subject}.
+
+{key_points_block}{student_name} montre une évolution positive de son comportement en classe. Il ou elle apprend à respecter les règles de la classe et travaille bien avec ses camarades.
+
+Observations positives :
+• Respecte les règles de la classe
+• Fait preuve d'une bonne écoute
+• Coopère lors des travaux de groupe
+• Se montre bienveillant(e) envers ses camarades
+
+{additional_context_block}Je vous remercie de renforcer ces comportements positifs à la maison. Ensemble, nous pouvons aider {student_name} à continuer de développer de solides compétences sociales et scolaires.""",
+            },
+            "achievement_celebration": {
+                "title": "Félicitations pour une réussite",
+                "body": """J'ai le plaisir de vous annoncer d'excellentes nouvelles concernant les récentes réussites de {student_name} en {subject} !
+
+{key_points_block}{student_name} a fait preuve de résultats exceptionnels et d'un grand investissement. Son travail et son attitude positive ont vraiment porté leurs fruits.
+
+Réussites remarquables :
+• Excellents résultats aux dernières évaluations
+• Participation remarquable aux échanges en classe
+• Maîtrise des notions clés
+• Qualités de leader lors des travaux de groupe
+
+{additional_context_block}Je vous invite à célébrer avec moi la réussite de {student_name} ! Son engagement dans les apprentissages est vraiment remarquable, et je me réjouis de suivre la suite de ses progrès.
+
+Toutes mes félicitations à vous et à {student_name} !""",
+            },
+            "academic_concern": {
+                "title": "Inquiétude concernant les résultats",
+                "body": """J'espère que vous allez bien. Je vous écris pour vous faire part de quelques inquiétudes concernant les résultats scolaires de {student_name} en {subject}.
+
+{key_points_block}{student_name} a de réelles capacités, mais j'ai remarqué certains domaines dans lesquels un soutien supplémentaire serait bénéfique. Je suis convaincu(e) qu'avec les bonnes stratégies et un accompagnement adapté, {student_name} pourra surmonter ces difficultés.
+
+Points à améliorer :
+• Faire régulièrement ses devoirs
+• Participer activement en classe
+• Demander de l'aide lorsqu'une notion n'est pas claire
+• Gestion du temps et organisation
+
+{additional_context_block}Je souhaiterais travailler avec vous à des stratégies qui aideront {student_name} à réussir. N'hésitez pas à me contacter pour que nous voyions ensemble comment soutenir au mieux les apprentissages de {student_name}.""",
+            },
+            "meeting_request": {
+                "title": "Demande de rendez-vous",
+                "body": """J'espère que vous allez bien. Je souhaiterais vous rencontrer afin d'échanger sur les progrès de {student_name} en {subject}.
+
+{key_points_block}Il me semble utile que nous nous rencontrions pour parler du développement scolaire et social de {student_name}. Nous pourrons ainsi veiller ensemble à ce que {student_name} continue de s'épanouir.
+
+Sujets de discussion :
+• Progrès et réussites scolaires
+• Axes de progression
+• Moyens de soutien à la maison
+• Objectifs pour la fin du trimestre
+
+{additional_context_block}Merci de m'indiquer vos disponibilités pour un rendez-vous dans les prochaines semaines. Je suis flexible et m'adapterai volontiers à vos horaires.""",
+            },
+            "homework_reminder": {
+                "title": "Rappel concernant les devoirs",
+                "body": """J'espère que vous allez bien. Je me permets de vous contacter au sujet des devoirs de {student_name} en {subject}.
+
+{key_points_block}Faire régulièrement ses devoirs est essentiel pour consolider les apprentissages et prendre de bonnes habitudes de travail. Je souhaitais vous proposer quelques stratégies qui pourraient aider {student_name} à rester sur la bonne voie.
+
+Stratégies pour les devoirs :
+• Mettre en place une routine régulière
+• Aménager un espace de travail calme et ordonné
+• Découper les travaux importants en petites étapes
+• Encourager {student_name} à demander de l'aide si nécessaire
+
+{additional_context_block}N'hésitez pas à me contacter si vous avez des questions sur les devoirs ou si {student_name} a besoin d'un soutien supplémentaire.""",
+            },
+        },
+        "key_points": ["Point sur les progrès de l'élève", "Soutien à poursuivre", "Communication ouverte encouragée"],
+        "follow_up_suggestions": ["Prévoir un rendez-vous parents-enseignant", "Suivre la réalisation des devoirs", "Garder un contact régulier"],
+    },
+    "quiz": [
+        {
+            "question_text": "Quelle est une notion importante en {topic} ?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Comprendre les fondamentaux",
+            "options": ["Comprendre les fondamentaux", "Mémoriser des faits", "Ignorer les détails", "Sauter les exercices"],
+            "explanation": "Comprendre les fondamentaux est essentiel pour maîtriser {topic}.",
+            "difficulty": "medium",
+            "learning_objective": "Évaluer la compréhension de base des notions de {topic}",
+        },
+        {
+            "question_text": "Vrai ou faux : maîtriser {topic} demande de la pratique.",
+            "question_type": "true_false",
+            "correct_answer": "Vrai",
+            "options": ["Vrai", "Faux"],
+            "explanation": "Comme la plupart des matières, {topic} demande une pratique régulière pour être maîtrisé.",
+            "difficulty": "easy",
+            "learning_objective": "Comprendre l'importance de la pratique en {topic}",
+        },
+        {
+            "question_text": "Quelle stratégie aide le plus pour apprendre {topic} ?",
+            "question_type": "multiple_choice",
+            "correct_answer": "S'entraîner régulièrement avec un retour",
+            "options": ["S'entraîner régulièrement avec un retour", "Tout réviser la veille", "Lire le cours une seule fois", "Éviter les exercices difficiles"],
+            "explanation": "Un entraînement espacé accompagné de retours construit une compréhension durable de {topic}.",
+            "difficulty": "easy",
+            "learning_objective": "Identifier des stratégies d'apprentissage efficaces pour {topic}",
+        },
+        {
+            "question_text": "Vrai ou faux : les erreurs sont utiles pour apprendre {topic}.",
+            "question_type": "true_false",
+            "correct_answer": "Vrai",
+            "options": ["Vrai", "Faux"],
+            "explanation": "Analyser ses erreurs montre quelles parties de {topic} demandent plus d'attention.",
+            "difficulty": "medium",
+            "learning_objective": "Réfléchir à l'apprentissage par l'erreur en {topic}",
+        },
+        {
+            "question_text": "Quelle est la meilleure façon de vérifier sa compréhension de {topic} ?",
+            "question_type": "multiple_choice",
+            "correct_answer": "L'expliquer avec ses propres mots",
+            "options": ["L'expliquer avec ses propres mots", "Recopier le manuel", "Sauter les exercices", "Deviner les réponses"],
+            "explanation": "Si l'on sait expliquer {topic} avec ses propres mots, on l'a compris et pas seulement appris par cœur.",
+            "difficulty": "medium",
+            "learning_objective": "Auto-évaluer sa compréhension de {topic}",
+        },
+        {
+            "question_text": "Face à un nouveau problème en {topic}, que faut-il faire en premier ?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Identifier les données et ce qui est demandé",
+            "options": ["Identifier les données et ce qui est demandé", "Écrire la première réponse qui vient à l'esprit", "Le sauter et ne jamais y revenir", "Attendre que quelqu'un d'autre le résolve"],
+            "explanation": "Distinguer les données de ce qui est demandé est la première étape pour résoudre un problème en {topic}.",
+            "difficulty": "hard",
+            "learning_objective": "Appliquer une démarche de résolution de problèmes en {topic}",
+        },
+    ],
+    "advanced": {
+        "study_plan": {
+            "study_plan": {
+                "week_1": {"focus": "Revoir les fondamentaux", "daily_tasks": ["Étudier 1 heure", "Faire des exercices"]},
+                "week_2": {"focus": "Notions intermédiaires", "daily_tasks": ["Étudier 1 h 30", "Faire un quiz d'entraînement"]},
+                "week_3": {"focus": "Notions avancées", "daily_tasks": ["Étudier 2 heures", "Travailler en groupe"]},
+                "week_4": {"focus": "Révision et évaluation", "daily_tasks": ["Réviser tous les thèmes", "Passer l'évaluation finale"]},
+            },
+            "duration": "30 jours",
+            "personalization_factors": {"level": "général"},
+        },
+        "feedback": {
+            "messages": {
+                "high": "Excellent travail ! Tu fais preuve d'une très bonne compréhension.",
+                "medium": "Bon effort ! Concentre-toi sur les thèmes où tu as fait des erreurs.",
+                "low": "Continue de t'entraîner ! Revois les fondamentaux et réessaie.",
+            },
+            "recommendations": ["Revoir les thèmes manqués", "Faire plus d'exercices", "Demander de l'aide si besoin"],
+            "next_goals": ["Renforcer les points faibles", "Maintenir les bons résultats"],
+        },
+        "recommendations": {
+            "recommendations": [
+                {"type": "review", "title": "Revoir les notions de base", "priority": "high"},
+                {"type": "practice", "title": "Faire les exercices d'entraînement", "priority": "medium"},
+                {"type": "assessment", "title": "Passer un quiz d'entraînement", "priority": "low"},
+            ],
+            "priority_topics": ["Fondamentaux", "Notions clés"],
+            "learning_path": ["Débutant", "Intermédiaire", "Avancé"],
+            "estimated_duration": "2 à 3 semaines",
+        },
+        "task_responses": {
+            "quiz_generation": {"questions": []},
+            "study_plan": {"plan": {"message": "Modèle de plan d'études simple"}},
+            "feedback": {"feedback": "Continue de t'entraîner pour progresser !"},
+            "recommendations": {"recommendations": []},
+        },
+    },
+}
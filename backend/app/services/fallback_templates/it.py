@@ -0,0 +1,215 @@
+TEMPLATES = {
+    "months": ["gennaio", "febbraio", "marzo", "aprile", "maggio", "giugno", "luglio",
+               "agosto", "settembre", "ottobre", "novembre", "dicembre"],
+    "date_format": "{day} {month} {year}",
+    "defaults": {
+        "student_name": "vostro figlio/vostra figlia",
+        "parent_name": "famiglia",
+        "subject": "cultura generale",
+    },
+    "letter": {
+        "greetings": {
+            "professional": "Gentile {parent_name},",
+            "friendly": "Buongiorno {parent_name},",
+            "encouraging": "Gentile {parent_name},",
+            "concerned": "Gentile {parent_name},",
+        },
+        "tone_lines": {
+            "professional": "La ringrazio per la collaborazione e il sostegno costanti.",
+            "friendly": "È sempre un piacere restare in contatto: non esiti a scrivermi per qualsiasi cosa.",
+            "encouraging": "Sono certo/a che, con il nostro sostegno comune, {student_name} continuerà a crescere e raggiungerà i propri obiettivi.",
+            "concerned": "Le sarei grato/a se potessimo affrontare insieme la questione al più presto, affinché {student_name} riceva il sostegno di cui ha bisogno.",
+        },
+        "sign_offs": {
+            "professional": "Cordiali saluti,",
+            "friendly": "Un caro saluto,",
+            "encouraging": "Con i migliori auguri,",
+            "concerned": "Distinti saluti,",
+        },
+        "signature": "[Nome dell'insegnante]\nDocente di {subject}\n[Nome della scuola]",
+        "date_line": "Data: {date}",
+        "content_types": {
+            "progress_report": {
+                "title": "Resoconto dei progressi",
+                "body": """spero che stia bene. Le scrivo per aggiornarLa sui progressi di {student_name} in {subject}{grade_suffix}.
+
+{key_points_block}{student_name} dimostra impegno costante e partecipazione in classe. La comprensione dei concetti fondamentali si sta sviluppando bene e {student_name} partecipa attivamente alle discussioni in classe.
+
+Osservazioni recenti:
+• Migliora nella risoluzione dei problemi
+• Collabora bene con i compagni
+• Consegna i compiti puntualmente
+• Pone domande pertinenti durante le lezioni
+
+{additional_context_block}La incoraggio a continuare a sostenere lo studio a casa ripassando regolarmente gli argomenti delle lezioni e seguendo i compiti. Non esiti a contattarmi per qualsiasi domanda o per fissare un colloquio in cui parlare più nel dettaglio dei progressi di {student_name}.""",
+            },
+            "behavior_update": {
+                "title": "Aggiornamento sul comportamento",
+                "body": """desidero contattarLa per parlare del comportamento e dello sviluppo sociale di {student_name} durante le lezioni di {subject}.
+
+{key_points_block}{student_name} mostra una crescita positiva nel comportamento in classe, sta imparando a rispettare le regole della classe e lavora bene con i compagni.
+
+Osservazioni positive:
+• Rispetta le regole della classe
+• Dimostra una buona capacità di ascolto
+• Collabora nelle attività di gruppo
+• È gentile con i compagni
+
+{additional_context_block}La ringrazio per il Suo aiuto nel rafforzare questi comportamenti positivi a casa. Insieme possiamo aiutare {student_name} a continuare a sviluppare solide competenze sociali e scolastiche.""",
+            },
+            "achievement_celebration": {
+                "title": "Congratulazioni per un traguardo",
+                "body": """sono lieto/a di condividere con Lei splendide notizie sui recenti successi di {student_name} in {subject}!
+
+{key_points_block}{student_name} ha dimostrato risultati eccezionali e grande dedizione allo studio. L'impegno e l'atteggiamento positivo hanno davvero dato i loro frutti.
+
+Risultati di rilievo:
+• Ottimi risultati nelle ultime verifiche
+• Partecipazione eccellente alle discussioni in classe
+• Padronanza dei concetti chiave
+• Capacità di guida nei lavori di gruppo
+
+{additional_context_block}La invito a festeggiare con me il successo di {student_name}! L'impegno nello studio è davvero lodevole e sono felice di poter seguire i suoi ulteriori progressi.
+
+Congratulazioni a Lei e a {student_name}!""",
+            },
+            "academic_concern": {
+                "title": "Preoccupazione per il rendimento",
+                "body": """spero che stia bene. Le scrivo per condividere alcune preoccupazioni riguardo al rendimento scolastico di {student_name} in {subject}.
+
+{key_points_block}{student_name} ha buone capacità, ma ho notato alcuni ambiti in cui un sostegno aggiuntivo sarebbe utile. Sono convinto/a che, con le strategie giuste e un po' di supporto, {student_name} potrà superare queste difficoltà.
+
+Aspetti da migliorare:
+• Svolgere i compiti con regolarità
+• Partecipare attivamente alle lezioni
+• Chiedere aiuto quando un concetto non è chiaro
+• Gestione del tempo e organizzazione
+
+{additional_context_block}Vorrei lavorare insieme a Lei per individuare strategie che aiutino {student_name} ad avere successo. Non esiti a contattarmi per discutere di come sostenere al meglio l'apprendimento di {student_name}.""",
+            },
+            "meeting_request": {
+                "title": "Richiesta di colloquio",
+                "body": """spero che stia bene. Vorrei fissare un colloquio per parlare dei progressi di {student_name} in {subject}.
+
+{key_points_block}Credo che sarebbe utile incontrarci per parlare dello sviluppo scolastico e sociale di {student_name}. In questo modo potremo collaborare affinché {student_name} continui a crescere serenamente.
+
+Argomenti del colloquio:
+• Progressi e risultati scolastici
+• Aspetti su cui continuare a lavorare
+• Strategie di sostegno a casa
+• Obiettivi per il resto dell'anno scolastico
+
+{additional_context_block}Mi faccia sapere la Sua disponibilità per un incontro nelle prossime settimane. Sono flessibile con gli orari e mi adatterò volentieri alle Sue esigenze.""",
+            },
+            "homework_reminder": {
+                "title": "Promemoria sui compiti",
+                "body": """spero che stia bene. Desidero contattarLa riguardo allo svolgimento dei compiti di {student_name} in {subject}.
+
+{key_points_block}Svolgere i compiti con regolarità è fondamentale per consolidare quanto appreso in classe e costruire buone abitudini di studio. Vorrei condividere alcune strategie che potrebbero aiutare {student_name} a restare al passo.
+
+Strategie per i compiti:
+• Stabilire una routine regolare per i compiti
+• Creare uno spazio di studio tranquillo e ordinato
+• Suddividere i compiti più lunghi in parti più piccole
+• Incoraggiare {student_name} a chiedere aiuto quando serve
+
+{additional_context_block}Non esiti a contattarmi per qualsiasi domanda sui compiti o se {student_name} ha bisogno di ulteriore supporto.""",
+            },
+        },
+        "key_points": ["Aggiornamento sui progressi", "Sostegno da proseguire", "Comunicazione aperta incoraggiata"],
+        "follow_up_suggestions": ["Fissare un colloquio genitori-insegnante", "Seguire lo svolgimento dei compiti", "Mantenere un contatto regolare"],
+    },
+    "quiz": [
+        {
+            "question_text": "Qual è un concetto importante in {topic}?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Comprendere i fondamenti",
+            "options": ["Comprendere i fondamenti", "Memorizzare fatti", "Ignorare i dettagli", "Saltare gli esercizi"],
+            "explanation": "Comprendere i fondamenti è essenziale per padroneggiare {topic}.",
+            "difficulty": "medium",
+            "learning_objective": "Verificare la comprensione di base dei concetti di {topic}",
+        },
+        {
+            "question_text": "Vero o falso: per padroneggiare {topic} serve esercizio.",
+            "question_type": "true_false",
+            "correct_answer": "Vero",
+            "options": ["Vero", "Falso"],
+            "explanation": "Come la maggior parte delle materie, {topic} richiede un esercizio costante per essere padroneggiato.",
+            "difficulty": "easy",
+            "learning_objective": "Comprendere l'importanza dell'esercizio in {topic}",
+        },
+        {
+            "question_text": "Quale strategia aiuta di più a imparare {topic}?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Esercitarsi regolarmente con un riscontro",
+            "options": ["Esercitarsi regolarmente con un riscontro", "Studiare tutto la sera prima", "Leggere il materiale una sola volta", "Evitare gli esercizi difficili"],
+            "explanation": "Esercitarsi a intervalli con un riscontro costruisce una comprensione duratura di {topic}.",
+            "difficulty": "easy",
+            "learning_objective": "Riconoscere strategie di studio efficaci per {topic}",
+        },
+        {
+            "question_text": "Vero o falso: gli errori sono utili per imparare {topic}.",
+            "question_type": "true_false",
+            "correct_answer": "Vero",
+            "options": ["Vero", "Falso"],
+            "explanation": "Analizzare gli errori mostra quali parti di {topic} richiedono più attenzione.",
+            "difficulty": "medium",
+            "learning_objective": "Riflettere sull'apprendimento dagli errori in {topic}",
+        },
+        {
+            "question_text": "Qual è il modo migliore per verificare la propria comprensione di {topic}?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Spiegarlo con parole proprie",
+            "options": ["Spiegarlo con parole proprie", "Ricopiare il libro di testo", "Saltare gli esercizi", "Tirare a indovinare"],
+            "explanation": "Chi sa spiegare {topic} con parole proprie lo ha capito, non solo memorizzato.",
+            "difficulty": "medium",
+            "learning_objective": "Autovalutare la propria comprensione di {topic}",
+        },
+        {
+            "question_text": "Davanti a un nuovo problema di {topic}, che cosa bisogna fare per prima cosa?",
+            "question_type": "multiple_choice",
+            "correct_answer": "Individuare i dati e ciò che viene richiesto",
+            "options": ["Individuare i dati e ciò che viene richiesto", "Scrivere la prima risposta che viene in mente", "Saltarlo e non tornarci più", "Aspettare che qualcun altro lo risolva"],
+            "explanation": "Distinguere i dati da ciò che viene richiesto è il primo passo per risolvere un problema di {topic}.",
+            "difficulty": "hard",
+            "learning_objective": "Applicare un metodo di risoluzione dei problemi in {topic}",
+        },
+    ],
+    "advanced": {
+        "study_plan": {
+            "study_plan": {
+                "week_1": {"focus": "Ripasso dei fondamenti", "daily_tasks": ["Studiare 1 ora", "Svolgere esercizi"]},
+                "week_2": {"focus": "Argomenti intermedi", "daily_tasks": ["Studiare 1 ora e mezza", "Fare un quiz di prova"]},
+                "week_3": {"focus": "Concetti avanzati", "daily_tasks": ["Studiare 2 ore", "Studiare in gruppo"]},
+                "week_4": {"focus": "Ripasso e verifica", "daily_tasks": ["Ripassare tutti gli argomenti", "Svolgere la verifica finale"]},
+            },
+            "duration": "30 giorni",
+            "personalization_factors": {"level": "generale"},
+        },
+        "feedback": {
+            "messages": {
+                "high": "Ottimo lavoro! Dimostri una solida comprensione.",
+                "medium": "Buon impegno! Concentrati sul ripasso degli argomenti in cui hai sbagliato.",
+                "low": "Continua a esercitarti! Ripassa i fondamenti e riprova.",
+            },
+            "recommendations": ["Ripassare gli argomenti sbagliati", "Svolgere più esercizi", "Chiedere aiuto se necessario"],
+            "next_goals": ["Migliorare i punti deboli", "Mantenere i buoni risultati"],
+        },
+        "recommendations": {
+            "recommendations": [
+                {"type": "review", "title": "Ripassare i concetti di base", "priority": "high"},
+                {"type": "practice", "title": "Completare gli esercizi di pratica", "priority": "medium"},
+                {"type": "assessment", "title": "Fare un quiz di prova", "priority": "low"},
+            ],
+            "priority_topics": ["Fondamenti", "Concetti chiave"],
+            "learning_path": ["Base", "Intermedio", "Avanzato"],
+            "estimated_duration": "2-3 settimane",
+        },
+        "task_responses": {
+            "quiz_generation": {"questions": []},
+            "study_plan": {"plan": {"message": "Modello di piano di studio di base"}},
+            "feedback": {"feedback": "Continua a esercitarti per migliorare le tue abilità!"},
+            "recommendations": {"recommendations": []},
+        },
+    },
+}
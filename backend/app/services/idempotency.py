@@ -0,0 +1,300 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from app.core.auth import ALGORITHM, SECRET_KEY
+from app.core.config import settings
+from app.services.ai_cache import CacheBackend, ResponseCache, SQLiteCacheTier, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+Record = Dict[str, Any]
+
+
+class IdempotencyConflict(Exception):
+    """The key is held by a request on another worker that did not finish in time"""
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different body"""
+
+
+class IdempotencyStore:
+    """Responses of token-charging requests, remembered by Idempotency-Key.
+
+    A repeated key gets the stored response instead of a second LLM call and
+    token debit. A repeat that arrives while the first request is still
+    running waits for it: through SingleFlight on this worker, and by polling
+    the shared backend when another worker holds the key.
+
+    The worker running a key holds a pending marker in the shared backend.
+    The marker lasts wait_timeout seconds and is refreshed every
+    refresh_interval while the request runs, so a slow request keeps its
+    claim, and a crashed worker's claim still expires.
+    """
+
+    def __init__(self, ttl: int = 86400, max_entries: int = 10000, backend: Optional[CacheBackend] = None,
+                 wait_timeout: float = 120, poll_interval: float = 0.25, refresh_interval: Optional[float] = None):
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval or wait_timeout / 4
+        self.backend = backend
+        self._records = ResponseCache(max_entries=max_entries, default_ttl=ttl, backend=backend)
+        self._inflight = SingleFlight()
+        self._executions = 0
+        self._replays = 0
+        self._waits = 0
+        self._mismatches = 0
+
+    async def run(self, key: str, fingerprint: str,
+                  fn: Callable[[], Awaitable[Optional[Record]]]) -> Tuple[Optional[Record], bool]:
+        """Return (record, executed): run fn once per key, or share the record of the run that already happened.
+
+        Only successful responses are stored, so a failed request can be
+        retried with the same key. Raises IdempotencyKeyReused when the key
+        belongs to a request with a different body.
+        """
+        record = await self._records.aget(key)
+        executed = False
+        if record is None:
+            async def execute():
+                nonlocal executed
+                if not await self._claim(key):
+                    self._waits += 1
+                    return await self._wait_for_other_worker(key)
+                executed = True
+                self._executions += 1
+                refresher = asyncio.ensure_future(self._keep_claimed(key)) if self.backend is not None else None
+                try:
+                    result = await fn()
+                    if result is not None:
+                        result = {**result, "fingerprint": fingerprint}
+                        if 200 <= result["status"] < 300:
+                            # Queued ahead of the release, so waiting workers find the record
+                            self._records.set(key, result)
+                finally:
+                    if refresher is not None:
+                        refresher.cancel()
+                    await self._release(key)
+                return result
+
+            record = await self._inflight.do(key, execute)
+
+        if record is not None and not executed:
+            if record["fingerprint"] != fingerprint:
+                self._mismatches += 1
+                raise IdempotencyKeyReused(key)
+            self._replays += 1
+        return record, executed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "records": len(self._records),
+            "executions": self._executions,
+            "replays": self._replays,
+            "waits_on_other_workers": self._waits,
+            "key_reuse_rejected": self._mismatches,
+            "shared": self.backend is not None,
+        }
+
+    def _pending_key(self, key: str) -> str:
+        return f"{key}:pending"
+
+    async def _claim(self, key: str) -> bool:
+        """Mark key as running on this worker; False if another worker already runs it"""
+        if self.backend is None:
+            return True
+        try:
+            return await self.backend.run(self.backend.add, self._pending_key(key), "1", time.time() + self.wait_timeout)
+        except Exception as e:
+            logger.warning(f"Idempotency claim failed, running without cross-worker protection: {e}")
+            return True
+
+    async def _keep_claimed(self, key: str):
+        """Extend the pending marker until cancelled, so long requests are not run twice"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.backend.run(self.backend.set, self._pending_key(key), "1", time.time() + self.wait_timeout)
+            except Exception as e:
+                logger.warning(f"Idempotency claim refresh failed: {e}")
+
+    async def _release(self, key: str):
+        if self.backend is None:
+            return
+        try:
+            await self.backend.run(self.backend.delete, self._pending_key(key))
+        except Exception as e:
+            logger.warning(f"Idempotency release failed: {e}")
+
+    async def _wait_for_other_worker(self, key: str) -> Optional[Record]:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            record = await self._records.aget(key)
+            if record is not None:
+                return record
+            try:
+                if await self.backend.run(self.backend.get, self._pending_key(key)) is None:
+                    # The other run finished without a storable response
+                    return None
+            except Exception:
+                return None
+        raise IdempotencyConflict(key)
+
+
+def _user_scope(headers: Dict[str, str]) -> Optional[str]:
+    """User id from the bearer token; keys are scoped per user so clients cannot collide"""
+    authorization = headers.get("authorization", "")
+    if not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+class IdempotencyMiddleware:
+    """Apply Idempotency-Key handling to POST requests on the given paths.
+
+    Paths ending in "/" match as prefixes. Requests without the header, or
+    without a valid bearer token, pass through untouched.
+    """
+
+    def __init__(self, app, store: IdempotencyStore, paths: Iterable[str]):
+        self.app = app
+        self.store = store
+        self.exact_paths = {path for path in paths if not path.endswith("/")}
+        self.prefixes = tuple(path for path in paths if path.endswith("/"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not self._applies(scope["path"]):
+            return await self.app(scope, receive, send)
+
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER, "").strip()
+        user_id = _user_scope(headers) if idempotency_key else None
+        if not user_id:
+            return await self.app(scope, receive, send)
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            return await _send_json(send, 400, {"detail": "Idempotency-Key is too long"})
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.blake2b(body, digest_size=16).hexdigest()
+        key = hashlib.blake2b(
+            "\x1f".join((user_id, scope["path"], idempotency_key)).encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+        async def execute() -> Optional[Record]:
+            return await self._forward(scope, _replay_receive(body, receive), send)
+
+        try:
+            record, executed = await self.store.run(key, fingerprint, execute)
+        except IdempotencyConflict:
+            return await _send_json(send, 409, {"detail": "A request with this Idempotency-Key is still in progress"})
+        except IdempotencyKeyReused:
+            return await _send_json(send, 422, {"detail": "Idempotency-Key was already used for a different request"})
+        if executed:
+            return
+        if record is None:
+            # The earlier run left nothing to replay; handle this request normally
+            return await self.app(scope, _replay_receive(body, receive), send)
+        await _send_record(send, record)
+
+    def _applies(self, path: str) -> bool:
+        return path in self.exact_paths or path.startswith(self.prefixes)
+
+    async def _forward(self, scope, receive, send) -> Optional[Record]:
+        """Run the request, passing the response through and capturing it for replay"""
+        response: Record = {"status": 500, "headers": [], "body": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.lower() != b"content-length"
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        try:
+            response["body"] = b"".join(response["body"]).decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        return response
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+def _replay_receive(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+async def _send_record(send, record: Record):
+    body = record["body"].encode("utf-8")
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+    headers += [(b"content-length", str(len(body)).encode()), (b"idempotent-replayed", b"true")]
+    await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status: int, payload: Dict):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def _create_backend() -> Optional[CacheBackend]:
+    """Share records between workers through the AI cache database, in a table of their own"""
+    if not settings.AI_CACHE_DB_PATH:
+        return None
+    try:
+        return SQLiteCacheTier(settings.AI_CACHE_DB_PATH, max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+                               table="idempotency_records")
+    except Exception as e:
+        logger.warning(f"Idempotency records are per worker, shared store unavailable: {e}")
+        return None
+
+
+idempotency_store = IdempotencyStore(
+    ttl=settings.IDEMPOTENCY_TTL,
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+    backend=_create_backend(),
+    wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT
+)
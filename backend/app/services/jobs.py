@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.models import AIJob
+from app.services.websocket_manager import NotificationService
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any], str], Awaitable[Dict[str, Any]]]
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed"""
+
+
+class JobQueue:
+    """In-process queue for long-running AI tasks with job state kept in the database.
+
+    Jobs are claimed with a conditional UPDATE, so several uvicorn workers can
+    share the ai_jobs table without running the same job twice.
+    """
+
+    def __init__(self, workers: int = 2, max_attempts: int = 3, timeout: int = 300,
+                 retry_backoff: float = 2.0):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.retry_backoff = retry_backoff
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._claimed = set()  # Ids of jobs this process has marked running
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the coroutine that runs jobs of this kind: handler(params, user_id) -> result"""
+        self._handlers[kind] = handler
+
+    @property
+    def kinds(self):
+        return sorted(self._handlers)
+
+    async def start(self):
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue()
+        await self._recover()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"AI job queue started with {self.workers} workers")
+
+    async def stop(self):
+        """Cancel the workers and put the jobs they were running back in the queue for the next start"""
+        interrupted = list(self._claimed)
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if interrupted:
+            await self._requeue(interrupted)
+
+    async def submit(self, session: AsyncSession, user_id: str, kind: str, params: Dict[str, Any]) -> AIJob:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = AIJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            kind=kind,
+            status="queued",
+            params=params,
+            attempts=0,
+            max_attempts=self.max_attempts
+        )
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        self._enqueue(job.id)
+        return job
+
+    async def cancel(self, session: AsyncSession, job: AIJob) -> bool:
+        """Cancel a queued or running job; returns False if it already finished"""
+        result = await session.execute(
+            update(AIJob)
+            .where(AIJob.id == job.id, AIJob.status.in_(("queued", "running")))
+            .values(status="cancelled", finished_at=datetime.utcnow())
+        )
+        await session.commit()
+        if result.rowcount == 0:
+            return False
+
+        task = self._running.get(job.id)
+        if task is not None:
+            task.cancel()
+        await session.refresh(job)
+        return True
+
+    def _enqueue(self, job_id: str, delay: float = 0):
+        if self._queue is None:
+            return
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, job_id)
+        else:
+            self._queue.put_nowait(job_id)
+
+    async def _requeue(self, job_ids):
+        """Return interrupted jobs to queued; the interrupted attempt does not count against max_attempts"""
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    update(AIJob)
+                    .where(AIJob.id.in_(job_ids), AIJob.status == "running")
+                    .values(status="queued", started_at=None, attempts=AIJob.attempts - 1)
+                )
+                await session.commit()
+            logger.info(f"Requeued {result.rowcount} interrupted AI jobs")
+        except Exception as e:
+            logger.error(f"Failed to requeue interrupted AI jobs {job_ids}: {e}")
+
+    async def _recover(self):
+        """Requeue jobs left behind by a restart.
+
+        Jobs interrupted by stop() are already queued again. Running jobs
+        older than twice the timeout belong to a process that died without
+        stopping, and go back to queued as well.
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=self.timeout * 2)
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(AIJob)
+                .where(AIJob.status == "running", AIJob.started_at < stale_before)
+                .values(status="queued")
+            )
+            await session.commit()
+            result = await session.execute(
+                select(AIJob.id).where(AIJob.status == "queued").order_by(AIJob.created_at)
+            )
+            for job_id in result.scalars().all():
+                self._enqueue(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"AI job {job_id} crashed the worker loop: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str):
+        try:
+            claimed = await self._claim(job_id)
+            if claimed is not None:
+                await self._execute(job_id, *claimed)
+        finally:
+            self._claimed.discard(job_id)
+
+    async def _claim(self, job_id: str) -> Optional[tuple]:
+        """Mark a queued job running; returns (user_id, kind, params, attempts, max_attempts) or None"""
+        async with AsyncSessionLocal() as session:
+            # Claim the job; another worker process may have taken it already
+            claimed = await session.execute(
+                update(AIJob)
+                .where(AIJob.id == job_id, AIJob.status == "queued")
+                .values(status="running", started_at=datetime.utcnow(), attempts=AIJob.attempts + 1)
+            )
+            await session.commit()
+            if claimed.rowcount == 0:
+                return None
+            self._claimed.add(job_id)
+
+            job = (await session.execute(select(AIJob).where(AIJob.id == job_id))).scalar_one()
+            return job.user_id, job.kind, job.params, job.attempts, job.max_attempts
+
+    async def _execute(self, job_id: str, user_id: str, kind: str, params: Dict[str, Any],
+                       attempts: int, max_attempts: int):
+        handler = self._handlers.get(kind)
+        task = asyncio.create_task(asyncio.wait_for(handler(params, user_id), timeout=self.timeout)) if handler else None
+        if task is not None:
+            self._running[job_id] = task
+        try:
+            if task is None:
+                raise PermanentJobError(f"No handler registered for job kind: {kind}")
+            result = await task
+        except asyncio.CancelledError:
+            if task is not None and task.cancelled() and not asyncio.current_task().cancelling():
+                # Cancelled through the API; the row is already marked cancelled
+                await self._notify(user_id, job_id, kind, "cancelled")
+                return
+            raise
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            retry = not isinstance(e, PermanentJobError) and attempts < max_attempts
+            status = "queued" if retry else "failed"
+            logger.warning(f"AI job {job_id} ({kind}) attempt {attempts} failed: {error}")
+            await self._finish(job_id, status, error=error, finished=not retry)
+            if retry:
+                self._enqueue(job_id, delay=self.retry_backoff * 2 ** (attempts - 1))
+            else:
+                await self._notify(user_id, job_id, kind, "failed", error)
+            return
+        finally:
+            self._running.pop(job_id, None)
+
+        if await self._finish(job_id, "succeeded", result=result):
+            await self._notify(user_id, job_id, kind, "succeeded")
+
+    async def _finish(self, job_id: str, status: str, result: Dict[str, Any] = None,
+                      error: str = None, finished: bool = True) -> bool:
+        values = {"status": status, "error": error}
+        if result is not None:
+            values["result"] = result
+        if finished:
+            values["finished_at"] = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            # Only a job still marked running may be updated; cancelled jobs keep their state
+            updated = await session.execute(
+                update(AIJob).where(AIJob.id == job_id, AIJob.status == "running").values(**values)
+            )
+            await session.commit()
+            return updated.rowcount > 0
+
+    async def _notify(self, user_id: str, job_id: str, kind: str, status: str, error: str = None):
+        try:
+            await NotificationService.send_job_status_notification(user_id, job_id, kind, status, error)
+        except Exception as e:
+            logger.warning(f"Failed to send job notification: {e}")
+
+
+job_queue = JobQueue(
+    workers=settings.AI_JOB_WORKERS,
+    max_attempts=settings.AI_JOB_MAX_ATTEMPTS,
+    timeout=settings.AI_JOB_TIMEOUT
+)
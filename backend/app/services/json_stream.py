@@ -0,0 +1,193 @@
+import json
+from typing import Any, List, Optional
+
+_SIMPLE_ESCAPES = {
+    '"': '"', '\\': '\\', '/': '/',
+    'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'
+}
+
+
+class JsonStringFieldStreamer:
+    """Decode one top-level string field of a JSON object while it is still streaming.
+
+    Feed raw chunks of model output as they arrive; feed() returns the newly
+    decoded characters of the field (escape sequences resolved), so a letter's
+    "content" can be shown before the closing brace of the object is received.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.done = False
+
+        self._depth = 0
+        self._in_string = False
+        self._escape: Optional[str] = None  # Pending escape text after a backslash
+        self._pending_surrogate = ""
+        self._string_is_key = False
+        self._after_colon = False
+        self._current = []
+        self._last_key = None
+        self._capturing = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the field characters it completed"""
+        emitted = []
+        for char in chunk:
+            if self.done:
+                break
+            if self._in_string:
+                self._consume_string_char(char, emitted)
+            else:
+                self._consume_structural_char(char)
+        return "".join(emitted)
+
+    def _consume_structural_char(self, char: str):
+        if char in "{[":
+            self._depth += 1
+            self._after_colon = False
+        elif char in "}]":
+            self._depth -= 1
+        elif char == ":":
+            self._after_colon = True
+        elif char == ",":
+            self._after_colon = False
+        elif char == '"':
+            self._in_string = True
+            self._current = []
+            at_top_level = self._depth == 1
+            self._string_is_key = at_top_level and not self._after_colon
+            self._capturing = at_top_level and self._after_colon and self._last_key == self.field
+
+    def _consume_string_char(self, char: str, emitted: list):
+        if self._escape is not None:
+            self._escape += char
+            decoded = self._decode_escape()
+            if decoded is not None:
+                self._escape = None
+                self._append(decoded, emitted)
+            return
+
+        if char == "\\":
+            self._escape = ""
+        elif char == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._last_key = "".join(self._current)
+            elif self._capturing:
+                self._capturing = False
+                self.done = True
+            self._after_colon = False
+        else:
+            self._append(char, emitted)
+
+    def _decode_escape(self) -> Optional[str]:
+        """Return the decoded text for the pending escape, or None if incomplete"""
+        escape = self._escape
+        if escape[0] != "u":
+            return _SIMPLE_ESCAPES.get(escape[0], escape[0])
+        if len(escape) < 5:
+            return None
+
+        code_point = chr(int(escape[1:5], 16))
+        if "\ud800" <= code_point <= "\udbff":
+            # High surrogate: wait for the low half before emitting
+            self._pending_surrogate = code_point
+            return ""
+        if self._pending_surrogate and "\udc00" <= code_point <= "\udfff":
+            pair = self._pending_surrogate + code_point
+            self._pending_surrogate = ""
+            return pair.encode("utf-16", "surrogatepass").decode("utf-16")
+        return code_point
+
+    def _append(self, text: str, emitted: list):
+        if self._string_is_key:
+            self._current.append(text)
+        elif self._capturing:
+            emitted.append(text)
+
+
+
+class JsonArrayItemStreamer:
+    """Parse the objects of one top-level array field of a JSON object while it is still streaming.
+
+    feed() returns every object of the array whose closing brace arrived in
+    the chunk, already decoded, so the first quiz question can be used before
+    the model has written the rest of the "questions" array.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.done = False
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._after_colon = False
+        self._key = []
+        self._last_key = None
+        self._in_array = False
+        self._item = []  # Raw text of the object being captured
+        self._capturing = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk and return the array items it completed"""
+        items = []
+        start = 0
+        for index, char in enumerate(chunk):
+            if self.done:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._last_key = "".join(self._key)
+                    self._after_colon = False
+                elif self._string_is_key:
+                    self._key.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_is_key = self._depth == 1 and not self._after_colon
+                self._key = []
+            elif char in "{[":
+                if self._depth == 1 and char == "[" and self._after_colon and self._last_key == self.field:
+                    self._in_array = True
+                elif self._depth == 2 and char == "{" and self._in_array:
+                    self._capturing = True
+                    start = index
+                self._depth += 1
+                self._after_colon = False
+            elif char in "}]":
+                self._depth -= 1
+                if self._capturing and self._depth == 2:
+                    self._capturing = False
+                    self._item.append(chunk[start:index + 1])
+                    item = self._decode_item()
+                    if item is not None:
+                        items.append(item)
+                elif self._in_array and self._depth == 1:
+                    self._in_array = False
+                    self.done = True
+            elif char == ":":
+                self._after_colon = True
+            elif char == ",":
+                self._after_colon = False
+
+        if self._capturing:
+            self._item.append(chunk[start:])
+        return items
+
+    def _decode_item(self) -> Optional[Any]:
+        raw = "".join(self._item)
+        self._item = []
+        try:
+            return json.loads(raw)
+        except ValueError:
+            # A malformed item is skipped; the rest of the array can still be used
+            return None
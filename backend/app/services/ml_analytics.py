@@ -122,7 +122,7 @@ class MLAnalytics:
                 select(QuizAttempt, Quiz)
                 .join(Quiz, QuizAttempt.quiz_id == Quiz.id)
                 .where(Quiz.user_id == user_id)
-                .order_by(QuizAttempt.created_at.desc())
+                .order_by(QuizAttempt.completed_at.desc())
                 .limit(50)
             )
             attempts = attempts_result.all()
@@ -145,7 +145,7 @@ class MLAnalytics:
                 performance_data.append({
                     "score": attempt.score,
                     "study_time": 2,  # Default, would be tracked in real app
-                    "date": attempt.created_at
+                    "date": attempt.completed_at
                 })
             
             # Generate insights
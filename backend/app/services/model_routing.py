@@ -0,0 +1,108 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.ai_metrics import ai_metrics
+
+logger = logging.getLogger(__name__)
+
+# Cheapest first; escalation moves one tier to the right
+TIER_ORDER = ("fast", "standard")
+
+# Tier per AI task, for ai_services tasks and AdvancedAIService task types.
+# Short, loosely structured answers go to the fast tier; long or graded
+# output that teachers rely on stays on the standard model.
+TASK_TIERS = {
+    "chat": "fast",
+    "summary": "fast",
+    "summary_chunk": "fast",
+    "summary_detailed": "standard",
+    "study_schedule": "fast",
+    "performance_prediction": "fast",
+    "feedback": "fast",
+    "recommendations": "fast",
+    "parent_letter": "standard",
+    "quiz": "standard",
+    "assessment": "standard",
+    "learning_path": "standard",
+    "grading": "standard",
+    "grading_batch": "standard",
+    "adaptive_questions": "standard",
+    "quiz_generation": "standard",
+    "study_plan": "standard",
+}
+
+
+def _parse_routes(value: str) -> Dict[str, str]:
+    """Parse "task=tier,task=tier" overrides, ignoring malformed entries"""
+    routes = {}
+    for item in value.split(","):
+        task, _, tier = item.partition("=")
+        task, tier = task.strip(), tier.strip()
+        if task and tier in TIER_ORDER:
+            routes[task] = tier
+        elif item.strip():
+            logger.warning(f"Ignoring invalid AI model route {item.strip()!r}")
+    return routes
+
+
+class ModelRouter:
+    """Choose the model for each AI task from its tier, and the model to escalate to"""
+
+    def __init__(self, tier_models: Dict[str, str], task_tiers: Dict[str, str],
+                 default_tier: str = "standard", escalation: bool = True):
+        self.tier_models = dict(tier_models)
+        self.task_tiers = dict(task_tiers)
+        self.default_tier = default_tier
+        self.escalation = escalation
+        self._escalations = defaultdict(int)  # (task, from_model, to_model) -> count
+        ai_metrics.set_model_tiers(self.model_tiers())
+
+    def tier_for(self, task: Optional[str]) -> str:
+        return self.task_tiers.get(task, self.default_tier)
+
+    def model_for(self, task: Optional[str]) -> str:
+        return self.tier_models[self.tier_for(task)]
+
+    def escalation_for(self, model: str) -> Optional[str]:
+        """Model of the next tier above model's, or None at the top or with escalation disabled"""
+        if not self.escalation:
+            return None
+        tiers = [tier for tier, tier_model in self.tier_models.items() if tier_model == model]
+        if not tiers:
+            return None
+        index = max(TIER_ORDER.index(tier) for tier in tiers)
+        for tier in TIER_ORDER[index + 1:]:
+            if self.tier_models[tier] != model:
+                return self.tier_models[tier]
+        return None
+
+    def record_escalation(self, task: Optional[str], from_model: str, to_model: str):
+        logger.info(f"Escalating {task} from {from_model} to {to_model} after invalid output")
+        self._escalations[(task or "unknown", from_model, to_model)] += 1
+
+    def model_tiers(self) -> Dict[str, str]:
+        """Tier of each model; a model used by several tiers counts as the cheapest"""
+        tiers = {}
+        for tier in reversed(TIER_ORDER):
+            tiers[self.tier_models[tier]] = tier
+        return tiers
+
+    def get_stats(self) -> Dict:
+        return {
+            "tiers": self.tier_models,
+            "routes": {task: self.tier_for(task) for task in sorted(self.task_tiers)},
+            "escalation": self.escalation,
+            "escalations": [
+                {"task": task, "from": from_model, "to": to_model, "count": count}
+                for (task, from_model, to_model), count in sorted(self._escalations.items())
+            ],
+        }
+
+
+model_router = ModelRouter(
+    tier_models={"fast": settings.AI_MODEL_FAST, "standard": settings.AI_MODEL_STANDARD},
+    task_tiers={**TASK_TIERS, **_parse_routes(settings.AI_MODEL_ROUTES)},
+    escalation=settings.AI_MODEL_ESCALATION
+)
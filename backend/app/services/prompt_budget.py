@@ -0,0 +1,149 @@
+import re
+from functools import lru_cache
+from typing import Dict, List
+
+# Words and single punctuation marks; BPE vocabularies split long words into ~4 character pieces
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Role markers and separators the API adds around every chat message
+MESSAGE_OVERHEAD = 4
+
+# Appended where truncate_to_tokens cut the text
+_ELLIPSIS = "…"
+
+# Strings longer than this are counted without caching to keep the cache small
+_CACHEABLE_LENGTH = 8192
+
+# Prompt token budgets per task
+TASK_BUDGETS = {
+    "chat_history": 1500,
+    "summary": 3000,
+}
+
+
+@lru_cache(maxsize=8192)
+def _count_tokens(text: str) -> int:
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the model's token count for text without a tokenizer download"""
+    if not text:
+        return 0
+    if len(text) > _CACHEABLE_LENGTH:
+        return _count_tokens.__wrapped__(text)
+    return _count_tokens(text)
+
+
+def estimate_message_tokens(messages: List[Dict]) -> int:
+    return sum(estimate_tokens(str(message.get("content") or "")) + MESSAGE_OVERHEAD for message in messages)
+
+
+def _words_within(words: List[str], max_tokens: int) -> int:
+    """Number of leading words that fit within max_tokens"""
+    used = 0
+    for index, word in enumerate(words):
+        used += estimate_tokens(word)
+        if used > max_tokens:
+            return index
+    return len(words)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary and mark the cut with an ellipsis, all within max_tokens"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # The ellipsis counts against the budget too
+    budget = max_tokens - estimate_tokens(_ELLIPSIS)
+    if budget < 0:
+        return ""
+    words = text.split()
+    return " ".join(words[:_words_within(words, budget)] + [_ELLIPSIS])
+
+
+def _summarize_dropped(messages: List[Dict], budget: int) -> str:
+    """Condense older messages to one line each, newest first, until the budget is spent"""
+    lines = []
+    used = estimate_tokens("Earlier in this conversation:")
+    for message in reversed(messages):
+        content = " ".join(str(message.get("content") or "").split())
+        first_sentence = _SENTENCE_END.split(content, 1)[0]
+        line = f"- {message.get('role', 'user')}: {truncate_to_tokens(first_sentence, 40)}"
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    if not lines:
+        return ""
+    return "Earlier in this conversation:\n" + "\n".join(reversed(lines))
+
+
+def trim_history(history: List[Dict], budget: int) -> List[Dict]:
+    """Keep the most recent messages that fit the budget.
+
+    Older messages that no longer fit are condensed into a short system note
+    instead of being dropped silently.
+    """
+    if not history or estimate_message_tokens(history) <= budget:
+        return list(history or [])
+
+    # Reserve a fifth of the budget for the note about older messages
+    summary_budget = budget // 5
+    kept = []
+    used = 0
+    for message in reversed(history):
+        cost = estimate_message_tokens([message])
+        if used + cost > budget - summary_budget:
+            if not kept:
+                # The latest message alone is too long: keep its beginning
+                content = truncate_to_tokens(str(message.get("content") or ""), budget - summary_budget - MESSAGE_OVERHEAD)
+                kept.append({**message, "content": content})
+            break
+        kept.append(message)
+        used += cost
+    kept.reverse()
+
+    dropped = history[:len(history) - len(kept)]
+    note = _summarize_dropped(dropped, summary_budget - MESSAGE_OVERHEAD)
+    if note:
+        kept.insert(0, {"role": "system", "content": note})
+    return kept
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of at most max_tokens, preferring paragraph and sentence breaks"""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            if estimate_tokens(sentence) <= max_tokens:
+                pieces.append(sentence)
+                continue
+            # A single sentence over budget is split on words
+            words = sentence.split()
+            while words:
+                taken = _words_within(words, max_tokens) or 1
+                pieces.append(" ".join(words[:taken]))
+                words = words[taken:]
+
+    chunks = []
+    current = []
+    used = 0
+    for piece in pieces:
+        cost = estimate_tokens(piece)
+        if current and used + cost > max_tokens:
+            chunks.append("\n\n".join(current))
+            current = []
+            used = 0
+        current.append(piece)
+        used += cost
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -0,0 +1,360 @@
+import asyncio
+import hashlib
+import logging
+import random
+import re
+from collections import Counter, OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.models import QuestionBankItem
+from app.services.ai_dispatch import Priority
+from app.services.ai_metrics import ai_metrics
+from app.services.ai_services import _request_quiz_questions, get_fallback_quiz_questions, stream_quiz_questions
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str, str]
+
+_DIFFICULTY_ORDER = {"easy": 0, "medium": 1, "hard": 2}
+
+_LANGUAGE_TAG = re.compile(r"([a-z]{2})(?:[-_][a-z0-9]+)*")
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+_INSERT_IGNORE = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def normalize_language(language: str) -> str:
+    """Two-letter code for the question bank: "en-US" and "EN_gb" become "en".
+
+    Anything that is not a language tag becomes "en", the language quiz
+    prompts already use for codes they do not know.
+    """
+    match = _LANGUAGE_TAG.fullmatch((language or "").lower().strip())
+    if match is None:
+        logger.warning(f"Unknown quiz language {language!r}, pooling it as English")
+        return "en"
+    return match.group(1)
+
+
+def question_fingerprint(key: PoolKey, question: Dict) -> str:
+    """Identify a question within its pool by normalized text, so whitespace or case changes do not count as new"""
+    text = " ".join(str(question.get("question_text", "")).lower().split())
+    return hashlib.blake2b("\x1f".join((*key, text)).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _bank_item_to_question(item: QuestionBankItem) -> Dict:
+    return {
+        "question_text": item.question_text,
+        "question_type": item.question_type,
+        "correct_answer": item.correct_answer,
+        "options": item.options,
+        "explanation": item.explanation,
+        "difficulty": item.difficulty,
+        "learning_objective": item.learning_objective,
+    }
+
+
+async def _insert_new_rows(session, rows: List[Dict]):
+    """Insert question bank rows, skipping fingerprints that are already stored.
+
+    A refill and a request can store the same question at the same time, so
+    duplicates are ignored by the database instead of failing the batch.
+    """
+    if not rows:
+        return
+    dialect_insert = _INSERT_IGNORE.get(session.bind.dialect.name)
+    if dialect_insert is not None:
+        await session.execute(
+            dialect_insert(QuestionBankItem).values(rows).on_conflict_do_nothing(index_elements=["fingerprint"])
+        )
+        return
+    for row in rows:
+        try:
+            async with session.begin_nested():
+                await session.execute(insert(QuestionBankItem).values(**row))
+        except IntegrityError:
+            pass
+
+
+class QuestionPool:
+    """Pre-generated quiz questions per (topic, level, language).
+
+    Popular combinations are filled in the background at batch priority, so
+    quiz requests are answered by sampling the pool instead of waiting on the
+    model. Each user is served a question from a pool at most once; pools are
+    topped up when they run low or a user has seen most of them.
+
+    Every generated question is also stored in the question_bank table. The
+    in-memory pools are loaded from it on demand, so questions survive
+    restarts and the model is only asked for the questions the bank lacks.
+    """
+
+    def __init__(self, target_size: int = 30, max_size: int = 200, fill_batch: int = 10,
+                 min_requests: int = 2, max_pools: int = 500, max_user_histories: int = 50000):
+        self.target_size = target_size
+        self.max_size = max_size
+        self.fill_batch = fill_batch
+        self.min_requests = min_requests
+        self.max_pools = max_pools
+        self.max_user_histories = max_user_histories
+
+        # key -> {fingerprint: question}; least recently requested pool first
+        self._pools: "OrderedDict[PoolKey, Dict[str, Dict]]" = OrderedDict()
+        # (user_id, key) -> fingerprints already served to that user
+        self._served: "OrderedDict[Tuple[str, PoolKey], set]" = OrderedDict()
+        self._requests = Counter()
+        self._refills: Dict[PoolKey, asyncio.Task] = {}
+        self._pool_hits = 0
+        self._bank_hits = 0
+        self._pool_misses = 0
+
+    @staticmethod
+    def make_key(topic: str, level: str, language: str) -> PoolKey:
+        # Bounded to the question_bank column sizes
+        return (" ".join(topic.lower().split())[:255], level.lower().strip()[:50], normalize_language(language))
+
+    async def get_questions(self, topic: str, level: str, language: str, num_questions: int,
+                            user_id: Optional[str] = None) -> List[Dict]:
+        """Serve questions from the pool, generating directly only when it cannot cover the request"""
+        key = self.make_key(topic, level, language)
+        self._requests[key] += 1
+
+        questions = await self._take_stored(key, num_questions, user_id)
+        if questions is not None:
+            return questions
+
+        self._pool_misses += 1
+        questions = self._unserved(key, user_id)
+        shortfall = num_questions - len(questions)
+        try:
+            generated = await _request_quiz_questions(
+                topic, level, language, shortfall, avoid_questions=self._seen_texts(key)
+            )
+        except Exception as e:
+            logger.warning(f"Quiz generation failed, using template questions: {e}")
+            ai_metrics.record_fallback("quiz")
+            return questions + get_fallback_quiz_questions(topic, level, language, shortfall)
+
+        await self._store(key, generated)
+        questions += generated[:shortfall]
+        self._mark_served(key, user_id, questions)
+        self._schedule_refill(key, topic, level, language)
+        return questions
+
+    async def stream_questions(self, topic: str, level: str, language: str, num_questions: int,
+                               user_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Streaming variant of get_questions.
+
+        Yields {"type": "question", "question": ...} per question, pooled ones at
+        once and generated ones as the model completes each, then
+        {"type": "done", "questions": [...]} with the full list.
+        """
+        key = self.make_key(topic, level, language)
+        self._requests[key] += 1
+
+        questions = await self._take_stored(key, num_questions, user_id)
+        if questions is None:
+            self._pool_misses += 1
+            questions = self._unserved(key, user_id)
+            for question in questions:
+                yield {"type": "question", "question": question}
+            shortfall = num_questions - len(questions)
+            async for event in stream_quiz_questions(
+                topic, level, language, shortfall, avoid_questions=self._seen_texts(key)
+            ):
+                if event["type"] == "question":
+                    yield event
+                elif event["ai_generated"]:
+                    await self._store(key, event["questions"])
+                    questions += event["questions"]
+                    self._mark_served(key, user_id, questions)
+                    self._schedule_refill(key, topic, level, language)
+                else:
+                    questions += event["questions"]
+        else:
+            for question in questions:
+                yield {"type": "question", "question": question}
+        yield {"type": "done", "questions": questions}
+
+    def add(self, key: PoolKey, questions: List[Dict]) -> int:
+        """Add generated questions to a pool, skipping duplicates; returns how many were new"""
+        pool = self._pools.setdefault(key, {})
+        self._pools.move_to_end(key)
+        added = 0
+        for question in questions:
+            fingerprint = question_fingerprint(key, question)
+            if fingerprint not in pool:
+                pool[fingerprint] = question
+                added += 1
+        while len(pool) > self.max_size:
+            pool.pop(next(iter(pool)))
+        while len(self._pools) > self.max_pools:
+            oldest_key, _ = self._pools.popitem(last=False)
+            self._requests.pop(oldest_key, None)
+        return added
+
+    def get_stats(self) -> Dict:
+        served = self._pool_hits + self._bank_hits + self._pool_misses
+        return {
+            "pools": len(self._pools),
+            "questions": sum(len(pool) for pool in self._pools.values()),
+            "refilling": len(self._refills),
+            "pool_hits": self._pool_hits,
+            "bank_hits": self._bank_hits,
+            "pool_misses": self._pool_misses,
+            # Share of requests answered without waiting on the model
+            "hit_rate": round((self._pool_hits + self._bank_hits) / served, 4) if served else 0.0,
+        }
+
+    async def close(self):
+        for task in list(self._refills.values()):
+            task.cancel()
+        await asyncio.gather(*self._refills.values(), return_exceptions=True)
+        self._refills.clear()
+
+    async def _take_stored(self, key: PoolKey, count: int, user_id: Optional[str]) -> Optional[List[Dict]]:
+        """Take questions from the memory pool, loading more from the question bank if it is short"""
+        questions = self._take(key, count, user_id)
+        if questions is not None:
+            self._pool_hits += 1
+            ai_metrics.record_cache("quiz", True, tier="pool")
+            return questions
+
+        # The memory pool is short: pull more stored questions before asking the model
+        await self._load_from_bank(key, count)
+        questions = self._take(key, count, user_id)
+        if questions is not None:
+            self._bank_hits += 1
+            ai_metrics.record_cache("quiz", True, tier="bank")
+        return questions
+
+    def _unserved(self, key: PoolKey, user_id: Optional[str]) -> List[Dict]:
+        """Pooled questions user_id has not been served yet"""
+        pool = self._pools.get(key) or {}
+        served = self._served.get((user_id, key), set()) if user_id else set()
+        return [question for fingerprint, question in pool.items() if fingerprint not in served]
+
+    def _take(self, key: PoolKey, count: int, user_id: Optional[str]) -> Optional[List[Dict]]:
+        pool = self._pools.get(key)
+        if not pool:
+            return None
+        self._pools.move_to_end(key)
+
+        served = self._served.get((user_id, key), set()) if user_id else set()
+        unseen = [fingerprint for fingerprint in pool if fingerprint not in served]
+        if len(unseen) - count < self.fill_batch or len(pool) < self.target_size:
+            topic, level, language = key
+            self._schedule_refill(key, topic, level, language)
+        if len(unseen) < count:
+            return None
+
+        questions = [pool[fingerprint] for fingerprint in random.sample(unseen, count)]
+        questions.sort(key=lambda question: _DIFFICULTY_ORDER.get(question.get("difficulty"), 1))
+        self._mark_served(key, user_id, questions)
+        return questions
+
+    def _mark_served(self, key: PoolKey, user_id: Optional[str], questions: List[Dict]):
+        if not user_id:
+            return
+        history_key = (user_id, key)
+        served = self._served.setdefault(history_key, set())
+        self._served.move_to_end(history_key)
+        served.update(question_fingerprint(key, question) for question in questions)
+        while len(self._served) > self.max_user_histories:
+            self._served.popitem(last=False)
+
+    def _seen_texts(self, key: PoolKey, limit: int = 30) -> List[str]:
+        """Question texts the model should avoid: the most recently added questions in the pool"""
+        pool = self._pools.get(key) or {}
+        return [question["question_text"] for question in list(pool.values())[-limit:]]
+
+    def _schedule_refill(self, key: PoolKey, topic: str, level: str, language: str):
+        if key in self._refills or self._requests[key] < self.min_requests:
+            return
+        if len(self._pools.get(key) or {}) >= self.max_size:
+            return
+        task = asyncio.create_task(self._refill(key, topic, level, language))
+        self._refills[key] = task
+        task.add_done_callback(lambda _: self._refills.pop(key, None))
+
+    async def _refill(self, key: PoolKey, topic: str, level: str, language: str):
+        try:
+            questions = await _request_quiz_questions(
+                topic, level, language, self.fill_batch,
+                avoid_questions=self._seen_texts(key),
+                priority=Priority.BATCH
+            )
+        except Exception as e:
+            logger.warning(f"Question pool refill for {key} failed: {e}")
+            return
+        added = await self._store(key, questions)
+        logger.info(f"Question pool {key} topped up with {added} questions")
+
+    async def _store(self, key: PoolKey, questions: List[Dict]) -> int:
+        """Add generated questions to the memory pool and persist new ones to the question bank"""
+        added = self.add(key, questions)
+        topic, level, language = key
+        by_fingerprint = {question_fingerprint(key, question): question for question in questions}
+        rows = [
+            {
+                "topic": topic,
+                "level": level,
+                "language": language,
+                "source": "ai",
+                "fingerprint": fingerprint,
+                "question_text": question.get("question_text"),
+                "question_type": question.get("question_type", "multiple_choice"),
+                "correct_answer": question.get("correct_answer"),
+                "options": question.get("options"),
+                "explanation": question.get("explanation"),
+                "difficulty": question.get("difficulty"),
+                "learning_objective": question.get("learning_objective"),
+            }
+            for fingerprint, question in by_fingerprint.items()
+            if question.get("question_text")
+        ]
+        try:
+            async with AsyncSessionLocal() as session:
+                await _insert_new_rows(session, rows)
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to store questions in the question bank: {e}")
+        return added
+
+    async def _load_from_bank(self, key: PoolKey, num_questions: int):
+        """Load stored questions for key that are not in the memory pool yet"""
+        topic, level, language = key
+        in_memory = list(self._pools.get(key) or {})
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(QuestionBankItem)
+                    .where(
+                        QuestionBankItem.topic == topic,
+                        QuestionBankItem.level == level,
+                        QuestionBankItem.language == language,
+                        QuestionBankItem.fingerprint.notin_(in_memory)
+                    )
+                    .order_by(QuestionBankItem.id.desc())
+                    .limit(max(self.target_size, num_questions))
+                )
+                items = result.scalars().all()
+        except Exception as e:
+            logger.warning(f"Failed to load questions from the question bank: {e}")
+            return
+        if items:
+            self.add(key, [_bank_item_to_question(item) for item in items])
+
+
+question_pool = QuestionPool(
+    target_size=settings.QUIZ_POOL_TARGET_SIZE,
+    max_size=settings.QUIZ_POOL_MAX_SIZE,
+    fill_batch=settings.QUIZ_POOL_FILL_BATCH,
+    min_requests=settings.QUIZ_POOL_MIN_REQUESTS
+)
@@ -0,0 +1,338 @@
+import itertools
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+_NON_WORD = re.compile(r"[^\w]+")
+_CONTRACTIONS = ((re.compile(r"\bcan'?t\b"), "can not"), (re.compile(r"\bwon'?t\b"), "will not"),
+                 (re.compile(r"n't\b"), " not"))
+
+# Words that carry no meaning of their own in a question. Question words
+# (how, what, why, ...) are deliberately kept: they change what is asked.
+_STOPWORDS = {
+    "en": {
+        "a", "an", "the", "to", "do", "does", "did", "i", "me", "my", "we", "our", "you", "your",
+        "is", "are", "was", "be", "can", "could", "should", "would", "will", "please", "of", "for",
+        "in", "on", "at", "it", "this", "that", "there", "some", "any", "with", "and", "or", "so",
+        "just", "get", "one",
+    },
+    "de": {
+        "der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einem", "einer", "ich",
+        "mich", "mir", "mein", "meine", "wir", "du", "sie", "ist", "sind", "kann", "können", "bitte",
+        "zu", "von", "für", "in", "im", "an", "am", "auf", "es", "und", "oder", "man", "mit",
+    },
+    "fr": {
+        "le", "la", "les", "l", "un", "une", "des", "de", "du", "d", "je", "j", "me", "m", "mon",
+        "ma", "mes", "nous", "vous", "est", "sont", "peux", "puis", "peut", "comment", "s", "il",
+        "pour", "à", "au", "aux", "en", "dans", "et", "ou", "qu", "que", "ce", "c", "avec",
+    },
+    "it": {
+        "il", "lo", "la", "i", "gli", "le", "l", "un", "uno", "una", "di", "del", "della", "io",
+        "mi", "mio", "mia", "noi", "voi", "è", "sono", "posso", "può", "per", "a", "al", "in",
+        "nel", "e", "o", "che", "si", "con", "da",
+    },
+}
+
+_NEGATIONS = {
+    "en": {"not", "no", "never", "cannot", "without", "nothing", "none", "nobody"},
+    "de": {"nicht", "kein", "keine", "keinen", "keinem", "keiner", "keines", "nie", "niemals", "ohne", "nichts"},
+    "fr": {"ne", "n", "pas", "jamais", "aucun", "aucune", "sans", "rien", "personne"},
+    "it": {"non", "mai", "nessun", "nessuno", "nessuna", "senza", "niente", "nulla"},
+}
+
+# Common verbs of platform questions mapped to one canonical form, so
+# "how to make a quiz" and "how do I create a quiz" compare as equal
+_SYNONYMS = {
+    "en": {
+        "make": "create", "build": "create", "generate": "create", "add": "create", "new": "create",
+        "remove": "delete", "erase": "delete",
+        "change": "edit", "modify": "edit", "update": "edit",
+        "see": "view", "show": "view", "display": "view",
+    },
+    "de": {
+        "machen": "erstellen", "anlegen": "erstellen", "erzeugen": "erstellen", "generieren": "erstellen",
+        "entfernen": "löschen",
+        "ändern": "bearbeiten", "anpassen": "bearbeiten",
+        "anzeigen": "sehen", "ansehen": "sehen",
+    },
+    "fr": {
+        "faire": "créer", "générer": "créer", "ajouter": "créer",
+        "effacer": "supprimer", "retirer": "supprimer",
+        "changer": "modifier",
+        "afficher": "voir",
+    },
+    "it": {
+        "fare": "creare", "generare": "creare", "aggiungere": "creare",
+        "cancellare": "eliminare", "rimuovere": "eliminare",
+        "cambiare": "modificare",
+        "mostrare": "vedere", "visualizzare": "vedere",
+    },
+}
+
+
+def _merged(tables: Dict[str, Any]) -> Any:
+    merged = {} if isinstance(next(iter(tables.values())), dict) else set()
+    for table in tables.values():
+        merged.update(table)
+    return merged
+
+
+_ALL_STOPWORDS = _merged(_STOPWORDS)
+_ALL_NEGATIONS = _merged(_NEGATIONS)
+_ALL_SYNONYMS = _merged(_SYNONYMS)
+
+
+def _stem(word: str) -> str:
+    """Strip English plural and verb endings so "quizzes" and "quiz" compare equal"""
+    if len(word) > 5 and word.endswith("zzes"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ches", "shes", "xes", "ses")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+class _Signature(NamedTuple):
+    """What a question is about: its canonical content words, and whether it is negated"""
+    words: Tuple[str, ...]
+    negated: bool
+
+
+def _analyze(text: str, language: Optional[str] = None) -> Tuple[str, _Signature]:
+    """Canonical text used for the n-gram vector, and the signature two matches must share"""
+    lowered = text.lower().replace("’", "'")
+    for pattern, replacement in _CONTRACTIONS:
+        lowered = pattern.sub(replacement, lowered)
+    stopwords = _STOPWORDS.get(language, _ALL_STOPWORDS)
+    negations = _NEGATIONS.get(language, _ALL_NEGATIONS)
+    synonyms = _SYNONYMS.get(language, _ALL_SYNONYMS)
+
+    words, negated = [], False
+    for word in _NON_WORD.sub(" ", lowered).split():
+        if word in negations:
+            negated = True
+        elif word not in stopwords:
+            word = _stem(word)
+            words.append(synonyms.get(word, word))
+    return " ".join(words), _Signature(tuple(sorted(words)), negated)
+
+
+def _ngrams(text: str, n: int = 3) -> Counter:
+    """Character n-gram counts of the normalized text, with word boundaries marked"""
+    normalized = " " + _NON_WORD.sub(" ", text.lower()).strip() + " "
+    return Counter(normalized[i:i + n] for i in range(len(normalized) - n + 1))
+
+
+def _vectorize(counts: Counter) -> Dict[str, float]:
+    """Sublinear TF weights; IDF is applied at lookup time, so stored vectors never go stale"""
+    return {gram: 1.0 + math.log(count) for gram, count in counts.items()}
+
+
+_NEGATING_PREFIXES = ("un", "in", "im", "dis", "non")
+
+
+def _is_negated_form(word: str, other: str) -> bool:
+    """True if word is other with a negating prefix, e.g. "unavailable" for "available"."""
+    return len(other) >= 4 and any(word == prefix + other for prefix in _NEGATING_PREFIXES)
+
+
+def _same_question(query: _Signature, candidate: _Signature) -> bool:
+    """Guard for what the similarity score cannot see: a flipped meaning.
+
+    Trigram similarity scores "unavailable" close to "available" and "not
+    saving" close to "saving", yet either difference changes the answer.
+    Other differences in wording are left to the threshold.
+    """
+    if query.negated != candidate.negated:
+        return False
+    query_words, candidate_words = set(query.words), set(candidate.words)
+    for word in query_words ^ candidate_words:
+        others = candidate_words if word in query_words else query_words
+        if any(_is_negated_form(word, other) or _is_negated_form(other, word) for other in others):
+            return False
+    return True
+
+
+class _ScopeIndex:
+    """N-gram vectors and an inverted n-gram index for one (role, language) scope.
+
+    Similarity is the cosine of TF-IDF vectors, with the IDF taken from the
+    entries of the scope at lookup time: n-grams most cached questions
+    share weigh little, and n-grams no cached question has weigh most.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, set] = {}
+        self.vectors: Dict[int, Dict[str, float]] = {}
+
+    def add(self, entry_id: int, vector: Dict[str, float]):
+        for gram in vector:
+            self.postings.setdefault(gram, set()).add(entry_id)
+        self.vectors[entry_id] = vector
+
+    def remove(self, entry_id: int):
+        vector = self.vectors.pop(entry_id, None)
+        for gram in vector or ():
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(entry_id)
+                if not posting:
+                    del self.postings[gram]
+
+    def _idf(self, gram: str) -> float:
+        """Smoothed inverse document frequency of gram among the scope's entries"""
+        posting = self.postings.get(gram)
+        return math.log((1 + len(self.vectors)) / (1 + (len(posting) if posting else 0))) + 1.0
+
+    def candidates(self, query: Dict[str, float], min_score: float, probe_grams: int,
+                   max_candidates: int) -> List[Tuple[float, int]]:
+        """(score, entry_id) of the entries scoring at least min_score, best first"""
+        # Probe only the rarest n-grams; common ones would pull in most of the index
+        present = [gram for gram in query if gram in self.postings]
+        present.sort(key=lambda gram: len(self.postings[gram]))
+        overlap = Counter()
+        for gram in present[:probe_grams]:
+            overlap.update(self.postings[gram])
+        if not overlap:
+            return []
+
+        idf = {gram: self._idf(gram) for gram in query}
+        query_weights = {gram: weight * idf[gram] for gram, weight in query.items()}
+        query_norm = math.sqrt(sum(weight * weight for weight in query_weights.values())) or 1.0
+
+        # Exact cosine only for the entries sharing the most probed n-grams
+        scored = []
+        for entry_id, _ in overlap.most_common(max_candidates):
+            vector = self.vectors[entry_id]
+            dot = norm = 0.0
+            for gram, weight in vector.items():
+                gram_idf = idf[gram] if gram in idf else self._idf(gram)
+                norm += (weight * gram_idf) ** 2
+                if gram in query_weights:
+                    dot += query_weights[gram] * weight * gram_idf
+            score = dot / (query_norm * (math.sqrt(norm) or 1.0))
+            if score >= min_score:
+                scored.append((score, entry_id))
+        scored.sort(reverse=True)
+        return scored
+
+
+class SemanticCache:
+    """Approximate-match cache for short questions, such as chatbot messages.
+
+    Questions are reduced to their content words (stopwords dropped, plurals
+    and common verbs canonicalized) and compared as TF-IDF weighted
+    character trigram vectors, so paraphrases and typos of a cached question
+    reuse its answer when the cosine similarity reaches the threshold. A
+    match must also have the same negation and no word turned into its
+    negated form ("available" / "unavailable"). Each scope (e.g. role and
+    language) has its own index; entries are evicted least recently used
+    first.
+    """
+
+    def __init__(self, threshold: float = 0.8, max_entries: int = 20000, ttl: int = 3600,
+                 probe_grams: int = 8, max_candidates: int = 64):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.probe_grams = probe_grams
+        self.max_candidates = max_candidates
+
+        # entry_id -> (scope, expires_at, text, value, signature); least recently used first
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._scopes: Dict[Hashable, _ScopeIndex] = {}
+        self._ids = itertools.count()
+        self._hits = 0
+        self._misses = 0
+        self._guard_rejections = 0
+        self._lookup_time = 0.0
+
+    def get(self, text: str, scope: Hashable = None, language: Optional[str] = None) -> Optional[Any]:
+        """Return the value cached for the most similar text in scope, if similar enough.
+
+        language selects the stopword, negation and synonym tables; without it
+        the tables of all supported languages are combined.
+        """
+        started = time.perf_counter()
+        try:
+            index = self._scopes.get(scope)
+            canonical, signature = _analyze(text, language)
+            if index is None or not canonical:
+                self._misses += 1
+                return None
+
+            now = time.time()
+            query = _vectorize(_ngrams(canonical))
+            for _, entry_id in index.candidates(query, self.threshold, self.probe_grams, self.max_candidates):
+                entry = self._entries[entry_id]
+                if entry[1] <= now:
+                    # Expired: drop it and keep looking at the remaining candidates
+                    self._remove(entry_id)
+                    continue
+                if not _same_question(signature, entry[4]):
+                    self._guard_rejections += 1
+                    continue
+                self._entries.move_to_end(entry_id)
+                self._hits += 1
+                return entry[3]
+
+            self._misses += 1
+            return None
+        finally:
+            self._lookup_time += time.perf_counter() - started
+
+    def set(self, text: str, value: Any, scope: Hashable = None, language: Optional[str] = None):
+        canonical, signature = _analyze(text, language)
+        if not canonical:
+            return
+
+        vector = _vectorize(_ngrams(canonical))
+        index = self._scopes.get(scope)
+        if index is not None:
+            # The same question asked again replaces the older answer instead of adding a duplicate
+            for _, existing_id in index.candidates(vector, 0.99, self.probe_grams, self.max_candidates):
+                if self._entries[existing_id][4] == signature:
+                    self._remove(existing_id)
+
+        entry_id = next(self._ids)
+        # Looked up again: removing a scope's last entry drops its index
+        self._scopes.setdefault(scope, _ScopeIndex()).add(entry_id, vector)
+        self._entries[entry_id] = (scope, time.time() + self.ttl, text, value, signature)
+        while len(self._entries) > self.max_entries:
+            oldest_id = next(iter(self._entries))
+            self._remove(oldest_id)
+
+    def clear(self):
+        self._entries.clear()
+        self._scopes.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "scopes": len(self._scopes),
+            "threshold": self.threshold,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "guard_rejections": self._guard_rejections,
+            "avg_lookup_ms": round(self._lookup_time * 1000 / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        index = self._scopes.get(entry[0])
+        if index is not None:
+            index.remove(entry_id)
+            if not index.vectors:
+                del self._scopes[entry[0]]
@@ -34,6 +34,9 @@ class ConnectionManager:
             if not self.user_connections[user_id]:
                 del self.user_connections[user_id]
 
+    def is_connected(self, user_id: str) -> bool:
+        return bool(self.user_connections.get(user_id))
+
     async def send_personal_message(self, message: dict, user_id: str):
         if user_id in self.user_connections:
             for connection_id in self.user_connections[user_id].copy():
@@ -110,4 +113,18 @@ class NotificationService:
                 "timestamp": datetime.now().isoformat()
             }
         }
-        await manager.send_personal_message(notification, user_id)
\ No newline at end of file
+        await manager.send_personal_message(notification, user_id)
+
+    @staticmethod
+    async def send_job_status_notification(user_id: str, job_id: str, kind: str, status: str, error: str = None):
+        notification = {
+            "type": "ai_job_update",
+            "data": {
+                "job_id": job_id,
+                "kind": kind,
+                "status": status,
+                "error": error,
+                "timestamp": datetime.now().isoformat()
+            }
+        }
+        await manager.send_personal_message(notification, user_id)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Load generator for the LehrKI API.
+
+Drives /api/chat, /api/quizzes/generate and /api/parent-letters with a
+configurable mix and concurrency, then reports throughput, p50/p95/p99
+latency and the AI cache hit rate per endpoint, as seen by the server:
+
+    python benchmarks/loadgen.py --base-url http://localhost:8000 --duration 60 --concurrency 32
+
+Run the backend against benchmarks/mock_openai.py to avoid paying for model
+calls. Quiz and letter requests cost tokens; use --grant-tokens to top up the
+benchmark user directly in the database (uses DATABASE_URL like the app).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+_TOPICS = ["Fractions", "Photosynthesis", "World War I", "Algebra", "The Water Cycle",
+           "Poetry", "Electricity", "Ancient Rome", "Grammar", "Probability"]
+_LEVELS = ["beginner", "intermediate", "advanced"]
+_QUESTIONS = [
+    "How do I create a quiz?", "how to create a quiz", "How do parent letters work?",
+    "What analytics are available?", "How can I buy more tokens?", "How do I invite my students?",
+    "Can I export quiz results?", "how do parent letters work", "What languages are supported?",
+]
+_STUDENTS = ["Anna", "Ben", "Clara", "David", "Emma", "Felix", "Greta", "Hugo"]
+
+# AI task whose cache lookups /api/system/ai-stats reports for each endpoint
+ENDPOINT_TASKS = {"chat": "chat", "quiz": "quiz", "letter": "parent_letter"}
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def pick(items, skew):
+    """Zipf-like choice: low indexes are picked far more often, like real traffic"""
+    weights = [1 / (rank + 1) ** skew for rank in range(len(items))]
+    return random.choices(items, weights=weights)[0]
+
+
+def make_request(endpoint, skew):
+    if endpoint == "chat":
+        return "/api/chat", {"message": pick(_QUESTIONS, skew), "language": "en"}
+    if endpoint == "quiz":
+        return "/api/quizzes/generate", {
+            "topic": pick(_TOPICS, skew),
+            "level": pick(_LEVELS, skew),
+            "language": "en",
+            "num_questions": 5
+        }
+    student = pick(_STUDENTS, skew)
+    return "/api/parent-letters", {
+        "student_context": {
+            "name": student,
+            "parent_name": f"Parent of {student}",
+            "subject": pick(_TOPICS, skew),
+            "grade": "5"
+        },
+        "content_type": "progress_report",
+        "tone": "professional",
+        "language": "en"
+    }
+
+
+async def login(client, email, password):
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def fetch_ai_stats(client, headers):
+    try:
+        response = await client.get("/api/system/ai-stats", headers=headers)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"AI stats unavailable: {e}")
+        return None
+
+
+async def grant_tokens(email, amount):
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    from sqlalchemy import select
+    from app.core.database import AsyncSessionLocal, engine
+    from app.models.models import User, TokenTransaction
+
+    engine.echo = False
+    async with AsyncSessionLocal() as session:
+        user = (await session.execute(select(User).where(User.email == email))).scalar_one()
+        session.add(TokenTransaction(
+            user_id=user.id,
+            amount=amount,
+            description="Load test token allocation",
+            reference_type="benchmark"
+        ))
+        await session.commit()
+    print(f"Granted {amount} tokens to {email}")
+
+
+async def worker(client, headers, endpoints, weights, deadline, remaining, skew, results):
+    while time.monotonic() < deadline:
+        if remaining is not None:
+            if remaining[0] <= 0:
+                return
+            remaining[0] -= 1
+        endpoint = random.choices(endpoints, weights=weights)[0]
+        path, payload = make_request(endpoint, skew)
+        started = time.perf_counter()
+        try:
+            response = await client.post(path, json=payload, headers=headers)
+            ok = response.status_code < 400
+            status = response.status_code
+        except httpx.HTTPError as e:
+            ok = False
+            status = type(e).__name__
+        results[endpoint].append((time.perf_counter() - started, ok, status))
+
+
+def cache_delta(before, after, section):
+    if not before or not after:
+        return None
+    hits = after[section].get("hits", 0) - before[section].get("hits", 0)
+    misses = after[section].get("misses", 0) - before[section].get("misses", 0)
+    lookups = hits + misses
+    return hits, lookups
+
+
+def endpoint_cache_hits(before, after, endpoint):
+    """Cache hits during the run for the endpoint's task, total and by the tier that answered"""
+    if not before or not after or "cache_lookups" not in after:
+        return None
+    task = ENDPOINT_TASKS[endpoint]
+    start = before.get("cache_lookups", {}).get(task, {}).get("by_tier", {})
+    end = after["cache_lookups"].get(task, {}).get("by_tier", {})
+    by_tier = {tier: count - start.get(tier, 0) for tier, count in end.items() if count - start.get(tier, 0)}
+    return sum(by_tier.values()), by_tier
+
+
+def report(results, elapsed, before, after):
+    print(f"\n{'endpoint':<10} {'requests':>9} {'errors':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'cache hit':>10}")
+    for endpoint, samples in sorted(results.items()):
+        latencies = [latency * 1000 for latency, ok, _ in samples if ok]
+        errors = [status for _, ok, status in samples if not ok]
+        cache = endpoint_cache_hits(before, after, endpoint)
+        # A request is answered by at most one cache tier, so hits per request is the hit rate
+        hit_rate = f"{min(1.0, cache[0] / len(samples)):.1%}" if cache and samples else "n/a"
+        print(f"{endpoint:<10} {len(samples):>9} {len(errors):>7} {len(samples) / elapsed:>8.1f} "
+              f"{percentile(latencies, 0.50):>9.1f} {percentile(latencies, 0.95):>9.1f} {percentile(latencies, 0.99):>9.1f} "
+              f"{hit_rate:>10}")
+        if cache and cache[1]:
+            print(f"{'':<10} cache hits by tier: {cache[1]}")
+        if errors:
+            counts = defaultdict(int)
+            for status in errors:
+                counts[status] += 1
+            print(f"{'':<10} error statuses: {dict(counts)}")
+
+    total = sum(len(samples) for samples in results.values())
+    all_latencies = [latency * 1000 for samples in results.values() for latency, ok, _ in samples if ok]
+    print(f"\ntotal: {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} rps), "
+          f"mean {statistics.mean(all_latencies) if all_latencies else 0:.1f} ms")
+
+    for section in ("response_cache", "chat_semantic_cache"):
+        delta = cache_delta(before, after, section)
+        if delta:
+            hits, lookups = delta
+            rate = hits / lookups if lookups else 0.0
+            print(f"{section}: {hits}/{lookups} hits ({rate:.1%})")
+    if after:
+        pool = after.get("question_pool", {})
+        print(f"question_pool: hit rate {pool.get('hit_rate', 0):.1%}, {pool.get('questions', 0)} questions pooled")
+        inflight = after.get("inflight_requests", {})
+        print(f"coalesced upstream calls: {inflight.get('coalesced_calls', 0)}")
+    print("(server stats come from the worker that answered /api/system/ai-stats)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load generator for the LehrKI API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default="teacher@devchef.com")
+    parser.add_argument("--password", default="teacher123")
+    parser.add_argument("--admin-email", default="admin@devchef.com", help="Used to read /api/system/ai-stats")
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default="chat=6,quiz=3,letter=1", help="Relative weight per endpoint")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for request inputs; 0 is uniform")
+    parser.add_argument("--grant-tokens", type=int, default=0, help="Top up the benchmark user before starting")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    mix = dict(item.split("=") for item in args.mix.split(","))
+    endpoints = [endpoint for endpoint in mix if endpoint in ("chat", "quiz", "letter")]
+    weights = [float(mix[endpoint]) for endpoint in endpoints]
+
+    if args.grant_tokens:
+        await grant_tokens(args.email, args.grant_tokens)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        headers = await login(client, args.email, args.password)
+        try:
+            admin_headers = await login(client, args.admin_email, args.admin_password)
+        except httpx.HTTPError:
+            admin_headers = None
+        before = await fetch_ai_stats(client, admin_headers) if admin_headers else None
+
+        results = defaultdict(list)
+        remaining = [args.requests] if args.requests else None
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            worker(client, headers, endpoints, weights, deadline, remaining, args.skew, results)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.monotonic() - started
+
+        after = await fetch_ai_stats(client, admin_headers) if admin_headers else None
+
+    report(results, elapsed, before, after)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
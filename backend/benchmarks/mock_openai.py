@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible stand-in server for load tests.
+
+Implements POST /v1/chat/completions, including stream=True and JSON mode,
+with configurable latency and error rates, so the backend can be driven at
+full load without paying for model calls:
+
+    python benchmarks/mock_openai.py --port 8001 --latency lognormal --latency-mean 1.5
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://localhost:8001/v1 uvicorn app.main:app --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Mock OpenAI")
+
+config = argparse.Namespace(
+    latency="lognormal",
+    latency_mean=1.0,
+    latency_spread=0.5,
+    stream_chunk_delay=0.02,
+    error_rate=0.0,
+    rate_limit_rate=0.0,
+    seed=None
+)
+stats = {"requests": 0, "streamed": 0, "errors": 0, "rate_limited": 0}
+
+_LOREM = (
+    "Learning works best when practice is spread out over time and every new idea "
+    "is connected to something the student already knows. Regular feedback helps "
+    "students see their progress and keeps them motivated."
+).split()
+
+
+def sample_latency() -> float:
+    """Seconds to wait before answering, drawn from the configured distribution"""
+    mean = config.latency_mean
+    if config.latency == "fixed":
+        return mean
+    if config.latency == "uniform":
+        return random.uniform(max(0.0, mean - config.latency_spread), mean + config.latency_spread)
+    # Lognormal with the requested mean: long right tail like real provider latency
+    sigma = config.latency_spread
+    mu = math.log(max(mean, 1e-6)) - sigma * sigma / 2
+    return random.lognormvariate(mu, sigma)
+
+
+def lorem(words: int) -> str:
+    return " ".join(_LOREM[i % len(_LOREM)] for i in range(words))
+
+
+def extract_json_template(prompt: str):
+    """Return the first parseable JSON object in the prompt, i.e. the response format example"""
+    start = prompt.find("{")
+    while start != -1:
+        depth = 0
+        for end in range(start, len(prompt)):
+            if prompt[end] == "{":
+                depth += 1
+            elif prompt[end] == "}":
+                depth -= 1
+                if depth == 0:
+                    try:
+                        return json.loads(prompt[start:end + 1])
+                    except ValueError:
+                        break
+        start = prompt.find("{", start + 1)
+    return None
+
+
+def json_content(prompt: str) -> str:
+    """Build a plausible JSON answer by filling in the example format from the prompt"""
+    template = extract_json_template(prompt)
+    if not isinstance(template, dict):
+        return json.dumps({"title": "Mock response", "content": lorem(120)})
+
+    if isinstance(template.get("questions"), list) and template["questions"]:
+        match = re.search(r"Create (\d+)", prompt)
+        count = int(match.group(1)) if match else 5
+        example = template["questions"][0]
+        template["questions"] = [
+            {**example, "question_text": f"Mock question {uuid.uuid4().hex[:8]}: {lorem(8)}?"}
+            for _ in range(count)
+        ]
+    if isinstance(template.get("grades"), list) and template["grades"]:
+        # Batch grading: one entry per bracketed answer id
+        ids = [int(answer_id) for answer_id in re.findall(r"\[(\d+)\] Student Answer", prompt)]
+        example = template["grades"][0]
+        template["grades"] = [{**example, "id": answer_id} for answer_id in ids]
+    if "content" in template and isinstance(template["content"], str):
+        template["content"] = lorem(150)
+    return json.dumps(template)
+
+
+def usage_for(messages, content: str) -> dict:
+    prompt_tokens = sum(len(str(message.get("content", ""))) // 4 for message in messages)
+    completion_tokens = len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+def error_response(status_code: int, message: str, error_type: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": None}}
+    )
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    messages = body.get("messages", [])
+    model = body.get("model", "gpt-4o")
+
+    roll = random.random()
+    if roll < config.rate_limit_rate:
+        stats["rate_limited"] += 1
+        return error_response(429, "Rate limit reached (mock)", "rate_limit_error")
+    if roll < config.rate_limit_rate + config.error_rate:
+        stats["errors"] += 1
+        await asyncio.sleep(sample_latency())
+        return error_response(500, "Internal server error (mock)", "server_error")
+
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        content = json_content(prompt)
+    else:
+        content = lorem(80)
+
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    if body.get("stream"):
+        stats["streamed"] += 1
+        # Latency before the first token, then a steady token rate
+        first_token_delay = sample_latency() / 2
+
+        async def events():
+            await asyncio.sleep(first_token_delay)
+            pieces = re.findall(r"\S+\s*|\s+", content)
+            for index in range(0, len(pieces), 3):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"role": "assistant", "content": "".join(pieces[index:index + 3])} if index == 0
+                        else {"content": "".join(pieces[index:index + 3])},
+                        "finish_reason": None
+                    }]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(config.stream_chunk_delay)
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(sample_latency())
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": usage_for(messages, content)
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal",
+                        help="Latency distribution of non-streamed responses")
+    parser.add_argument("--latency-mean", type=float, default=1.0, help="Mean latency in seconds")
+    parser.add_argument("--latency-spread", type=float, default=0.5,
+                        help="Half-width for uniform, sigma for lognormal")
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.02, help="Seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with HTTP 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    vars(config).update(vars(args))
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
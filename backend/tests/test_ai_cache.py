@@ -0,0 +1,226 @@
+import asyncio
+import threading
+import time
+
+from app.services.ai_cache import ResponseCache, SQLiteCacheTier, SingleFlight
+
+
+def test_get_returns_stored_value_and_counts_hits():
+    cache = ResponseCache()
+    cache.set("a", {"answer": 1})
+
+    assert cache.get("a") == {"answer": 1}
+    assert cache.get("missing") is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_byte_budget_evicts_and_oversized_values_are_skipped():
+    cache = ResponseCache(max_bytes=30)
+    cache.set("a", "x" * 20)
+    cache.set("b", "y" * 20)
+    assert "a" not in cache
+    assert "b" in cache
+
+    cache.set("huge", "z" * 100)
+    assert "huge" not in cache
+    assert cache.get_stats()["bytes"] <= 30
+
+
+def test_task_ttl_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = ResponseCache(default_ttl=100, ttls={"chat": 10})
+    cache.set("chat", "hi", task="chat")
+    cache.set("quiz", "q", task="quiz")
+
+    now[0] += 11
+    assert cache.get("chat") is None
+    assert cache.get("quiz") == "q"
+
+    now[0] += 100
+    assert cache.purge_expired() == 1
+    assert len(cache) == 0
+
+
+def test_zero_ttl_and_unserializable_values_are_not_cached():
+    cyclic = []
+    cyclic.append(cyclic)
+    cache = ResponseCache(ttls={"chat": 0})
+    cache.set("a", "hi", task="chat")
+    cache.set("b", cyclic)
+
+    assert len(cache) == 0
+
+
+def test_overwriting_a_key_keeps_size_accounting():
+    cache = ResponseCache()
+    for value in ("short", "a much longer value", "mid"):
+        cache.set("a", value)
+
+    assert len(cache) == 1
+    assert cache.get_stats()["bytes"] == len('"mid"')
+
+
+def _wait_for_backend(cache):
+    cache.backend.submit(lambda: None).result(timeout=5)
+
+
+def test_sqlite_tier_serves_entries_written_by_another_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = ResponseCache(backend=SQLiteCacheTier(path))
+    reader = ResponseCache(backend=SQLiteCacheTier(path))
+    writer.set("a", {"answer": 1})
+    _wait_for_backend(writer)
+
+    assert reader.get("a") == {"answer": 1}
+    assert reader.get_stats()["backend_hits"] == 1
+    writer.backend.close()
+    reader.backend.close()
+
+
+async def test_aget_reads_the_backend_off_the_event_loop(tmp_path):
+    backend = SQLiteCacheTier(str(tmp_path / "cache.db"))
+    loop_thread = threading.get_ident()
+    read_threads = []
+    original_get = backend.get
+
+    def get(key):
+        read_threads.append(threading.get_ident())
+        return original_get(key)
+
+    backend.get = get
+    ResponseCache(backend=backend).set("a", "stored")
+    cache = ResponseCache(backend=backend)
+
+    assert await cache.aget("a") == "stored"
+    assert read_threads and loop_thread not in read_threads
+    # Promoted into memory, so the second read does not touch the backend
+    assert await cache.aget("a") == "stored"
+    assert len(read_threads) == 1
+    backend.close()
+
+
+def test_compaction_runs_off_the_write_path(tmp_path):
+    backend = SQLiteCacheTier(str(tmp_path / "cache.db"), max_entries=5, compact_every=10)
+    started = threading.Event()
+    release = threading.Event()
+    original_compact = backend.compact
+
+    def slow_compact():
+        started.set()
+        release.wait(5)
+        return original_compact()
+
+    backend.compact = slow_compact
+    for index in range(10):
+        backend.set(f"k{index}", "v", time.time() + 60)
+
+    # set() returned while compaction is still blocked on its own thread
+    assert started.wait(5)
+    assert backend.get("k9") is not None
+    release.set()
+    assert backend.schedule_compaction().result(timeout=5) == 5
+    assert backend.get_stats()["entries"] == 5
+    backend.close()
+
+
+def test_add_only_claims_absent_or_expired_keys(tmp_path):
+    backend = SQLiteCacheTier(str(tmp_path / "cache.db"))
+
+    assert backend.add("k", "1", time.time() + 60)
+    assert not backend.add("k", "2", time.time() + 60)
+    backend.set("old", "1", time.time() - 1)
+    assert backend.add("old", "2", time.time() + 60)
+    backend.close()
+
+
+async def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    tasks = [asyncio.create_task(flight.do("k", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["value"] * 5
+    assert calls == 1
+    assert flight.get_stats()["coalesced_calls"] == 4
+    assert flight.get_stats()["in_flight"] == 0
+
+
+async def test_single_flight_shares_errors_and_allows_a_retry():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise ValueError("upstream failed")
+
+    tasks = [asyncio.create_task(flight.do("k", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def succeeding():
+        return "ok"
+
+    assert await flight.do("k", succeeding) == "ok"
+
+
+async def test_single_flight_follower_takes_over_when_the_leader_is_cancelled():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        started.set()
+        await asyncio.sleep(0.05 if calls > 1 else 10)
+        return calls
+
+    leader = asyncio.create_task(flight.do("k", fetch))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == 2
+    assert leader.cancelled()
+
+
+async def test_single_flight_keys_are_independent():
+    flight = SingleFlight()
+
+    async def value(result):
+        await asyncio.sleep(0)
+        return result
+
+    results = await asyncio.gather(flight.do("a", lambda: value("a")), flight.do("b", lambda: value("b")))
+
+    assert results == ["a", "b"]
+    assert flight.get_stats()["upstream_calls"] == 2
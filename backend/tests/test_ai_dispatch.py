@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.services.ai_dispatch import AIDispatcher, Priority
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+async def test_concurrency_never_exceeds_the_limit():
+    dispatcher = AIDispatcher(initial_limit=2, max_limit=2)
+    active = peak = 0
+
+    async def call():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    await asyncio.gather(*(dispatcher.run(Priority.STANDARD, call) for _ in range(10)))
+
+    assert peak == 2
+    assert dispatcher.get_stats()["priorities"]["standard"]["completed"] == 10
+
+
+async def test_waiters_are_admitted_by_priority_then_arrival():
+    dispatcher = AIDispatcher(initial_limit=1, max_limit=1)
+    release = asyncio.Event()
+    order = []
+
+    async def blocker():
+        await release.wait()
+
+    async def record(name):
+        order.append(name)
+
+    holder = asyncio.create_task(dispatcher.run(Priority.STANDARD, blocker))
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(dispatcher.run(priority, lambda name=name: record(name)))
+        for name, priority in [("batch", Priority.BATCH), ("standard-1", Priority.STANDARD),
+                               ("interactive", Priority.INTERACTIVE), ("standard-2", Priority.STANDARD)]
+    ]
+    await asyncio.sleep(0)
+    assert dispatcher.get_stats()["waiting"] == 4
+    release.set()
+    await asyncio.gather(holder, *waiters)
+
+    assert order == ["interactive", "standard-1", "standard-2", "batch"]
+
+
+async def test_rate_limits_halve_the_limit_once_per_cooldown():
+    dispatcher = AIDispatcher(initial_limit=8, max_limit=8, backoff_cooldown=60)
+
+    async def limited():
+        raise RateLimited()
+
+    for _ in range(3):
+        with pytest.raises(RateLimited):
+            await dispatcher.run(Priority.STANDARD, limited)
+
+    assert dispatcher.limit == 4
+    assert dispatcher.get_stats()["priorities"]["standard"]["rate_limited"] == 3
+
+
+async def test_limit_grows_with_fast_calls_and_shrinks_with_slow_ones():
+    dispatcher = AIDispatcher(initial_limit=2, max_limit=4, target_latency=10)
+    for _ in range(10):
+        dispatcher._on_success(0.1)
+    assert dispatcher.limit == 4
+
+    dispatcher._on_success(60)
+    assert dispatcher._limit < 4
+
+
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    dispatcher = AIDispatcher(initial_limit=1, max_limit=1)
+    release = asyncio.Event()
+
+    async def blocker():
+        await release.wait()
+
+    holder = asyncio.create_task(dispatcher.run(Priority.STANDARD, blocker))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(dispatcher.run(Priority.STANDARD, blocker))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await holder
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert dispatcher.get_stats()["active"] == 0
+
+    async def done():
+        return "ok"
+
+    assert await asyncio.wait_for(dispatcher.run(Priority.STANDARD, done), 1) == "ok"
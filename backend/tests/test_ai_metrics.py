@@ -0,0 +1,11 @@
+from app.services.ai_metrics import AIMetrics
+
+
+def test_gauges_are_rendered_with_help_and_type():
+    metrics = AIMetrics()
+
+    text = metrics.render_prometheus({"lehrki_ai_dispatch_active": 3, "custom_gauge": 1})
+
+    assert "# HELP lehrki_ai_dispatch_active AI calls currently holding a dispatcher slot\n" in text
+    assert "# TYPE lehrki_ai_dispatch_active gauge\nlehrki_ai_dispatch_active 3\n" in text
+    assert "# HELP custom_gauge " in text
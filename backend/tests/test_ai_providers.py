@@ -0,0 +1,32 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services import ai_services
+from app.services.ai_providers import EXAMPLE_RESPONSES, LocalProvider
+from app.services.ai_resilience import CircuitBreaker
+
+
+async def test_local_provider_coalesces_identical_calls_and_returns_copies():
+    provider = LocalProvider(latency=0.05)
+    key = f"local-{uuid.uuid4()}"
+
+    results = await asyncio.gather(*(provider.complete("feedback", "gpt-4o", "prompt", key) for _ in range(3)))
+
+    assert all(result == EXAMPLE_RESPONSES["feedback"] for result in results)
+    assert results[0] is not EXAMPLE_RESPONSES["feedback"]
+    assert provider.breaker.get_stats()["window_calls"] == 1
+
+
+async def test_local_provider_times_out_on_its_own_breaker(monkeypatch):
+    shared_breaker = CircuitBreaker()
+    monkeypatch.setattr(ai_services, "ai_circuit_breaker", shared_breaker)
+    monkeypatch.setitem(ai_services._task_deadlines, "feedback", 0.01)
+    provider = LocalProvider(latency=1.0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await provider.complete("feedback", "gpt-4o", "prompt", f"local-{uuid.uuid4()}")
+
+    assert provider.breaker.get_stats()["window_failure_rate"] == 1.0
+    assert shared_breaker.get_stats()["window_calls"] == 0
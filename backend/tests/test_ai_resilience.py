@@ -0,0 +1,202 @@
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import ai_services
+from app.services.ai_dispatch import Priority
+from app.services.ai_resilience import CircuitBreaker, hedged
+
+
+def test_breaker_opens_once_the_failure_rate_crosses_the_threshold():
+    breaker = CircuitBreaker(failure_rate_threshold=0.5, min_calls=4)
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.get_stats()["rejected_calls"] == 1
+
+
+def test_breaker_counts_slow_calls_as_failures():
+    breaker = CircuitBreaker(slow_call_threshold=1.0, min_calls=2)
+    breaker.record_success(5.0)
+    breaker.record_success(5.0)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_breaker_closes_on_success_and_reopens_on_failure():
+    breaker = CircuitBreaker(min_calls=1, open_duration=0.0, half_open_max_calls=1)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    breaker.open_duration = 60.0
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker._opened_at = time.monotonic() - 61
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.get_stats()["times_opened"] == 3
+
+
+async def test_hedged_returns_the_fast_call_without_hedging():
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        return "ok"
+
+    assert await hedged(fn, hedge_after=1.0) == "ok"
+    assert calls == 1
+
+
+async def test_hedged_races_a_second_call_and_cancels_the_loser():
+    cancelled = asyncio.Event()
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return f"call {calls}"
+
+    assert await hedged(fn, hedge_after=0.01) == "call 2"
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+async def test_hedged_raises_only_when_every_call_failed():
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05 if calls == 1 else 0)
+        raise ValueError(f"call {calls}")
+
+    with pytest.raises(ValueError):
+        await hedged(fn, hedge_after=0.01)
+    assert calls == 2
+
+
+async def test_stalled_stream_is_cut_off_at_the_deadline():
+    class StalledStream:
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            await asyncio.sleep(10)
+
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        async for _ in ai_services._stream_chunks(StalledStream(), time.monotonic() + 0.05):
+            pass
+    assert time.monotonic() - started < 1
+
+
+def _half_open_breaker(**kwargs):
+    breaker = CircuitBreaker(min_calls=1, open_duration=0.0, half_open_max_calls=1, **kwargs)
+    breaker.record_failure()
+    return breaker
+
+
+def test_released_permit_lets_the_next_trial_through():
+    breaker = _half_open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.release()
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_trials_that_never_report_reopen_the_circuit_for_a_new_probe():
+    breaker = _half_open_breaker(half_open_timeout=60.0)
+    breaker.open_duration = 60.0
+    breaker._opened_at = time.monotonic() - 61
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker._last_trial_at = time.monotonic() - 61
+
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker._opened_at = time.monotonic() - 61
+    assert breaker.allow()
+
+
+class _StalledCompletions:
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def create(self, **kwargs):
+        self.started.set()
+        await asyncio.sleep(10)
+
+
+async def test_cancelled_call_gives_its_half_open_permit_back(monkeypatch):
+    breaker = _half_open_breaker()
+    monkeypatch.setattr(ai_services, "ai_circuit_breaker", breaker)
+    completions = _StalledCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    call = asyncio.ensure_future(ai_services._call_model(
+        "resilience-test-key", client, "chat", Priority.INTERACTIVE, model="gpt-4o-mini", messages=[]
+    ))
+    await asyncio.wait_for(completions.started.wait(), timeout=1)
+    assert not breaker.allow()
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    assert breaker.allow()
+
+
+async def test_abandoned_stream_gives_its_half_open_permit_back(monkeypatch):
+    breaker = _half_open_breaker()
+    monkeypatch.setattr(ai_services, "ai_circuit_breaker", breaker)
+    closed = []
+
+    async def close():
+        closed.append(True)
+
+    class Stream:
+        response = SimpleNamespace(aclose=close)
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content='{"content": "Hello'))])
+
+    async def create(**kwargs):
+        return Stream()
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(ai_services, "_get_openai", lambda: client)
+
+    events = ai_services.stream_parent_letter({"name": str(uuid.uuid4())}, "progress_report", "professional", "en")
+    assert (await events.__anext__())["type"] == "delta"
+    assert not breaker.allow()
+    await events.aclose()
+
+    assert closed
+    assert breaker.allow()
@@ -0,0 +1,29 @@
+from app.services import ai_services
+from app.services.ai_services import _get_cache_key, _parent_letter_cache_key
+
+
+def test_whitespace_and_key_order_do_not_change_the_key():
+    first = _parent_letter_cache_key({"name": "Ann", "subject": "Maths  "}, "progress_report", "friendly", "en")
+    second = _parent_letter_cache_key({"subject": " Maths", "name": "Ann"}, "progress_report", "friendly", "en")
+
+    assert first == second
+
+
+def test_every_input_is_part_of_the_key():
+    base = {"name": "Ann", "subject": "Maths", "additional_context": "Missed two lessons"}
+    key = _parent_letter_cache_key(base, "progress_report", "friendly", "en")
+
+    # Fields beyond the name, as well as tone and language, all count
+    assert key != _parent_letter_cache_key({**base, "additional_context": "Top of the class"}, "progress_report", "friendly", "en")
+    assert key != _parent_letter_cache_key(base, "progress_report", "formal", "en")
+    assert key != _parent_letter_cache_key(base, "progress_report", "friendly", "de")
+    assert _get_cache_key("chat", message="hi", history=[]) != _get_cache_key("chat", message="hi", history=[{"role": "user", "content": "earlier"}])
+
+
+def test_model_and_prompt_version_are_part_of_the_key(monkeypatch):
+    key = _get_cache_key("chat", message="hi")
+
+    assert key == _get_cache_key("chat", model=ai_services.model_router.model_for("chat"), message="hi")
+    assert key != _get_cache_key("chat", model="some-other-model", message="hi")
+    monkeypatch.setattr(ai_services, "PROMPT_VERSION", "next")
+    assert key != _get_cache_key("chat", message="hi")
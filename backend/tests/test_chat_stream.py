@@ -0,0 +1,57 @@
+import uuid
+from types import SimpleNamespace
+
+from app.services import ai_services
+from app.services.ai_resilience import CircuitBreaker
+
+
+def _client(deltas, error=None):
+    async def close():
+        pass
+
+    class Stream:
+        response = SimpleNamespace(aclose=close)
+
+        def __init__(self):
+            self._deltas = iter(deltas)
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            try:
+                delta = next(self._deltas)
+            except StopIteration:
+                if error is not None:
+                    raise error
+                raise StopAsyncIteration
+            return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+    async def create(**kwargs):
+        return Stream()
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+async def _events(monkeypatch, client):
+    breaker = CircuitBreaker()
+    monkeypatch.setattr(ai_services, "ai_circuit_breaker", breaker)
+    monkeypatch.setattr(ai_services, "_get_openai", lambda: client)
+    events = [event async for event in ai_services.stream_chatbot_response(f"question {uuid.uuid4()}", "student", "en")]
+    return events, breaker.get_stats()
+
+
+async def test_completed_stream_is_recorded_once_as_a_success(monkeypatch):
+    events, stats = await _events(monkeypatch, _client(["Hel", "lo"]))
+
+    assert [event["type"] for event in events] == ["delta", "delta", "done"]
+    assert stats["window_calls"] == 1
+    assert stats["window_failure_rate"] == 0.0
+
+
+async def test_stream_failing_after_the_first_token_is_recorded_once_as_a_failure(monkeypatch):
+    events, stats = await _events(monkeypatch, _client(["Hel"], error=ConnectionError("reset")))
+
+    assert [event["type"] for event in events] == ["delta", "error", "done"]
+    assert stats["window_calls"] == 1
+    assert stats["window_failure_rate"] == 1.0
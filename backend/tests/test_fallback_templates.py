@@ -0,0 +1,24 @@
+from app.services.fallback_templates import compile_template, template_engine
+
+
+def test_compiled_template_fills_fields_and_keeps_other_braces():
+    render = compile_template({"text": "Hi {name}, {missing}{0} {a b} {", "items": ["{name}", 3, None]})
+
+    assert render({"name": "Ann {x}"}) == {"text": "Hi Ann {x}, {0} {a b} {", "items": ["Ann {x}", 3, None]}
+
+
+def test_compiled_template_returns_fresh_containers():
+    render = compile_template({"steps": ["one"]})
+
+    first = render({})
+    first["steps"].append("two")
+
+    assert render({}) == {"steps": ["one"]}
+
+
+def test_parent_letter_falls_back_to_defaults_for_unknown_language_and_tone():
+    letter = template_engine.parent_letter({"name": "Ann"}, "unknown", "unknown", "xx")
+
+    assert letter["title"].endswith(" - Ann")
+    assert "Ann" in letter["content"]
+    assert letter == template_engine.parent_letter({"name": "Ann"}, "progress_report", "professional", "en")
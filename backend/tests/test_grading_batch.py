@@ -0,0 +1,40 @@
+import json
+import uuid
+from types import SimpleNamespace
+
+from app.services import ai_services
+from app.services.ai_dispatch import Priority
+
+
+def _response(payload):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(payload)))])
+
+
+def _grade(score):
+    return {"overall_score": score, "max_score": 100}
+
+
+async def test_batch_grades_every_answer_and_falls_back_at_batch_priority(monkeypatch):
+    calls = []
+
+    async def fake_completion(cache_key, openai_client, task=None, priority=Priority.STANDARD, **kwargs):
+        calls.append((task, priority))
+        if task == "grading_batch":
+            # The model only grades the first answer of each pack
+            return _response({"grades": [{"id": 0, **_grade(90)}]})
+        return _response(_grade(50))
+
+    monkeypatch.setattr(ai_services, "_get_openai", lambda: object())
+    monkeypatch.setattr(ai_services, "_create_completion", fake_completion)
+    answers = [
+        {"student_id": "s1", "answer": "first"},
+        {"student_id": "s1", "answer": "second"},
+        {"student_id": "s2", "answer": "third"},
+    ]
+
+    result = await ai_services.automated_grading_batch(f"assignment {uuid.uuid4()}", {}, answers)
+
+    assert [entry["student_id"] for entry in result["results"]] == ["s1", "s1", "s2"]
+    assert [entry["overall_score"] for entry in result["results"]] == [90, 50, 50]
+    assert result["single_fallbacks"] == 2
+    assert {priority for _, priority in calls} == {Priority.BATCH}
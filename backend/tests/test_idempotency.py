@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.core.auth import create_access_token
+from app.services.ai_cache import SQLiteCacheTier
+from app.services.idempotency import IdempotencyMiddleware, IdempotencyStore
+
+PATHS = ["/api/quizzes/generate", "/api/parent-letters/bulk", "/api/ai/"]
+
+
+def _app(store: IdempotencyStore, delay: float = 0.0):
+    app = FastAPI()
+    app.state.calls = 0
+
+    async def handler(request: Request):
+        app.state.calls += 1
+        body = await request.json()
+        await asyncio.sleep(delay)
+        if body.get("fail"):
+            return JSONResponse({"detail": "failed"}, status_code=500)
+        return {"call": app.state.calls, "echo": body}
+
+    for path in ("/api/quizzes/generate", "/api/quizzes/generate/stream", "/api/parent-letters/bulk", "/api/ai/chat"):
+        app.add_api_route(path, handler, methods=["POST"])
+    app.add_middleware(IdempotencyMiddleware, store=store, paths=PATHS)
+    return app
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def _headers(key: str = "key-1", user: str = "teacher@example.com"):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user})}", "Idempotency-Key": key}
+
+
+async def test_repeated_key_replays_the_first_response():
+    app = _app(IdempotencyStore())
+    async with _client(app) as client:
+        first = await client.post("/api/parent-letters/bulk", json={"n": 1}, headers=_headers())
+        second = await client.post("/api/parent-letters/bulk", json={"n": 1}, headers=_headers())
+
+    assert app.state.calls == 1
+    assert second.json() == first.json() == {"call": 1, "echo": {"n": 1}}
+    assert second.headers["idempotent-replayed"] == "true"
+
+
+async def test_concurrent_repeats_run_the_request_once():
+    app = _app(IdempotencyStore(), delay=0.05)
+    async with _client(app) as client:
+        responses = await asyncio.gather(*(
+            client.post("/api/ai/chat", json={"n": 1}, headers=_headers()) for _ in range(5)
+        ))
+
+    assert app.state.calls == 1
+    assert {response.json()["call"] for response in responses} == {1}
+
+
+async def test_key_reused_with_a_different_body_is_rejected():
+    app = _app(IdempotencyStore())
+    async with _client(app) as client:
+        await client.post("/api/quizzes/generate", json={"n": 1}, headers=_headers())
+        response = await client.post("/api/quizzes/generate", json={"n": 2}, headers=_headers())
+
+    assert response.status_code == 422
+    assert app.state.calls == 1
+
+
+async def test_keys_are_scoped_per_user_and_failures_are_not_stored():
+    app = _app(IdempotencyStore())
+    async with _client(app) as client:
+        await client.post("/api/ai/chat", json={"n": 1}, headers=_headers(user="a@example.com"))
+        await client.post("/api/ai/chat", json={"n": 1}, headers=_headers(user="b@example.com"))
+        assert app.state.calls == 2
+
+        failed = await client.post("/api/ai/chat", json={"fail": True}, headers=_headers(key="key-2"))
+        retried = await client.post("/api/ai/chat", json={"fail": True}, headers=_headers(key="key-2"))
+
+    assert failed.status_code == retried.status_code == 500
+    assert app.state.calls == 4
+
+
+async def test_unlisted_paths_and_requests_without_a_key_pass_through():
+    app = _app(IdempotencyStore())
+    async with _client(app) as client:
+        for _ in range(2):
+            await client.post("/api/quizzes/generate/stream", json={"n": 1}, headers=_headers())
+            await client.post("/api/quizzes/generate", json={"n": 1},
+                              headers={"Authorization": _headers()["Authorization"]})
+
+    assert app.state.calls == 4
+
+
+async def test_slow_request_keeps_its_claim_on_other_workers(tmp_path):
+    path = str(tmp_path / "idempotency.db")
+    # The pending marker alone would expire long before the request finishes
+    first = _app(IdempotencyStore(backend=SQLiteCacheTier(path), wait_timeout=0.1,
+                                  poll_interval=0.02, refresh_interval=0.02), delay=0.4)
+    second = _app(IdempotencyStore(backend=SQLiteCacheTier(path), wait_timeout=2, poll_interval=0.02))
+
+    async with _client(first) as first_client, _client(second) as second_client:
+        running = asyncio.ensure_future(first_client.post("/api/ai/chat", json={"n": 1}, headers=_headers()))
+        await asyncio.sleep(0.25)
+        replayed = await second_client.post("/api/ai/chat", json={"n": 1}, headers=_headers())
+        original = await running
+
+    assert first.state.calls == 1
+    assert second.state.calls == 0
+    assert replayed.json() == original.json()
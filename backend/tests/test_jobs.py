@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.models.models import AIJob
+from app.services import jobs
+from app.services.jobs import FINISHED_STATUSES, JobQueue, PermanentJobError
+
+
+@pytest.fixture
+def queue_db(session_factory, monkeypatch):
+    monkeypatch.setattr(jobs, "AsyncSessionLocal", session_factory)
+
+    async def no_notification(*args):
+        pass
+
+    monkeypatch.setattr(jobs.NotificationService, "send_job_status_notification", no_notification)
+    return session_factory
+
+
+async def _job(session_factory, job_id):
+    async with session_factory() as session:
+        return (await session.execute(select(AIJob).where(AIJob.id == job_id))).scalar_one()
+
+
+async def _wait_for(session_factory, job_id, statuses, timeout=5):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await _job(session_factory, job_id)
+        if job.status in statuses or asyncio.get_running_loop().time() > deadline:
+            return job
+        await asyncio.sleep(0.01)
+
+
+async def _submit(queue, session_factory, kind, params=None):
+    async with session_factory() as session:
+        return (await queue.submit(session, "teacher@example.com", kind, params or {})).id
+
+
+async def test_failed_attempts_are_retried_until_one_succeeds(queue_db):
+    queue = JobQueue(workers=1, max_attempts=3, retry_backoff=0)
+    calls = 0
+
+    async def flaky(params, user_id):
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise RuntimeError("provider unavailable")
+        return {"ok": True}
+
+    queue.register("flaky", flaky)
+    await queue.start()
+    job_id = await _submit(queue, queue_db, "flaky")
+    job = await _wait_for(queue_db, job_id, FINISHED_STATUSES)
+    await queue.stop()
+
+    assert job.status == "succeeded"
+    assert job.result == {"ok": True}
+    assert job.attempts == 3
+
+
+async def test_job_fails_after_max_attempts_or_on_permanent_error(queue_db):
+    queue = JobQueue(workers=1, max_attempts=2, retry_backoff=0)
+
+    async def broken(params, user_id):
+        raise RuntimeError("provider unavailable")
+
+    async def invalid(params, user_id):
+        raise PermanentJobError("bad params")
+
+    queue.register("broken", broken)
+    queue.register("invalid", invalid)
+    await queue.start()
+    broken_id = await _submit(queue, queue_db, "broken")
+    invalid_id = await _submit(queue, queue_db, "invalid")
+    broken_job = await _wait_for(queue_db, broken_id, FINISHED_STATUSES)
+    invalid_job = await _wait_for(queue_db, invalid_id, FINISHED_STATUSES)
+    await queue.stop()
+
+    assert (broken_job.status, broken_job.attempts) == ("failed", 2)
+    assert (invalid_job.status, invalid_job.attempts, invalid_job.error) == ("failed", 1, "bad params")
+
+
+async def test_stop_requeues_running_jobs_and_the_next_start_finishes_them(queue_db):
+    started = asyncio.Event()
+    blocked = True
+
+    async def slow(params, user_id):
+        started.set()
+        if blocked:
+            await asyncio.sleep(60)
+        return {"done": True}
+
+    queue = JobQueue(workers=1, max_attempts=1)
+    queue.register("slow", slow)
+    await queue.start()
+    job_id = await _submit(queue, queue_db, "slow")
+    await asyncio.wait_for(started.wait(), 5)
+    await queue.stop()
+
+    job = await _job(queue_db, job_id)
+    assert (job.status, job.attempts, job.started_at) == ("queued", 0, None)
+
+    blocked = False
+    restarted = JobQueue(workers=1, max_attempts=1)
+    restarted.register("slow", slow)
+    await restarted.start()
+    job = await _wait_for(queue_db, job_id, FINISHED_STATUSES)
+    await restarted.stop()
+
+    assert job.status == "succeeded"
+    assert job.attempts == 1
+
+
+async def test_cancel_stops_a_running_job(queue_db):
+    started = asyncio.Event()
+
+    async def slow(params, user_id):
+        started.set()
+        await asyncio.sleep(60)
+
+    queue = JobQueue(workers=1)
+    queue.register("slow", slow)
+    await queue.start()
+    job_id = await _submit(queue, queue_db, "slow")
+    await asyncio.wait_for(started.wait(), 5)
+    async with queue_db() as session:
+        job = (await session.execute(select(AIJob).where(AIJob.id == job_id))).scalar_one()
+        assert await queue.cancel(session, job)
+    await asyncio.sleep(0.05)
+    await queue.stop()
+
+    assert (await _job(queue_db, job_id)).status == "cancelled"
@@ -0,0 +1,70 @@
+import json
+
+from app.services.json_stream import JsonArrayItemStreamer, JsonStringFieldStreamer
+
+
+def _chunks(text, size):
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+def _stream_field(text, field, size):
+    streamer = JsonStringFieldStreamer(field)
+    return "".join(streamer.feed(chunk) for chunk in _chunks(text, size)), streamer
+
+
+def test_string_field_is_decoded_across_any_chunk_boundary():
+    content = 'Dear "parents",\nyour child\\ scored 9/10 été \U0001f600'
+    text = json.dumps({"subject": "content here", "content": content, "tone": "warm"})
+
+    for size in (1, 2, 3, 7, len(text)):
+        decoded, streamer = _stream_field(text, "content", size)
+        assert decoded == content
+        assert streamer.done
+
+
+def test_string_field_ignores_same_named_nested_keys_and_values():
+    text = json.dumps({"meta": {"content": "nested"}, "title": "content", "content": "top"})
+
+    decoded, _ = _stream_field(text, "content", 4)
+
+    assert decoded == "top"
+
+
+def test_string_field_stops_after_the_closing_quote():
+    streamer = JsonStringFieldStreamer("content")
+
+    assert streamer.feed('{"content": "ab') == "ab"
+    assert streamer.feed('c", "other": "x"}') == "c"
+    assert streamer.done
+
+
+def test_array_items_are_returned_as_soon_as_each_closes():
+    questions = [
+        {"question": "What is {x}?", "options": ["a", "b]"], "correct_answer": "a"},
+        {"question": 'Say "hi"\\', "options": [], "correct_answer": "b"},
+    ]
+    text = json.dumps({"topic": "questions", "questions": questions, "extra": [{"question": "no"}]})
+
+    for size in (1, 5, 13, len(text)):
+        streamer = JsonArrayItemStreamer("questions")
+        items = []
+        for chunk in _chunks(text, size):
+            items.extend(streamer.feed(chunk))
+        assert items == questions
+        assert streamer.done
+
+
+def test_array_item_is_available_before_the_array_closes():
+    streamer = JsonArrayItemStreamer("questions")
+
+    assert streamer.feed('{"questions": [{"question": "one"}, {"quest') == [{"question": "one"}]
+    assert streamer.feed('ion": "two"}') == [{"question": "two"}]
+    assert not streamer.done
+
+
+def test_malformed_array_item_is_skipped():
+    streamer = JsonArrayItemStreamer("questions")
+
+    items = streamer.feed('{"questions": [{"question": "one",}, {"question": "two"}]}')
+
+    assert items == [{"question": "two"}]
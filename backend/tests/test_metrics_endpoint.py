@@ -0,0 +1,51 @@
+import httpx
+import pytest
+
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.core.database import get_db_session
+from app.main import app
+from app.models.models import User, UserRole
+
+
+@pytest.fixture
+async def client(session_factory):
+    async with session_factory() as session:
+        session.add_all([
+            User(id="admin@example.com", email="admin@example.com", role=UserRole.ADMIN),
+            User(id="student@example.com", email="student@example.com", role=UserRole.STUDENT),
+        ])
+        await session.commit()
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db_session] = override_session
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_db_session)
+
+
+def _bearer(user_id: str):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+
+async def test_metrics_need_an_admin_when_no_token_is_configured(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+
+    assert (await client.get("/api/system/metrics")).status_code == 403
+    assert (await client.get("/api/system/metrics", headers=_bearer("student@example.com"))).status_code == 403
+    response = await client.get("/api/system/metrics", headers=_bearer("admin@example.com"))
+
+    assert response.status_code == 200
+    assert "# HELP lehrki_ai_dispatch_limit " in response.text
+
+
+async def test_metrics_token_is_required_when_configured(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+
+    assert (await client.get("/api/system/metrics", headers=_bearer("admin@example.com"))).status_code == 401
+    response = await client.get("/api/system/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert response.status_code == 200
@@ -0,0 +1,72 @@
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import ai_services
+from app.services.model_routing import ModelRouter, _parse_routes
+
+TIERS = {"fast": "small-model", "standard": "large-model"}
+
+
+def _response(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_tasks_route_to_their_tier_and_overrides_win():
+    router = ModelRouter(TIERS, {"chat": "fast", "quiz": "standard", **_parse_routes("quiz=fast, bogus, grading=huge")})
+
+    assert router.model_for("chat") == "small-model"
+    assert router.model_for("quiz") == "small-model"
+    assert router.model_for("grading") == "large-model"
+    assert router.model_for(None) == "large-model"
+
+
+def test_escalation_moves_one_tier_up_and_stops_at_the_top():
+    assert ModelRouter(TIERS, {}).escalation_for("small-model") == "large-model"
+    assert ModelRouter(TIERS, {}).escalation_for("large-model") is None
+    assert ModelRouter(TIERS, {}, escalation=False).escalation_for("small-model") is None
+    assert ModelRouter({"fast": "same", "standard": "same"}, {}).escalation_for("same") is None
+
+
+async def test_invalid_output_is_retried_on_the_next_tier(monkeypatch):
+    router = ModelRouter(TIERS, {"summary": "fast"})
+    monkeypatch.setattr(ai_services, "model_router", router)
+    calls = []
+
+    async def fake_call_model(cache_key, openai_client, task, priority, **kwargs):
+        calls.append((cache_key, kwargs["model"]))
+        return _response("not json" if kwargs["model"] == "small-model" else json.dumps({"summary": "ok"}))
+
+    monkeypatch.setattr(ai_services, "_call_model", fake_call_model)
+
+    response = await ai_services._create_completion(
+        "key", object(), task="summary", messages=[], response_format={"type": "json_object"}
+    )
+
+    assert json.loads(response.choices[0].message.content) == {"summary": "ok"}
+    assert calls == [("key", "small-model"), ("key:large-model", "large-model")]
+    assert router.get_stats()["escalations"][0]["count"] == 1
+
+
+@pytest.mark.parametrize("summary_type, route", [("brief", "summary"), ("detailed", "summary_detailed")])
+async def test_summaries_are_cached_under_the_model_they_are_routed_to(monkeypatch, summary_type, route):
+    router = ModelRouter(TIERS, {"summary": "fast", "summary_detailed": "standard"})
+    monkeypatch.setattr(ai_services, "model_router", router)
+    calls = []
+
+    async def fake_completion(cache_key, openai_client, task=None, model=None, **kwargs):
+        calls.append((cache_key, model))
+        return _response(json.dumps({"summary": "short", "key_points": []}))
+
+    monkeypatch.setattr(ai_services, "_create_completion", fake_completion)
+    content = f"Photosynthesis turns light into chemical energy. {uuid.uuid4()}"
+
+    await ai_services.summarize_content(content, summary_type=summary_type)
+
+    model = router.model_for(route)
+    assert calls == [(
+        ai_services._get_cache_key("summary", model=model, content=content, summary_type=summary_type, language="en"),
+        model
+    )]
@@ -0,0 +1,18 @@
+import subprocess
+import sys
+
+
+def test_empty_base_url_setting_falls_back_to_the_openai_endpoint():
+    # Settings are read at import, so check them in a fresh interpreter with the variable set but empty
+    code = (
+        "from app.services import ai_services;"
+        "client = ai_services._get_openai();"
+        "print(client.base_url.host)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={"OPENAI_API_KEY": "test", "OPENAI_BASE_URL": "", "PYTHONPATH": "."},
+        capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip().splitlines()[-1] == "api.openai.com"
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api import routes
+from app.core.config import settings
+from app.models.models import ParentLetter, TokenTransaction, User, UserRole
+from app.models.schemas import ParentLetterBulkCreate
+from app.services.ai_dispatch import Priority
+
+
+@pytest.fixture
+async def teacher(session_factory):
+    async with session_factory() as session:
+        user = User(id="teacher@example.com", email="teacher@example.com", role=UserRole.TEACHER)
+        session.add(user)
+        session.add(TokenTransaction(user_id=user.id, amount=3, description="Starter tokens"))
+        await session.commit()
+        return user
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    calls = {"active": 0, "peak": 0, "priorities": set()}
+
+    async def fake_letter(student_context, content_type, tone, language, priority):
+        calls["active"] += 1
+        calls["peak"] = max(calls["peak"], calls["active"])
+        calls["priorities"].add(priority)
+        await asyncio.sleep(0.01)
+        calls["active"] -= 1
+        return {"title": f"Letter for {student_context['name']}", "content": "Dear parent"}
+
+    async def no_message(*args):
+        pass
+
+    monkeypatch.setattr(routes, "generate_parent_letter", fake_letter)
+    monkeypatch.setattr(routes.manager, "send_personal_message", no_message)
+    monkeypatch.setattr(settings, "BULK_LETTER_CONCURRENCY", 2)
+    return calls
+
+
+def _student(name):
+    return {"name": name, "parent_name": f"Parent of {name}", "subject": "Maths"}
+
+
+async def test_valid_students_get_letters_with_one_debit(session_factory, teacher, generated):
+    bulk = ParentLetterBulkCreate(students=[_student("Ann"), {"name": "Bo"}, _student("Cy")])
+
+    async with session_factory() as session:
+        response = await routes._generate_parent_letters_bulk(bulk, teacher, session)
+
+    assert [letter.title for letter in response.letters] == ["Letter for Ann", "Letter for Cy"]
+    assert [entry["index"] for entry in response.skipped] == [1]
+    assert generated["peak"] <= 2
+    assert generated["priorities"] == {Priority.BATCH}
+    async with session_factory() as session:
+        debits = (await session.execute(select(TokenTransaction).where(TokenTransaction.amount < 0))).scalars().all()
+        assert [debit.amount for debit in debits] == [-2]
+        assert len((await session.execute(select(ParentLetter))).scalars().all()) == 2
+
+
+async def test_insufficient_tokens_charge_nothing(session_factory, teacher, generated):
+    bulk = ParentLetterBulkCreate(students=[_student(name) for name in ("Ann", "Bo", "Cy", "Di")])
+
+    async with session_factory() as session:
+        with pytest.raises(HTTPException) as error:
+            await routes._generate_parent_letters_bulk(bulk, teacher, session)
+
+    assert error.value.status_code == 400
+    assert generated["peak"] == 0
+
+
+async def test_classes_over_the_limit_are_rejected(session_factory, teacher, generated, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_LETTER_MAX_STUDENTS", 2)
+    bulk = ParentLetterBulkCreate(students=[_student(name) for name in ("Ann", "Bo", "Cy")])
+
+    async with session_factory() as session:
+        with pytest.raises(HTTPException) as error:
+            await routes._generate_parent_letters_bulk(bulk, teacher, session)
+
+    assert error.value.status_code == 400
@@ -0,0 +1,34 @@
+import pytest
+
+from app.services.prompt_budget import chunk_text, estimate_message_tokens, estimate_tokens, trim_history, truncate_to_tokens
+
+TEXT = "The mitochondria, often called the powerhouse of the cell, produce most of its ATP. " * 20
+
+
+@pytest.mark.parametrize("max_tokens", [0, 1, 2, 3, 10, 57, 200])
+def test_truncated_text_including_the_ellipsis_fits_the_budget(max_tokens):
+    truncated = truncate_to_tokens(TEXT, max_tokens)
+
+    assert estimate_tokens(truncated) <= max_tokens
+    assert truncated == "" or truncated.endswith("…")
+
+
+def test_text_within_the_budget_is_returned_unchanged():
+    assert truncate_to_tokens("short text", 10) == "short text"
+
+
+def test_chunks_fit_the_budget_and_keep_every_word():
+    chunks = chunk_text(TEXT, 25)
+
+    assert all(estimate_tokens(chunk) <= 25 for chunk in chunks)
+    assert " ".join(chunks).split() == TEXT.split()
+
+
+def test_trimmed_history_fits_the_budget_and_keeps_the_latest_message():
+    history = [{"role": "user" if i % 2 else "assistant", "content": f"Message {i}. {TEXT}"} for i in range(6)]
+
+    trimmed = trim_history(history, 300)
+
+    assert estimate_message_tokens(trimmed) <= 300
+    assert trimmed[0]["role"] == "system"
+    assert trimmed[-1]["content"].startswith("Message 5.")
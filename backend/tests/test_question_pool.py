@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.models.models import QuestionBankItem
+from app.services import question_pool as question_pool_module
+from app.services.question_pool import QuestionPool, normalize_language
+
+
+def _questions(*texts):
+    return [{"question_text": text, "correct_answer": "a", "options": ["a", "b"]} for text in texts]
+
+
+@pytest.mark.parametrize("language, expected", [
+    ("en", "en"), ("EN-us", "en"), ("de_CH", "de"), (" fr ", "fr"), ("english", "en"), ("", "en"),
+])
+def test_languages_are_normalized_to_two_letters(language, expected):
+    assert normalize_language(language) == expected
+
+
+async def test_concurrent_stores_of_the_same_questions_keep_every_new_one(session_factory, monkeypatch):
+    monkeypatch.setattr(question_pool_module, "AsyncSessionLocal", session_factory)
+    pool = QuestionPool()
+    key = pool.make_key("Photosynthesis", "Beginner", "en-US")
+
+    await asyncio.gather(
+        pool._store(key, _questions("What is light?", "What is chlorophyll?")),
+        pool._store(key, _questions("What is chlorophyll?", "What is glucose?")),
+        pool._store(key, _questions("What is light?")),
+    )
+    await pool._store(key, _questions("What is glucose?", "What is water?", ""))
+
+    async with session_factory() as session:
+        rows = (await session.execute(select(QuestionBankItem.question_text, QuestionBankItem.language))).all()
+    assert sorted(text for text, _ in rows) == [
+        "What is chlorophyll?", "What is glucose?", "What is light?", "What is water?"
+    ]
+    assert {language for _, language in rows} == {"en"}
+
+
+@pytest.fixture
+def generator(session_factory, monkeypatch):
+    """Fake model for the pool: records each request and returns numbered questions"""
+    monkeypatch.setattr(question_pool_module, "AsyncSessionLocal", session_factory)
+    requests = []
+
+    async def fake_request(topic, level, language, num_questions, avoid_questions=None, priority=None):
+        requests.append((num_questions, priority))
+        start = sum(count for count, _ in requests[:-1])
+        return _questions(*(f"{topic} question {start + i}" for i in range(num_questions)))
+
+    monkeypatch.setattr(question_pool_module, "_request_quiz_questions", fake_request)
+    return requests
+
+
+async def test_pooled_questions_are_served_without_the_model_and_never_twice_to_a_user(generator):
+    pool = QuestionPool(target_size=4, fill_batch=1, min_requests=100)
+    key = pool.make_key("Cells", "easy", "en")
+    pool.add(key, _questions(*(f"Pooled {i}" for i in range(6))))
+
+    first = await pool.get_questions("Cells", "easy", "en", 3, user_id="u1")
+    second = await pool.get_questions("Cells", "easy", "en", 3, user_id="u1")
+
+    assert generator == []
+    assert not {q["question_text"] for q in first} & {q["question_text"] for q in second}
+    assert pool.get_stats()["pool_hits"] == 2
+
+
+async def test_a_short_pool_asks_the_model_only_for_the_shortfall(generator):
+    pool = QuestionPool(min_requests=100)
+    key = pool.make_key("Cells", "easy", "en")
+    pool.add(key, _questions("Pooled 0", "Pooled 1"))
+
+    questions = await pool.get_questions("Cells", "easy", "en", 5, user_id="u1")
+
+    assert len(questions) == 5
+    assert generator == [(3, None)]
+    assert pool.get_stats()["pool_misses"] == 1
+    # Generated questions are kept for the next request
+    assert len(pool._unserved(key, "u2")) == 5
+
+
+async def test_popular_pools_are_refilled_in_the_background_at_batch_priority(generator):
+    pool = QuestionPool(target_size=10, fill_batch=4, min_requests=1)
+    key = pool.make_key("Cells", "easy", "en")
+    pool.add(key, _questions(*(f"Pooled {i}" for i in range(3))))
+
+    await pool.get_questions("Cells", "easy", "en", 2, user_id="u1")
+    await asyncio.gather(*pool._refills.values())
+
+    assert generator == [(4, question_pool_module.Priority.BATCH)]
+    assert len(pool._pools[key]) == 7
+    await pool.close()
+
+
+async def test_failed_generation_falls_back_to_template_questions(session_factory, monkeypatch):
+    monkeypatch.setattr(question_pool_module, "AsyncSessionLocal", session_factory)
+
+    async def failing_request(*args, **kwargs):
+        raise RuntimeError("provider unavailable")
+
+    monkeypatch.setattr(question_pool_module, "_request_quiz_questions", failing_request)
+    pool = QuestionPool(min_requests=100)
+
+    questions = await pool.get_questions("Cells", "easy", "en", 3)
+
+    assert len(questions) == 3
+    assert pool.get_stats()["questions"] == 0
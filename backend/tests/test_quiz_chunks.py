@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import ai_services
+from app.services.ai_services import _dedupe_questions, _quiz_part_sizes
+
+
+def _question(text):
+    return {"question_text": text, "correct_answer": "a", "options": ["a", "b"]}
+
+
+@pytest.fixture
+def chunks(monkeypatch):
+    """Fake chunk requests; answers[part] lists the question texts a part returns, or an exception"""
+    monkeypatch.setattr(settings, "QUIZ_CHUNK_SIZE", 3)
+    calls = {"parts": [], "avoid": [], "active": 0, "peak": 0, "answers": {}}
+
+    async def fake_chunk(topic, level, language, num_questions, avoid_questions=None, priority=None, part=None):
+        calls["parts"].append((part, num_questions))
+        calls["avoid"].append(list(avoid_questions or []))
+        calls["active"] += 1
+        calls["peak"] = max(calls["peak"], calls["active"])
+        await asyncio.sleep(0.01)
+        calls["active"] -= 1
+        answer = calls["answers"].get(part, [f"Top-up {len(calls['parts'])}.{i}" for i in range(num_questions)])
+        if isinstance(answer, Exception):
+            raise answer
+        return [_question(text) for text in answer]
+
+    monkeypatch.setattr(ai_services, "_request_quiz_chunk", fake_chunk)
+    return calls
+
+
+@pytest.mark.parametrize("num_questions, sizes", [(3, [3]), (6, [3, 3]), (7, [3, 2, 2]), (10, [3, 3, 2, 2])])
+def test_quizzes_are_split_into_even_parts(monkeypatch, num_questions, sizes):
+    monkeypatch.setattr(settings, "QUIZ_CHUNK_SIZE", 3)
+
+    assert _quiz_part_sizes(num_questions) == sizes
+
+
+def test_near_duplicates_are_dropped_but_reordered_wording_is_kept():
+    questions = [
+        _question("What is the capital city of France?"),
+        _question("what is the capital city of France"),
+        _question("What is the capital city of France today?"),
+        _question("France: what is the capital city?"),
+    ]
+
+    assert [q["question_text"] for q in _dedupe_questions(questions)] == [
+        "What is the capital city of France?", "France: what is the capital city?"
+    ]
+
+
+async def test_parts_run_in_parallel_and_duplicates_are_topped_up(chunks):
+    chunks["answers"] = {
+        (1, 2): ["Why is the sky blue?", "What makes rain?", "How do clouds form?"],
+        (2, 2): ["Why is the sky blue?", "What is wind?", "What is fog?"],
+    }
+
+    questions = await ai_services._request_quiz_questions("Weather", "easy", "en", 6)
+
+    assert chunks["peak"] == 2
+    assert [q["question_text"] for q in questions][:5] == [
+        "Why is the sky blue?", "What makes rain?", "How do clouds form?", "What is wind?", "What is fog?"
+    ]
+    assert len(questions) == 6
+    # The top-up asks for the missing question while avoiding the ones already kept
+    assert chunks["parts"][-1] == (None, 1)
+    assert "What is fog?" in chunks["avoid"][-1]
+
+
+async def test_failed_parts_are_replaced_and_only_total_failure_raises(chunks):
+    chunks["answers"] = {(1, 2): ["Q1", "Q2", "Q3"], (2, 2): RuntimeError("part failed")}
+
+    questions = await ai_services._request_quiz_questions("Weather", "easy", "en", 6)
+    assert len(questions) == 6
+
+    chunks["answers"] = {(1, 2): RuntimeError("part failed"), (2, 2): RuntimeError("part failed")}
+    with pytest.raises(RuntimeError):
+        await ai_services._request_quiz_questions("Weather", "easy", "en", 6)
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from app.services.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(threshold=0.8)
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("How do I create a quiz?", "how to make a quiz"),
+    ("How do I create quizzes?", "how do i create a quiz"),
+    ("How can I reset my password?", "how do I reset my pasword"),
+])
+def test_paraphrases_and_typos_hit(cache, cached, asked):
+    cache.set(cached, "answer", scope="teacher", language="en")
+
+    assert cache.get(asked, scope="teacher", language="en") == "answer"
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("what features are available", "what features are unavailable"),
+    ("why is my quiz saving", "why is my quiz not saving"),
+    ("why isn't my quiz saving", "why is my quiz saving"),
+    ("how do I create a quiz", "how do I delete a quiz"),
+    ("how do I create a quiz", "how do I create a math quiz"),
+])
+def test_negations_and_different_content_words_miss(cache, cached, asked):
+    cache.set(cached, "answer", scope="teacher", language="en")
+
+    assert cache.get(asked, scope="teacher", language="en") is None
+
+
+def test_scopes_are_separate(cache):
+    cache.set("How do I create a quiz?", "answer", scope=("teacher", "en"))
+
+    assert cache.get("How do I create a quiz?", scope=("student", "en")) is None
+
+
+def test_asking_the_same_question_again_replaces_the_entry(cache):
+    for answer in ("first", "second", "third"):
+        cache.set("How do I create a quiz?", answer, scope="teacher")
+        cache.set("how do I create a quiz", answer, scope="teacher")
+
+    assert len(cache) == 1
+    assert cache.get("How do I create a quiz?", scope="teacher") == "third"
+
+
+def test_expired_entries_are_skipped_for_the_next_candidate(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = SemanticCache(threshold=0.7, ttl=10)
+    cache.set("How can I reset my password?", "old", scope="teacher")
+    now[0] += 8
+    cache.set("How can I reset my pasword?", "fresh", scope="teacher")
+    now[0] += 5
+
+    assert cache.get("How can I reset my password?", scope="teacher") == "fresh"
+    assert len(cache) == 1
+
+
+def test_threshold_decides_on_differently_worded_paraphrases():
+    # "into" is a content word here, so the two questions do not share all their words
+    cached, asked = "how do I export grades to excel", "how do I export the grades into excel"
+    lenient, strict = SemanticCache(threshold=0.7), SemanticCache(threshold=0.9)
+    for cache in (lenient, strict):
+        cache.set(cached, "answer", scope="teacher", language="en")
+
+    assert lenient.get(asked, scope="teacher", language="en") == "answer"
+    assert strict.get(asked, scope="teacher", language="en") is None
+    assert lenient.get("how do I delete grades", scope="teacher", language="en") is None
+
+
+def test_words_shared_by_many_cached_questions_count_for_less():
+    cache = SemanticCache(threshold=0.6)
+    cache.set("how do I create a quiz", "answer", scope="teacher", language="en")
+    assert cache.get("how do I create a math quiz", scope="teacher", language="en") == "answer"
+
+    for other in ("how do I create a worksheet", "how do I create a lesson plan", "what is a quiz"):
+        cache.set(other, "other", scope="teacher", language="en")
+
+    # "create" and "quiz" are now common, so the extra "math" weighs more
+    assert cache.get("how do I create a math quiz", scope="teacher", language="en") is None